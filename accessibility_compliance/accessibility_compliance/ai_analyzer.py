@@ -0,0 +1,324 @@
+# accessibility_compliance/accessibility_compliance/ai_analyzer.py
+"""AI remediation suggestions for accessibility issues.
+
+Identical markup failing the same rule in the same way gets the same fix
+wherever it appears, so the open issues of a scan are grouped by issue type,
+description (which carries the specifics, such as the colors of a contrast
+failure or the missing heading level) and snippet hash. Each
+group is looked up in the AI Fix Suggestion cache first, which is shared by
+every scan and site. Only the misses go to the model: `ai_batch_size` issues
+per chat completion, at most `ai_concurrency` requests in flight and request
+starts spaced to stay under `ai_requests_per_minute`. Every answered batch is
+cached and committed as it arrives, so an interrupted run never pays twice.
+
+Any OpenAI-compatible endpoint works; point `openai_base_url` at a local mock
+server (see benchmarks/mock_model_server.py) to exercise the pipeline offline.
+"""
+import asyncio
+import hashlib
+import json
+import time
+from dataclasses import dataclass
+
+import frappe
+from frappe.utils import cint, flt, now
+from openai import AsyncOpenAI, OpenAIError
+
+from accessibility_compliance.accessibility_compliance.crawler import HostRateLimiter, site_host
+from accessibility_compliance.accessibility_compliance.instrumentation import ScanMetrics, record_scan_metrics
+from accessibility_compliance.accessibility_compliance.remediation_report import clear_report_cache
+from accessibility_compliance.accessibility_compliance.rules import snippet_hash
+
+SUGGESTION_DOCTYPE = "AI Fix Suggestion"
+SUGGESTION_FIELDS = (
+    "name",
+    "owner",
+    "creation",
+    "modified",
+    "modified_by",
+    "docstatus",
+    "issue_type",
+    "snippet_hash",
+    "model",
+    "wcag_criterion",
+    "html_snippet",
+    "suggestion"
+)
+
+DEFAULT_MODEL = "gpt-4o-mini"
+DEFAULT_BATCH_SIZE = 20
+DEFAULT_CONCURRENCY = 4
+DEFAULT_REQUESTS_PER_MINUTE = 60
+DEFAULT_TIMEOUT = 60
+DEFAULT_MAX_RETRIES = 3
+LOOKUP_CHUNK_SIZE = 1000
+MAX_ERRORS_KEPT = 20
+
+SYSTEM_PROMPT = (
+    "You are a web accessibility engineer. For each WCAG issue in the user's JSON list, "
+    "write a short, concrete fix for the given HTML element: the corrected markup when "
+    "possible, otherwise one or two sentences. Reply with a JSON object of the form "
+    '{"suggestions": [{"id": "<issue id>", "fix": "<fix>"}]} covering every issue.'
+)
+
+
+@dataclass
+class SuggestionRequest:
+    """One unique issue (issue type, description and snippet) that needs a fix suggestion."""
+    key: str
+    issue_type: str
+    wcag_criterion: str = None
+    description: str = None
+    selector: str = None
+    snippet: str = None
+
+
+def suggestion_key(issue_type, snippet=None, description=None):
+    """Cache key of a suggestion: the issue type, its description and the whitespace-normalized snippet hash.
+
+    The description tells apart failures a snippet cannot, such as the page-level
+    issues of one rule (which have no snippet) or an element failing contrast in different colors.
+    """
+    return hashlib.sha1(f"{issue_type}\n{description or ''}\n{snippet_hash(snippet)}".encode()).hexdigest()
+
+
+def get_ai_settings():
+    """Model, endpoint and throughput limits from site config."""
+    return frappe._dict(
+        api_key=frappe.conf.get("openai_api_key"),
+        base_url=frappe.conf.get("openai_base_url"),
+        model=frappe.conf.get("ai_model") or DEFAULT_MODEL,
+        batch_size=cint(frappe.conf.get("ai_batch_size")) or DEFAULT_BATCH_SIZE,
+        concurrency=cint(frappe.conf.get("ai_concurrency")) or DEFAULT_CONCURRENCY,
+        requests_per_minute=flt(frappe.conf.get("ai_requests_per_minute")) or DEFAULT_REQUESTS_PER_MINUTE,
+        timeout=flt(frappe.conf.get("ai_request_timeout")) or DEFAULT_TIMEOUT
+    )
+
+
+def suggestions_enabled():
+    """Suggestions run after every completed scan when an API key is set, unless `ai_suggestions_on_scan` is 0."""
+    return bool(frappe.conf.get("openai_api_key")) and bool(cint(frappe.conf.get("ai_suggestions_on_scan", 1)))
+
+
+def group_issues(issues):
+    """Group issue rows (dicts with name, issue_type, html_snippet, ...) by suggestion key.
+
+    Returns {key: (SuggestionRequest, [issue names])}.
+    """
+    groups = {}
+    for issue in issues:
+        key = suggestion_key(issue.get("issue_type"), issue.get("html_snippet"), issue.get("issue_description"))
+        group = groups.get(key)
+        if group is None:
+            groups[key] = group = (SuggestionRequest(
+                key=key,
+                issue_type=issue.get("issue_type"),
+                wcag_criterion=issue.get("wcag_criterion"),
+                description=issue.get("issue_description"),
+                selector=issue.get("element_selector"),
+                snippet=issue.get("html_snippet")
+            ), [])
+        group[1].append(issue.get("name"))
+    return groups
+
+
+class SuggestionClient:
+    """Asks an OpenAI-compatible chat completions API for fixes, many issues per request.
+
+    Batches run concurrently under a rate limiter. `on_batch(requests, fixes)`
+    is called with the answers of every batch as soon as it completes; failed
+    batches are counted and skipped, so their issues are retried on the next run.
+    With `metrics` (an instrumentation.ScanMetrics), every request is timed as
+    the "ai_request" stage.
+    """
+
+    def __init__(self, settings, client=None, metrics=None):
+        self.settings = settings
+        self._client = client
+        self.metrics = metrics
+        interval = 60.0 / settings.requests_per_minute if settings.requests_per_minute else 0.0
+        self.limiter = HostRateLimiter(max_concurrency=settings.concurrency, min_interval=interval)
+        self._host = site_host(settings.base_url or "https://api.openai.com")
+        self.stats = {
+            "requests": 0,
+            "failed_requests": 0,
+            "suggestions": 0,
+            "prompt_tokens": 0,
+            "completion_tokens": 0,
+            "errors": []
+        }
+
+    def run(self, requests, on_batch=None):
+        return asyncio.run(self.suggest(requests, on_batch))
+
+    async def suggest(self, requests, on_batch=None):
+        """Return {key: fix} for the requests the model answered."""
+        size = self.settings.batch_size
+        batches = [requests[start:start + size] for start in range(0, len(requests), size)]
+        if not batches:
+            return {}
+
+        client = self._client or AsyncOpenAI(
+            api_key=self.settings.api_key,
+            base_url=self.settings.base_url,
+            timeout=self.settings.timeout,
+            max_retries=DEFAULT_MAX_RETRIES
+        )
+        try:
+            results = await asyncio.gather(*(self._complete(client, batch, on_batch) for batch in batches))
+        finally:
+            if self._client is None:
+                await client.close()
+
+        fixes = {}
+        for result in results:
+            fixes.update(result)
+        return fixes
+
+    async def _complete(self, client, batch, on_batch):
+        # Batch positions are shorter than cache keys and cost fewer prompt tokens
+        items = [
+            {
+                "id": str(index),
+                "issue": request.issue_type,
+                "wcag": request.wcag_criterion,
+                "problem": request.description,
+                "selector": request.selector,
+                "html": request.snippet
+            }
+            for index, request in enumerate(batch)
+        ]
+        async with self.limiter.slot(self._host):
+            self.stats["requests"] += 1
+            started = time.perf_counter()
+            try:
+                response = await client.chat.completions.create(
+                    model=self.settings.model,
+                    messages=[
+                        {"role": "system", "content": SYSTEM_PROMPT},
+                        {"role": "user", "content": json.dumps(items, separators=(",", ":"))}
+                    ],
+                    response_format={"type": "json_object"},
+                    temperature=0
+                )
+                answers = json.loads(response.choices[0].message.content or "{}").get("suggestions") or []
+            except (OpenAIError, ValueError, AttributeError) as e:
+                self._failed(e)
+                return {}
+            finally:
+                if self.metrics is not None:
+                    self.metrics.observe("ai_request", time.perf_counter() - started)
+
+        if response.usage:
+            self.stats["prompt_tokens"] += response.usage.prompt_tokens or 0
+            self.stats["completion_tokens"] += response.usage.completion_tokens or 0
+
+        fixes = {}
+        for answer in answers:
+            if not isinstance(answer, dict) or not str(answer.get("id", "")).isdigit():
+                continue
+            index = int(answer["id"])
+            fix = str(answer.get("fix") or "").strip()
+            if index < len(batch) and fix:
+                fixes[batch[index].key] = fix
+        self.stats["suggestions"] += len(fixes)
+        if on_batch and fixes:
+            on_batch(batch, fixes)
+        return fixes
+
+    def _failed(self, error):
+        self.stats["failed_requests"] += 1
+        if len(self.stats["errors"]) < MAX_ERRORS_KEPT:
+            self.stats["errors"].append(str(error))
+
+
+def cached_suggestions(keys):
+    """Cached fixes for the given suggestion keys as {key: fix}."""
+    found = {}
+    for start in range(0, len(keys), LOOKUP_CHUNK_SIZE):
+        found.update(frappe.get_all(
+            SUGGESTION_DOCTYPE,
+            filters={"name": ["in", keys[start:start + LOOKUP_CHUNK_SIZE]]},
+            fields=["name", "suggestion"],
+            as_list=True
+        ))
+    return found
+
+
+def store_suggestions(requests, fixes, model):
+    """Cache fixes; keys that another job cached in the meantime are left alone."""
+    timestamp = now()
+    user = frappe.session.user
+    rows = [
+        (request.key, user, timestamp, timestamp, user, 0, request.issue_type, snippet_hash(request.snippet),
+         model, request.wcag_criterion, request.snippet, fixes[request.key])
+        for request in requests if request.key in fixes
+    ]
+    if rows:
+        frappe.db.bulk_insert(SUGGESTION_DOCTYPE, SUGGESTION_FIELDS, rows, ignore_duplicates=True)
+
+
+def apply_suggestions(groups, fixes):
+    """Write each fix to every issue of its group."""
+    Issue = frappe.qb.DocType("Accessibility Issue")
+    for key, fix in fixes.items():
+        names = groups[key][1]
+        for start in range(0, len(names), LOOKUP_CHUNK_SIZE):
+            (
+                frappe.qb.update(Issue)
+                .set(Issue.ai_suggested_fix, fix)
+                .where(Issue.name.isin(names[start:start + LOOKUP_CHUNK_SIZE]))
+            ).run()
+
+
+def generate_ai_suggestions(scan_id, settings=None):
+    """Fill `ai_suggested_fix` on the open issues of a scan from the cache and the model."""
+    settings = settings or get_ai_settings()
+    issues = frappe.get_all(
+        "Accessibility Issue",
+        filters={"website_scan": scan_id, "fix_applied": 0},
+        fields=["name", "issue_type", "wcag_criterion", "issue_description", "element_selector", "html_snippet"]
+    )
+    groups = group_issues(issues)
+    fixes = cached_suggestions(list(groups))
+    cached = len(fixes)
+    apply_suggestions(groups, fixes)
+    frappe.db.commit()
+
+    misses = [request for key, (request, _names) in groups.items() if key not in fixes]
+    metrics = ScanMetrics()
+    client = SuggestionClient(settings, metrics=metrics)
+    if misses and settings.api_key:
+        def save_batch(batch, batch_fixes):
+            store_suggestions(batch, batch_fixes, settings.model)
+            apply_suggestions(groups, batch_fixes)
+            frappe.db.commit()
+
+        client.run(misses, on_batch=save_batch)
+        if client.stats["failed_requests"]:
+            frappe.log_error(
+                f"AI suggestions for scan {scan_id}: {client.stats['failed_requests']} of "
+                f"{client.stats['requests']} requests failed: {client.stats['errors']}"
+            )
+
+    metrics.count("ai_cached_suggestions", cached)
+    for key in ("requests", "failed_requests", "suggestions", "prompt_tokens", "completion_tokens"):
+        metrics.count(f"ai_{key}", client.stats[key])
+    record_scan_metrics(scan_id, metrics)
+    frappe.db.commit()
+
+    clear_report_cache(scan_id)
+    result = {"scan_id": scan_id, "issues": len(issues), "unique": len(groups), "cached": cached}
+    result.update({key: value for key, value in client.stats.items() if key != "errors"})
+    return result
+
+
+def enqueue_ai_suggestions(scan_id):
+    frappe.enqueue(
+        "accessibility_compliance.accessibility_compliance.ai_analyzer.generate_ai_suggestions",
+        scan_id=scan_id,
+        queue="long",
+        timeout=1800,
+        job_id=f"accessibility_ai_suggestions::{scan_id}",
+        deduplicate=True
+    )
@@ -0,0 +1,140 @@
+# accessibility_compliance/accessibility_compliance/analysis_pool.py
+"""Multi-process static page analysis.
+
+Parsing and rule evaluation are CPU-bound and hold the GIL, so a scan that
+analyzes pages on its event loop uses a single core. The pool runs the static
+pass in worker processes instead: the crawler keeps fetching on the event
+loop while up to `workers` pages are analyzed in parallel, and each page's
+issues come back to the awaiting coroutine, which hands them to the issue
+writer as before.
+
+Every worker builds its rule engine once, when it starts, from the level,
+rule classes, options and stylesheet cache settings of the scan's engine. A page crosses the process
+boundary as its raw bytes and returns as a list of Issue records.
+"""
+import asyncio
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from accessibility_compliance.accessibility_compliance.renderer import analyze_static
+from accessibility_compliance.accessibility_compliance.rules import RuleEngine, merge_timings
+
+# Several scan jobs can share a worker host; each starts at most this many processes unless configured
+MAX_DEFAULT_WORKERS = 4
+# Below this page budget a scan analyzes in its own process, as starting the workers costs more than it saves
+DEFAULT_MIN_PAGES = 200
+
+# The engine of the current worker process
+_worker_engine = None
+
+
+def default_workers():
+    return min(os.cpu_count() or 1, MAX_DEFAULT_WORKERS)
+
+
+def _start_method():
+    # Workers must not inherit the scan's database connection, event loop or browser threads
+    return "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+
+
+def _init_worker(wcag_level, rules, options, stream_threshold, stylesheets, rule_sample_every):
+    global _worker_engine
+    _worker_engine = RuleEngine(wcag_level, rules=rules, options=options, stream_threshold=stream_threshold,
+                                stylesheets=stylesheets, rule_sample_every=rule_sample_every)
+
+
+def _analyze_in_worker(url, body, rendered, detect_script_rendered):
+    started = time.perf_counter()
+    result = analyze_static(_worker_engine, url, body, rendered=rendered, detect_script_rendered=detect_script_rendered)
+    return result, time.perf_counter() - started, _worker_engine.take_timings()
+
+
+class AnalysisPool:
+    """Runs `renderer.analyze_static` for a rule engine in a pool of worker processes.
+
+    A worker that dies (for example killed for memory on a huge page) breaks
+    the executor; the pool is then restarted and the page is analyzed in the
+    calling process, so no page is lost.
+    """
+
+    def __init__(self, engine, workers=None):
+        self.engine = engine
+        self.workers = max(1, workers or default_workers())
+        self.pages = 0
+        self.restarts = 0
+        self.analysis_time = 0.0
+        self._timings = {}
+        self._executor = None
+
+    def start(self):
+        """Start the worker processes; called on first use if not called before."""
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context(_start_method()),
+                initializer=_init_worker,
+                initargs=(
+                    self.engine.wcag_level,
+                    self.engine.rule_classes,
+                    self.engine.options,
+                    self.engine.stream_threshold,
+                    # Crosses as its settings: every worker fills a stylesheet cache of its own
+                    self.engine.stylesheets,
+                    self.engine.rule_sample_every
+                )
+            )
+        return self
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.close()
+
+    async def analyze(self, url, body, rendered=False, detect_script_rendered=False):
+        """The result of `analyze_static` for one page, computed in a worker process."""
+        self.start()
+        loop = asyncio.get_running_loop()
+        executor = self._executor
+        try:
+            result, elapsed, timings = await loop.run_in_executor(
+                executor, _analyze_in_worker, url, body, rendered, detect_script_rendered
+            )
+            merge_timings(self._timings, timings)
+        except BrokenProcessPool:
+            self._restart(executor)
+            started = time.perf_counter()
+            result = analyze_static(self.engine, url, body, rendered=rendered,
+                                    detect_script_rendered=detect_script_rendered)
+            elapsed = time.perf_counter() - started
+        self.pages += 1
+        self.analysis_time += elapsed
+        return result
+
+    def _restart(self, broken):
+        # Concurrent pages fail together; only the first of them replaces the executor
+        if self._executor is broken:
+            self.restarts += 1
+            broken.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def take_timings(self):
+        """Parse and sampled rule time of the workers since the previous call, like `RuleEngine.take_timings`."""
+        timings, self._timings = self._timings, {}
+        return timings or None
+
+    def report(self):
+        return {
+            "analysis_workers": self.workers,
+            "analysis_pages": self.pages,
+            "analysis_s": round(self.analysis_time, 3),
+            "analysis_restarts": self.restarts
+        }
@@ -4,9 +4,24 @@ from frappe import _
 import json
 from frappe.utils import cint, flt, nowdate, now
 
+from accessibility_compliance.accessibility_compliance.ai_analyzer import enqueue_ai_suggestions
+from accessibility_compliance.accessibility_compliance.batch_check import check_pages_batch
+from accessibility_compliance.accessibility_compliance.dashboard import get_dashboard_statistics
+from accessibility_compliance.accessibility_compliance.fixes import apply_fixes
+from accessibility_compliance.accessibility_compliance.http_client import get_http_cache_stats
+from accessibility_compliance.accessibility_compliance.instrumentation import load_scan_metrics, prometheus_response
+from accessibility_compliance.accessibility_compliance.scan_report import (
+    get_page_counts,
+    get_report_page,
+    stream_issues_response
+)
+from accessibility_compliance.accessibility_compliance.scan_status import get_scan_status as get_cached_scan_status
+from accessibility_compliance.accessibility_compliance.scanner import enqueue_scan
+from accessibility_compliance.accessibility_compliance.scheduler import get_scheduler_metrics
+
 @frappe.whitelist()
-def start_website_scan(website_url, wcag_level="AA", scan_depth=3, include_subdomains=False):
-    """API endpoint to start a website accessibility scan."""
+def start_website_scan(website_url, wcag_level="AA", scan_depth=3, include_subdomains=False, profile=False):
+    """API endpoint to start a website accessibility scan; `profile` runs it under cProfile."""
     try:
         # Validate URL
         if not website_url.startswith(('http://', 'https://')):
@@ -22,12 +37,7 @@ def start_website_scan(website_url, wcag_level="AA", scan_depth=3, include_subdo
         scan_doc.insert()
         
         # Start background scan
-        frappe.enqueue(
-            'accessibility_compliance.accessibility_compliance.scanner.run_accessibility_scan',
-            scan_id=scan_doc.name,
-            queue='long',
-            timeout=1800  # 30 minutes
-        )
+        enqueue_scan(scan_doc.name, profile=cint(profile) or None)
         
         return {
             "success": True,
@@ -46,139 +56,51 @@ def start_website_scan(website_url, wcag_level="AA", scan_depth=3, include_subdo
 def get_scan_status(scan_id):
     """Get the status of a website scan."""
     try:
-        scan = frappe.get_doc("Website Scan", scan_id)
-        
-        # Get issues summary
-        issues_summary = {
-            "critical": frappe.db.count("Accessibility Issue", {
-                "website_scan": scan_id,
-                "severity": "Critical"
-            }),
-            "major": frappe.db.count("Accessibility Issue", {
-                "website_scan": scan_id,
-                "severity": "Major"
-            }),
-            "minor": frappe.db.count("Accessibility Issue", {
-                "website_scan": scan_id,
-                "severity": "Minor"
-            })
-        }
-        
-        # Calculate progress
-        progress = 10 if scan.scan_status == "Pending" else \
-                  50 if scan.scan_status == "In Progress" else \
-                  100 if scan.scan_status == "Completed" else 0
-        
-        return {
-            "scan_id": scan_id,
-            "status": scan.scan_status,
-            "compliance_score": scan.compliance_score or 0,
-            "total_pages_scanned": scan.total_pages_scanned or 0,
-            "total_issues": scan.total_issues or 0,
-            "last_scan_date": scan.last_scan_date,
-            "issues_summary": issues_summary,
-            "progress": progress
-        }
+        return get_cached_scan_status(scan_id)
         
     except Exception as e:
         frappe.log_error(f"Failed to get scan status: {str(e)}")
         return {"error": str(e)}
 
 @frappe.whitelist()
-def get_scan_report(scan_id, include_suggestions=True):
-    """Get detailed scan report with AI suggestions."""
+def get_scan_report(scan_id, include_suggestions=True, page_url=None, severity=None,
+                    cursor=None, limit=500, fields=None):
+    """Get one page of the scan report with AI suggestions.
+    
+    Pass the returned `next_cursor` back as `cursor` to fetch the next page.
+    """
     try:
-        scan = frappe.get_doc("Website Scan", scan_id)
-        
-        # Get all issues
-        issues = frappe.get_all("Accessibility Issue",
-                               filters={"website_scan": scan_id},
-                               fields=["*"],
-                               order_by="severity desc, issue_type")
-        
-        # Group issues by page
-        pages_data = {}
-        for issue in issues:
-            page_url = issue.page_url or scan.website_url
-            if page_url not in pages_data:
-                pages_data[page_url] = {
-                    "url": page_url,
-                    "issues": [],
-                    "critical_count": 0,
-                    "major_count": 0,
-                    "minor_count": 0
-                }
-            
-            pages_data[page_url]["issues"].append({
-                "id": issue.name,
-                "type": issue.issue_type,
-                "severity": issue.severity,
-                "description": issue.issue_description,
-                "wcag_criterion": issue.wcag_criterion,
-                "element_selector": issue.element_selector,
-                "ai_suggested_fix": issue.ai_suggested_fix,
-                "auto_fixable": issue.auto_fixable,
-                "status": issue.status
-            })
-            
-            # Update counts
-            if issue.severity == "Critical":
-                pages_data[page_url]["critical_count"] += 1
-            elif issue.severity == "Major":
-                pages_data[page_url]["major_count"] += 1
-            elif issue.severity == "Minor":
-                pages_data[page_url]["minor_count"] += 1
-        
-        return {
-            "scan_summary": {
-                "scan_id": scan_id,
-                "website_url": scan.website_url,
-                "compliance_score": scan.compliance_score or 0,
-                "total_issues": scan.total_issues or 0,
-                "total_pages": scan.total_pages_scanned or 1,
-                "wcag_level": scan.wcag_level,
-                "scan_date": scan.last_scan_date
-            },
-            "pages": list(pages_data.values()),
-            "ai_insights": json.loads(scan.remediation_suggestions or "{}") if include_suggestions else None
-        }
+        return get_report_page(scan_id, include_suggestions=include_suggestions,
+                               page_url=page_url, severity=severity,
+                               cursor=cursor, limit=limit, fields=fields)
         
     except Exception as e:
         frappe.log_error(f"Failed to get scan report: {str(e)}")
         return {"error": str(e)}
 
 @frappe.whitelist()
-def apply_auto_fixes(scan_id, issue_ids=None):
-    """Apply automated fixes for accessibility issues."""
+def get_scan_pages(scan_id, after_url=None, limit=100):
+    """Per-page issue counts for a scan, paginated by page URL."""
     try:
-        filters = {
-            "website_scan": scan_id,
-            "auto_fixable": 1,
-            "fix_applied": 0
-        }
+        limit = min(cint(limit) or 100, 1000)
+        return get_page_counts(scan_id, after_url=after_url, limit=limit)
         
-        if issue_ids:
-            issue_ids = json.loads(issue_ids) if isinstance(issue_ids, str) else issue_ids
-            filters["name"] = ["in", issue_ids]
-        
-        issues = frappe.get_all("Accessibility Issue",
-                               filters=filters,
-                               fields=["*"])
-        
-        fixes_applied = []
-        
-        for issue in issues:
-            try:
-                # Update issue status
-                issue_doc = frappe.get_doc("Accessibility Issue", issue.name)
-                issue_doc.fix_applied = 1
-                issue_doc.fix_date = now()
-                issue_doc.status = "Fixed"
-                issue_doc.developer_notes = "Automatically fixed by AI system"
-                issue_doc.save()
-                fixes_applied.append(issue.name)
-            except Exception as e:
-                frappe.log_error(f"Failed to fix issue {issue.name}: {str(e)}")
+    except Exception as e:
+        frappe.log_error(f"Failed to get scan pages: {str(e)}")
+        return {"error": str(e)}
+
+@frappe.whitelist()
+def export_scan_issues(scan_id, format="ndjson", fields=None, page_url=None, severity=None):
+    """Stream every issue of a scan as NDJSON (default) or a chunked JSON array."""
+    frappe.has_permission("Website Scan", doc=scan_id, throw=True)
+    return stream_issues_response(scan_id, fields=fields, page_url=page_url,
+                                  severity=severity, fmt="json" if format == "json" else "ndjson")
+
+@frappe.whitelist()
+def apply_auto_fixes(scan_id, issue_ids=None, fix_types=None):
+    """Apply automated fixes for accessibility issues."""
+    try:
+        fixes_applied = apply_fixes(scan_id, issue_ids=issue_ids, fix_types=fix_types)
         
         return {
             "success": True,
@@ -191,54 +113,59 @@ def apply_auto_fixes(scan_id, issue_ids=None):
         return {"error": str(e)}
 
 @frappe.whitelist()
-def check_single_page(page_url, wcag_level="AA"):
-    """Quick scan of a single page for accessibility issues."""
+def generate_ai_suggestions(scan_id):
+    """Queue AI fix suggestions for the open issues of a scan."""
     try:
-        # For demo purposes, return mock data
-        # In production, this would use the scanner module
-        
-        issues = [
-            {
-                "type": "Missing Alt Text",
-                "severity": "Major",
-                "description": "Image missing alternative text",
-                "wcag_criterion": "1.1.1",
-                "auto_fixable": True,
-                "ai_suggested_fix": "Add descriptive alt text that explains the image content and purpose."
-            },
-            {
-                "type": "Poor Color Contrast",
-                "severity": "Major", 
-                "description": "Text color contrast ratio is below WCAG standards",
-                "wcag_criterion": "1.4.3",
-                "auto_fixable": True,
-                "ai_suggested_fix": "Increase color contrast by darkening text or lightening background."
-            }
-        ]
-        
-        # Calculate quick score
-        critical_count = len([i for i in issues if i.get("severity") == "Critical"])
-        major_count = len([i for i in issues if i.get("severity") == "Major"])
-        minor_count = len([i for i in issues if i.get("severity") == "Minor"])
-        
-        score = max(0, 100 - (critical_count * 10) - (major_count * 5) - (minor_count * 2))
-        
+        frappe.has_permission("Website Scan", doc=scan_id, throw=True)
+        enqueue_ai_suggestions(scan_id)
+
         return {
-            "page_url": page_url,
-            "compliance_score": score,
-            "total_issues": len(issues),
-            "issues_breakdown": {
-                "critical": critical_count,
-                "major": major_count,
-                "minor": minor_count
-            },
-            "issues": issues
+            "success": True,
+            "message": "AI suggestions queued"
         }
+
+    except Exception as e:
+        frappe.log_error(f"Failed to queue AI suggestions: {str(e)}")
+        return {"error": str(e)}
+
+@frappe.whitelist()
+def check_single_page(page_url, wcag_level="AA"):
+    """Quick scan of a single page for accessibility issues.
+    
+    The page is fetched like one of a `check_pages` batch: from the server,
+    public hosts only and size-capped, so it needs the same permission.
+    """
+    frappe.has_permission("Website Scan", "create", throw=True)
+    try:
+        if not (page_url or "").strip():
+            frappe.throw(_("Page URL is required"))
+        result = check_pages_batch([page_url], wcag_level)["results"][0]
+        if result.pop("status") != "ok":
+            return {"error": result["error"]}
+        return result
         
     except Exception as e:
         frappe.log_error(f"Failed to scan single page: {str(e)}")
         return {"error": str(e)}
 
+@frappe.whitelist()
+def check_pages(page_urls, wcag_level="AA", deadline=None):
+    """Check a list of pages concurrently and return each page's issues.
+    
+    `page_urls` is a list or a JSON array. Pages not finished within the
+    deadline (seconds) are returned with `status: "timeout"`. The pages are
+    fetched from the server, so this needs permission to create a Website Scan.
+    """
+    frappe.has_permission("Website Scan", "create", throw=True)
+    try:
+        if isinstance(page_urls, str):
+            page_urls = json.loads(page_urls) if page_urls.strip().startswith("[") else page_urls.split()
+        return check_pages_batch(page_urls, wcag_level, deadline=deadline)
+        
+    except Exception as e:
+        frappe.log_error(f"Failed to check pages: {str(e)}")
+        return {"error": str(e)}
+
 @frappe.whitelist()
 def get_compliance_dashboard():
     """Get dashboard data for compliance overview."""
@@ -250,36 +177,52 @@ def get_compliance_dashboard():
                                      order_by="creation desc",
                                      limit=10)
         
-        # Get overall statistics
-        total_scans = frappe.db.count("Website Scan")
-        avg_compliance = frappe.db.sql("""
-            SELECT AVG(compliance_score) as avg_score 
-            FROM `tabWebsite Scan` 
-            WHERE scan_status = 'Completed' AND compliance_score IS NOT NULL
-        """)[0][0] or 0
-        
-        total_issues_fixed = frappe.db.count("Accessibility Issue", {"fix_applied": 1})
-        
-        # Get issue type distribution
-        issue_types = frappe.db.sql("""
-            SELECT issue_type, COUNT(*) as count
-            FROM `tabAccessibility Issue`
-            WHERE issue_type IS NOT NULL
-            GROUP BY issue_type
-            ORDER BY count DESC
-            LIMIT 10
-        """, as_dict=True)
-        
+        # Totals come from the materialized rollup instead of scanning the issue table
+        dashboard = get_dashboard_statistics()
+
         return {
             "recent_scans": recent_scans,
-            "statistics": {
-                "total_scans": total_scans,
-                "average_compliance": round(avg_compliance, 1),
-                "total_issues_fixed": total_issues_fixed
-            },
-            "issue_type_distribution": issue_types
+            "statistics": dashboard["statistics"],
+            "issue_type_distribution": dashboard["issue_type_distribution"]
         }
-        
+
     except Exception as e:
         frappe.log_error(f"Failed to get dashboard data: {str(e)}")
-        return {"error": str(e)}
\ No newline at end of file
+        return {"error": str(e)}
+
+@frappe.whitelist()
+def get_scheduled_scan_metrics():
+    """Queue depth, dispatch lag and running scheduled scans."""
+    try:
+        return get_scheduler_metrics()
+
+    except Exception as e:
+        frappe.log_error(f"Failed to get scheduled scan metrics: {str(e)}")
+        return {"error": str(e)}
+
+@frappe.whitelist()
+def get_http_cache_statistics():
+    """Entries, hit counts and bytes saved by the shared HTTP response cache."""
+    try:
+        return get_http_cache_stats()
+
+    except Exception as e:
+        frappe.log_error(f"Failed to get HTTP cache statistics: {str(e)}")
+        return {"error": str(e)}
+
+@frappe.whitelist()
+def get_scan_metrics(scan_id):
+    """Stage percentiles, counters, per-rule timings and profiles recorded for a scan."""
+    try:
+        frappe.has_permission("Website Scan", doc=scan_id, throw=True)
+        return load_scan_metrics(scan_id).summary()
+
+    except Exception as e:
+        frappe.log_error(f"Failed to get scan metrics: {str(e)}")
+        return {"error": str(e)}
+
+@frappe.whitelist()
+def get_metrics():
+    """Site-wide scan metrics for Prometheus to scrape, in its text exposition format."""
+    frappe.has_permission("Website Scan", throw=True)
+    return prometheus_response()
@@ -0,0 +1,212 @@
+# accessibility_compliance/accessibility_compliance/batch_check.py
+"""Synchronous accessibility checks of many URLs in one call.
+
+A batch shares one aiohttp session, so connections to the same host are
+reused across its pages, one rule engine, and the on-disk response cache.
+Up to `concurrency` pages are fetched at once on the event loop while
+finished pages are analyzed on a thread pool, so a batch takes about as long
+as its slowest page rather than the sum of all of them. Pages still running
+when the deadline passes are cancelled and reported as timed out next to the
+results that did finish.
+
+Only public hosts are fetched: a URL whose host is or resolves to a private,
+loopback, link-local or otherwise non-public address is reported as an error,
+and so is a redirect to one. The stylesheets a page links are not fetched,
+as they would be requested outside those checks.
+"""
+import asyncio
+import ipaddress
+import socket
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urljoin, urlparse
+
+import aiohttp
+import frappe
+from frappe.utils import cint, flt
+
+from accessibility_compliance.accessibility_compliance.crawler import (
+    ACCEPT_ENCODING,
+    DEFAULT_USER_AGENT,
+    MAX_BODY_BYTES
+)
+from accessibility_compliance.accessibility_compliance.http_client import fetch_cached, get_response_cache
+from accessibility_compliance.accessibility_compliance.rules import calculate_compliance_score, summarize_issues
+from accessibility_compliance.accessibility_compliance.scanner import get_rule_engine
+
+DEFAULT_BATCH_CONCURRENCY = 100
+DEFAULT_BATCH_DEADLINE = 30
+MAX_BATCH_URLS = 500
+
+
+def normalize_page_url(page_url):
+    page_url = (page_url or "").strip()
+    if not page_url.startswith(("http://", "https://")):
+        page_url = "https://" + page_url
+    return page_url
+
+
+def is_public_address(address):
+    """Whether an IP address is publicly routable (not private, loopback, link-local, reserved, ...)."""
+    ip = ipaddress.ip_address(address.split("%")[0])
+    if ip.version == 6 and ip.ipv4_mapped:
+        ip = ip.ipv4_mapped
+    return ip.is_global
+
+
+def _literal_address(host):
+    try:
+        return ipaddress.ip_address(host.strip("[]"))
+    except ValueError:
+        return None
+
+
+def check_literal_host(url):
+    """Raise ValueError if the host of `url` is an IP address that is not public; names are checked as they resolve."""
+    host = urlparse(url).hostname
+    if not host:
+        raise ValueError(f"No host in {url}")
+    address = _literal_address(host)
+    if address is not None and not is_public_address(str(address)):
+        raise ValueError(f"{host} is not a public address")
+    return host
+
+
+async def check_public_url(url):
+    """Raise ValueError unless every address the host of `url` resolves to is public."""
+    host = check_literal_host(url)
+    if _literal_address(host) is None:
+        infos = await asyncio.get_running_loop().getaddrinfo(host, None, type=socket.SOCK_STREAM)
+        if not all(is_public_address(info[4][0]) for info in infos):
+            raise ValueError(f"{host} does not resolve to a public address")
+
+
+class PublicResolver(aiohttp.ThreadedResolver):
+    """Resolves host names to their public addresses only, so a name cannot be re-pointed inside the network."""
+
+    async def resolve(self, host, port=0, family=socket.AF_INET):
+        addresses = [
+            address for address in await super().resolve(host, port, family)
+            if is_public_address(address["host"])
+        ]
+        if not addresses:
+            raise OSError(0, f"{host} does not resolve to a public address")
+        return addresses
+
+
+async def _check_redirect(session, context, params):
+    # Redirects to host names go through PublicResolver; IP literals never reach a resolver
+    location = params.response.headers.get("Location")
+    if location:
+        check_literal_host(urljoin(str(params.url), location))
+
+
+def page_result(page_url, found):
+    """The API response for the issues found on one page."""
+    counts = summarize_issues(found)
+    return {
+        "page_url": page_url,
+        "compliance_score": calculate_compliance_score(counts["critical"], counts["major"], counts["minor"]),
+        "total_issues": len(found),
+        "issues_breakdown": {
+            "critical": counts["critical"],
+            "major": counts["major"],
+            "minor": counts["minor"]
+        },
+        "issues": [issue.as_api_dict() for issue in found]
+    }
+
+
+async def _check_page(session, engine, executor, page_url, cache, max_bytes):
+    response = await fetch_cached(session, page_url, cache=cache, max_bytes=max_bytes)
+    response.raise_for_status()
+    loop = asyncio.get_running_loop()
+    found = await loop.run_in_executor(executor, engine.analyze, response.content, response.url)
+    return {"status": "ok", **page_result(page_url, found)}
+
+
+async def check_pages(urls, engine, concurrency=DEFAULT_BATCH_CONCURRENCY, deadline=DEFAULT_BATCH_DEADLINE,
+                      cache=None, max_bytes=MAX_BODY_BYTES, user_agent=DEFAULT_USER_AGENT):
+    """Check `urls` concurrently and return one result per URL, in order.
+
+    Each result carries a `status`: "ok" with the page's issues, "error" with
+    the reason the page could not be fetched, or "timeout" if it was still
+    running `deadline` seconds after the batch started.
+    """
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+    connector = aiohttp.TCPConnector(limit=max(1, concurrency), ttl_dns_cache=300, enable_cleanup_closed=True,
+                                     resolver=PublicResolver())
+    redirects = aiohttp.TraceConfig()
+    redirects.on_request_redirect.append(_check_redirect)
+    headers = {
+        "User-Agent": user_agent,
+        "Accept": "text/html,application/xhtml+xml",
+        "Accept-Encoding": ACCEPT_ENCODING
+    }
+    executor = ThreadPoolExecutor(max_workers=max(1, min(concurrency, 8)), thread_name_prefix="batch-check")
+
+    async def check(page_url):
+        async with semaphore:
+            try:
+                # Before the response cache is consulted, so nothing cached for an internal host is served either
+                await check_public_url(page_url)
+                return await _check_page(session, engine, executor, page_url, cache, max_bytes)
+            except Exception as e:
+                return {"page_url": page_url, "status": "error", "error": str(e) or type(e).__name__}
+
+    try:
+        async with aiohttp.ClientSession(connector=connector, headers=headers, trace_configs=[redirects]) as session:
+            tasks = [asyncio.create_task(check(page_url)) for page_url in urls]
+            if tasks:
+                await asyncio.wait(tasks, timeout=deadline)
+            results = []
+            for page_url, task in zip(urls, tasks):
+                if task.done():
+                    results.append(task.result())
+                else:
+                    task.cancel()
+                    results.append({"page_url": page_url, "status": "timeout",
+                                    "error": f"Not finished within {deadline} seconds"})
+            await asyncio.gather(*tasks, return_exceptions=True)
+            return results
+    finally:
+        # Analyses of timed-out pages may still be running; they finish without blocking the response
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+def get_batch_settings():
+    return frappe._dict(
+        concurrency=cint(frappe.conf.get("batch_check_concurrency")) or DEFAULT_BATCH_CONCURRENCY,
+        deadline=flt(frappe.conf.get("batch_check_deadline")) or DEFAULT_BATCH_DEADLINE,
+        max_urls=cint(frappe.conf.get("batch_check_max_urls")) or MAX_BATCH_URLS,
+        max_bytes=cint(frappe.conf.get("scan_max_page_bytes")) or MAX_BODY_BYTES
+    )
+
+
+def check_pages_batch(urls, wcag_level="AA", deadline=None):
+    """Check a list of page URLs within a deadline and summarize the batch."""
+    settings = get_batch_settings()
+    urls = list(dict.fromkeys(normalize_page_url(url) for url in urls if url and url.strip()))
+    if len(urls) > settings.max_urls:
+        frappe.throw(f"At most {settings.max_urls} URLs can be checked in one batch")
+    deadline = min(flt(deadline) or settings.deadline, settings.deadline)
+
+    started = time.perf_counter()
+    results = asyncio.run(check_pages(
+        urls,
+        get_rule_engine(wcag_level, linked_stylesheets=False),
+        concurrency=settings.concurrency,
+        deadline=deadline,
+        cache=get_response_cache(),
+        max_bytes=settings.max_bytes
+    ))
+    statuses = [result["status"] for result in results]
+    return {
+        "total_urls": len(urls),
+        "checked": statuses.count("ok"),
+        "failed": statuses.count("error"),
+        "timed_out": statuses.count("timeout"),
+        "total_issues": sum(result.get("total_issues", 0) for result in results),
+        "duration_s": round(time.perf_counter() - started, 3),
+        "results": results
+    }
@@ -0,0 +1,118 @@
+# accessibility_compliance/accessibility_compliance/benchmarks/bench_ai_suggestions.py
+"""AI fix suggestions: one request per issue vs grouped, batched, concurrent requests.
+
+Runs the suggestion client against the local mock model server, so no API key
+or network is needed. The per-issue baseline runs over a small slice and is
+extrapolated; the pipeline run groups every issue by suggestion key first.
+
+Usage:
+    python -m accessibility_compliance.accessibility_compliance.benchmarks.bench_ai_suggestions --issues 20000
+"""
+import argparse
+import json
+import random
+import time
+
+import frappe
+
+from accessibility_compliance.accessibility_compliance.ai_analyzer import SuggestionClient, group_issues
+from accessibility_compliance.accessibility_compliance.benchmarks.mock_model_server import MockModelServer
+from accessibility_compliance.accessibility_compliance.benchmarks.synthetic_site import SiteServer
+
+ISSUE_TYPES = (
+    ("Missing Alt Text", "1.1.1", "img"),
+    ("Missing Form Label", "1.3.1", "input"),
+    ("Empty Link", "2.4.4", "a"),
+    ("Poor Color Contrast", "1.4.3", "span")
+)
+
+
+def synthetic_issues(count, unique, seed=11):
+    """`count` issue rows drawn from `unique` distinct (issue type, snippet) pairs."""
+    rng = random.Random(seed)
+    for index in range(count):
+        variant = rng.randrange(unique)
+        issue_type, criterion, tag = ISSUE_TYPES[variant % len(ISSUE_TYPES)]
+        yield {
+            "name": f"bench-{index}",
+            "issue_type": issue_type,
+            "wcag_criterion": criterion,
+            "issue_description": f"{issue_type} detected",
+            "element_selector": f"main > {tag}:nth-of-type({variant % 7 + 1})",
+            "html_snippet": f'<{tag} class="c{variant}" src="/assets/{variant}.png">'
+        }
+
+
+def run_client(base_url, requests, batch_size, concurrency, requests_per_minute):
+    settings = frappe._dict(
+        api_key="mock",
+        base_url=base_url,
+        model="mock-model",
+        batch_size=batch_size,
+        concurrency=concurrency,
+        requests_per_minute=requests_per_minute,
+        timeout=30
+    )
+    client = SuggestionClient(settings)
+    started = time.perf_counter()
+    fixes = client.run(requests)
+    elapsed = time.perf_counter() - started
+    return fixes, elapsed, client.stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--issues", type=int, default=20000)
+    parser.add_argument("--unique", type=int, default=400, help="distinct issue type and snippet pairs")
+    parser.add_argument("--latency", type=float, default=0.5, help="simulated model latency per request (s)")
+    parser.add_argument("--batch-size", type=int, default=20)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--requests-per-minute", type=float, default=600)
+    parser.add_argument("--fail-every", type=int, default=0, help="answer every n-th request with HTTP 429")
+    parser.add_argument("--baseline-issues", type=int, default=20)
+    args = parser.parse_args()
+
+    issues = list(synthetic_issues(args.issues, args.unique))
+    groups = group_issues(issues)
+    requests = [request for request, _names in groups.values()]
+
+    baseline_server = MockModelServer(latency=args.latency)
+    with SiteServer(baseline_server.make_app()) as server:
+        baseline_requests = [group_issues([issue]).popitem()[1][0] for issue in issues[:args.baseline_issues]]
+        _fixes, baseline_elapsed, _stats = run_client(f"{server.base_url}v1", baseline_requests, 1, 1, 0)
+    per_issue = baseline_elapsed / max(len(baseline_requests), 1)
+
+    mock = MockModelServer(latency=args.latency, fail_every=args.fail_every)
+    with SiteServer(mock.make_app()) as server:
+        fixes, elapsed, stats = run_client(
+            f"{server.base_url}v1", requests, args.batch_size, args.concurrency, args.requests_per_minute
+        )
+
+    starts = sorted(mock.request_starts)
+    window = starts[-1] - starts[0] if len(starts) > 1 else 0
+    print(json.dumps({
+        "issues": len(issues),
+        "unique": len(groups),
+        "per_issue_baseline": {
+            "requests": len(issues),
+            "estimated_seconds": round(per_issue * len(issues), 1)
+        },
+        "pipeline": {
+            "requests": stats["requests"],
+            "server_requests": mock.requests,
+            "rejected_and_retried": mock.rejected,
+            "failed_requests": stats["failed_requests"],
+            "suggestions": len(fixes),
+            "issues_covered": sum(len(groups[key][1]) for key in fixes),
+            "seconds": round(elapsed, 2),
+            "peak_in_flight": mock.peak_in_flight,
+            "requests_per_minute": round(len(starts) / window * 60, 1) if window else None,
+            "prompt_tokens": stats["prompt_tokens"],
+            "completion_tokens": stats["completion_tokens"]
+        },
+        "speedup": round(per_issue * len(issues) / elapsed, 1) if elapsed else None
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
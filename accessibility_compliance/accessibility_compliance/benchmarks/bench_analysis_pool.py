@@ -0,0 +1,80 @@
+# accessibility_compliance/accessibility_compliance/benchmarks/bench_analysis_pool.py
+"""Static analysis throughput in-process vs the multi-process analysis pool.
+
+Feeds a corpus of synthetic pages through the same path a scan uses: pages
+are submitted from an event loop with a bounded number in flight, and the
+issues are collected as each page finishes. Reports pages/second and the
+speedup for each pool size.
+
+Usage:
+    python -m accessibility_compliance.accessibility_compliance.benchmarks.bench_analysis_pool --pages 400 --workers 1 2 4 8
+"""
+import argparse
+import asyncio
+import json
+import os
+import time
+
+from accessibility_compliance.accessibility_compliance.analysis_pool import AnalysisPool
+from accessibility_compliance.accessibility_compliance.benchmarks.bench_rules import render_fixture
+from accessibility_compliance.accessibility_compliance.renderer import analyze_static
+from accessibility_compliance.accessibility_compliance.rules import RuleEngine
+
+
+def run_in_process(engine, bodies):
+    started = time.perf_counter()
+    issues = sum(len(analyze_static(engine, f"/page/{index}", body)[0]) for index, body in enumerate(bodies))
+    return issues, time.perf_counter() - started
+
+
+async def run_pool(pool, bodies, in_flight):
+    semaphore = asyncio.Semaphore(in_flight)
+
+    async def analyze(index, body):
+        async with semaphore:
+            return len((await pool.analyze(f"/page/{index}", body))[0])
+
+    counts = await asyncio.gather(*(analyze(index, body) for index, body in enumerate(bodies)))
+    return sum(counts)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", type=int, default=400)
+    parser.add_argument("--sections", type=int, default=400, help="sections per synthetic page")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--wcag-level", default="AA")
+    args = parser.parse_args()
+
+    bodies = [render_fixture(index, args.sections).encode("utf-8") for index in range(args.pages)]
+    engine = RuleEngine(args.wcag_level)
+    issues, baseline = run_in_process(engine, bodies)
+
+    runs = []
+    for workers in args.workers:
+        with AnalysisPool(engine, workers=workers) as pool:
+            # Warm the workers up so process startup is not counted
+            asyncio.run(run_pool(pool, bodies[:workers], workers))
+            started = time.perf_counter()
+            pool_issues = asyncio.run(run_pool(pool, bodies, workers * 2))
+            elapsed = time.perf_counter() - started
+        runs.append({
+            "workers": workers,
+            "seconds": round(elapsed, 2),
+            "pages_per_second": round(len(bodies) / elapsed, 1),
+            "speedup": round(baseline / elapsed, 2),
+            "same_issue_count": pool_issues == issues
+        })
+
+    print(json.dumps({
+        "cpu_count": os.cpu_count(),
+        "pages": len(bodies),
+        "mb": round(sum(len(body) for body in bodies) / (1024 * 1024), 1),
+        "issues": issues,
+        "in_process": {"seconds": round(baseline, 2), "pages_per_second": round(len(bodies) / baseline, 1)},
+        "pool": runs
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+# accessibility_compliance/accessibility_compliance/benchmarks/bench_batch_check.py
+"""Latency of a batch page check: one page at a time vs the concurrent batch.
+
+Serves the synthetic site with a per-page latency and checks the same URLs
+sequentially and as one batch, then once more with a deadline shorter than
+the page latency to show the partial results.
+
+Usage:
+    python -m accessibility_compliance.accessibility_compliance.benchmarks.bench_batch_check --urls 100 --latency 0.3
+"""
+import argparse
+import asyncio
+import json
+import time
+
+from accessibility_compliance.accessibility_compliance.batch_check import DEFAULT_BATCH_CONCURRENCY, check_pages
+from accessibility_compliance.accessibility_compliance.benchmarks.synthetic_site import SiteServer, SyntheticSite
+from accessibility_compliance.accessibility_compliance.rules import RuleEngine
+
+
+def run_batch(urls, engine, concurrency, deadline):
+    started = time.perf_counter()
+    results = asyncio.run(check_pages(urls, engine, concurrency=concurrency, deadline=deadline))
+    statuses = [result["status"] for result in results]
+    return {
+        "seconds": round(time.perf_counter() - started, 2),
+        "ok": statuses.count("ok"),
+        "timeout": statuses.count("timeout"),
+        "error": statuses.count("error")
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--urls", type=int, default=100)
+    parser.add_argument("--latency", type=float, default=0.3, help="seconds the site waits before each page")
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_BATCH_CONCURRENCY)
+    args = parser.parse_args()
+
+    site = SyntheticSite(page_count=args.urls, latency=args.latency)
+    engine = RuleEngine("AA")
+    with SiteServer(site.make_app()) as server:
+        urls = [f"{server.base_url}page/{index}" for index in range(args.urls)]
+        sequential = run_batch(urls, engine, 1, 3600)
+        batched = run_batch(urls, engine, args.concurrency, 3600)
+        past_deadline = run_batch(urls, engine, args.concurrency, args.latency / 2)
+
+    print(json.dumps({
+        "urls": args.urls,
+        "page_latency_s": args.latency,
+        "sequential": sequential,
+        "batch": {**batched, "concurrency": args.concurrency, "speedup": round(sequential["seconds"] / batched["seconds"], 1)},
+        "deadline_shorter_than_a_page": {**past_deadline, "deadline_s": args.latency / 2}
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+# accessibility_compliance/accessibility_compliance/benchmarks/bench_contrast.py
+"""Contrast engine microbenchmark.
+
+Compares the vectorized batch path with a per-pair loop for a page-sized and a
+site-sized set of text nodes.
+
+Usage:
+    python -m accessibility_compliance.accessibility_compliance.benchmarks.bench_contrast
+"""
+import argparse
+import json
+import random
+import time
+
+from accessibility_compliance.accessibility_compliance import contrast
+
+
+def make_pairs(count, palette_size, seed=1):
+    rng = random.Random(seed)
+    formats = (
+        lambda r, g, b: f"#{r:02x}{g:02x}{b:02x}",
+        lambda r, g, b: f"rgb({r}, {g}, {b})",
+        lambda r, g, b: f"rgba({r}, {g}, {b}, 1)",
+    )
+    palette = [
+        rng.choice(formats)(rng.randrange(256), rng.randrange(256), rng.randrange(256))
+        for _ in range(palette_size)
+    ] + list(contrast.NAMED_COLORS)[:20] + ["hsl(210, 50%, 40%)"]
+    foregrounds = [rng.choice(palette) for _ in range(count)]
+    backgrounds = [rng.choice(palette) for _ in range(count)]
+    large = [rng.random() < 0.2 for _ in range(count)]
+    return foregrounds, backgrounds, large
+
+
+def timed(func, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - started)
+    return round(best * 1000, 3)
+
+
+def bench(count, palette_size, repeat):
+    foregrounds, backgrounds, large = make_pairs(count, palette_size)
+
+    contrast.parse_color.cache_clear()
+    cold = timed(lambda: contrast.evaluate_contrast(foregrounds, backgrounds, large), 1)
+
+    return {
+        "pairs": count,
+        "distinct_colors": palette_size,
+        "batch_cold_ms": cold,
+        "batch_warm_ms": timed(lambda: contrast.evaluate_contrast(foregrounds, backgrounds, large), repeat),
+        "scalar_ms": timed(
+            lambda: [contrast.contrast_ratio(f, b) for f, b in zip(foregrounds, backgrounds)], repeat
+        )
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    results = [
+        bench(5_000, 40, args.repeat),     # one page with thousands of text nodes
+        bench(50_000, 200, args.repeat),   # a whole site
+    ]
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
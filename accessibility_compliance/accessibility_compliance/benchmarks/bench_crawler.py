@@ -0,0 +1,53 @@
+# accessibility_compliance/accessibility_compliance/benchmarks/bench_crawler.py
+"""Crawler throughput against a local synthetic site.
+
+Usage:
+    python -m accessibility_compliance.accessibility_compliance.benchmarks.bench_crawler --pages 5000
+"""
+import argparse
+import json
+
+from accessibility_compliance.accessibility_compliance.benchmarks.synthetic_site import SiteServer, SyntheticSite
+from accessibility_compliance.accessibility_compliance.crawler import CrawlConfig, Crawler
+
+
+def run_crawl(base_url, max_pages, concurrency, per_host_concurrency, per_host_interval):
+    config = CrawlConfig(
+        start_url=base_url,
+        max_depth=1000,
+        max_pages=max_pages,
+        concurrency=concurrency,
+        per_host_concurrency=per_host_concurrency,
+        per_host_interval=per_host_interval
+    )
+    stats = Crawler(config).run()
+    return {
+        "concurrency": concurrency,
+        "per_host_concurrency": per_host_concurrency,
+        "pages_fetched": stats.pages_fetched,
+        "pages_failed": stats.pages_failed,
+        "duration_s": round(stats.duration, 3),
+        "pages_per_s": round(stats.pages_fetched / stats.duration, 1) if stats.duration else None
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", type=int, default=5000, help="pages in the synthetic site")
+    parser.add_argument("--latency", type=float, default=0.02, help="simulated server latency per page (s)")
+    parser.add_argument("--concurrency", type=int, default=32)
+    args = parser.parse_args()
+
+    site = SyntheticSite(page_count=args.pages, latency=args.latency)
+    results = []
+    with SiteServer(site.make_app()) as server:
+        # Serial baseline over a small slice, then the concurrent engine over the whole site
+        results.append(run_crawl(server.base_url, 50, 1, 1, 0.0))
+        results.append(run_crawl(server.base_url, 50, 10, 4, 0.1))
+        results.append(run_crawl(server.base_url, args.pages, args.concurrency, args.concurrency, 0.0))
+
+    print(json.dumps({"site_pages": args.pages, "latency_s": args.latency, "runs": results}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+# accessibility_compliance/accessibility_compliance/benchmarks/bench_dashboard.py
+"""Compliance dashboard: full-table aggregates vs the materialized rollup.
+
+Loads `count` synthetic issues (millions by default) and times the aggregate
+queries the dashboard used to run on every request against reading the
+rollup. Needs a site, so run it through bench:
+    bench --site your-site execute \
+        accessibility_compliance.accessibility_compliance.benchmarks.bench_dashboard.run \
+        --kwargs "{'count': 2000000}"
+
+The benchmark scan and its issues are deleted afterwards and the rollup is rebuilt.
+"""
+import statistics
+import time
+
+import frappe
+
+from accessibility_compliance.accessibility_compliance.benchmarks.bench_issue_writer import (
+    _create_scan,
+    synthetic_issues
+)
+from accessibility_compliance.accessibility_compliance.dashboard import (
+    get_dashboard_statistics,
+    rebuild_dashboard_rollup
+)
+from accessibility_compliance.accessibility_compliance.fixes import apply_fixes
+from accessibility_compliance.accessibility_compliance.issue_writer import IssueWriter
+
+
+def _aggregate_from_tables():
+    """The per-request queries of the original dashboard."""
+    frappe.db.count("Website Scan")
+    frappe.db.sql("""
+        SELECT AVG(compliance_score) as avg_score
+        FROM `tabWebsite Scan`
+        WHERE scan_status = 'Completed' AND compliance_score IS NOT NULL
+    """)
+    frappe.db.count("Accessibility Issue", {"fix_applied": 1})
+    frappe.db.sql("""
+        SELECT issue_type, COUNT(*) as count
+        FROM `tabAccessibility Issue`
+        WHERE issue_type IS NOT NULL
+        GROUP BY issue_type
+        ORDER BY count DESC
+        LIMIT 10
+    """)
+
+
+def _time(fn, iterations):
+    timings = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - started) * 1000)
+    return {"median_ms": round(statistics.median(timings), 3), "max_ms": round(max(timings), 3)}
+
+
+def run(count=2000000, iterations=20, fix_types=("Missing Alt Text",)):
+    scan_id = _create_scan()
+    try:
+        started = time.perf_counter()
+        with IssueWriter(scan_id, chunk_size=5000, dedupe=False) as writer:
+            writer.add_many(synthetic_issues(count))
+        load_seconds = time.perf_counter() - started
+        fixed = len(apply_fixes(scan_id, fix_types=list(fix_types)))
+
+        started = time.perf_counter()
+        rebuild_dashboard_rollup()
+        rebuild_ms = (time.perf_counter() - started) * 1000
+
+        result = {
+            "rows": count,
+            "fixed": fixed,
+            "load_seconds": round(load_seconds, 1),
+            "table_aggregates": _time(_aggregate_from_tables, max(1, iterations // 4)),
+            "rollup_rebuild_ms": round(rebuild_ms, 1),
+            "rollup_read": _time(get_dashboard_statistics, iterations)
+        }
+        result["speedup"] = round(
+            result["table_aggregates"]["median_ms"] / max(result["rollup_read"]["median_ms"], 0.001)
+        )
+        print(frappe.as_json(result))
+        return result
+
+    finally:
+        frappe.db.delete("Accessibility Issue", {"website_scan": scan_id})
+        frappe.delete_doc("Website Scan", scan_id, force=True, ignore_permissions=True)
+        frappe.db.commit()
+        rebuild_dashboard_rollup()
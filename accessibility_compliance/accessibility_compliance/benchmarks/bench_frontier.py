@@ -0,0 +1,111 @@
+# accessibility_compliance/accessibility_compliance/benchmarks/bench_frontier.py
+"""Layout coverage of a page budget: breadth-first crawl vs the prioritized frontier.
+
+Crawls the local catalog site, whose URLs are mostly products and faceted or
+paginated category listings, once in plain breadth-first order and once with
+the sitemap- and robots-aware frontier, and reports how many of the site's
+layouts each crawl reached within the same budget. Also compares the memory
+of the visited-URL sets.
+
+Usage:
+    python -m accessibility_compliance.accessibility_compliance.benchmarks.bench_frontier --budget 50 200 --urls 1000000
+"""
+import argparse
+import json
+import tracemalloc
+from urllib.parse import urlparse
+
+from accessibility_compliance.accessibility_compliance.benchmarks.synthetic_site import CatalogSite, SiteServer
+from accessibility_compliance.accessibility_compliance.crawler import CrawlConfig, Crawler
+from accessibility_compliance.accessibility_compliance.frontier import BloomFilter, HashedSet
+
+
+# Layouts of the paths the catalog site's robots.txt disallows
+DISALLOWED_LAYOUTS = ("cart", "search")
+
+
+class BreadthFirstCrawler(Crawler):
+    """The crawl order before the frontier: every URL at the same rank, so depth then discovery order."""
+
+    def __init__(self, config, **kwargs):
+        super().__init__(config, **kwargs)
+        self.policy.max_rank = None
+
+    def _push(self, url, depth, rank):
+        super()._push(url, depth, 0)
+
+
+def run_crawl(crawler_class, site, base_url, budget, **options):
+    layouts = {}
+
+    def collect(page):
+        parsed = urlparse(page.url)
+        layout = site.layout(parsed.path + (f"?{parsed.query}" if parsed.query else ""))
+        layouts[layout] = layouts.get(layout, 0) + 1
+
+    config = CrawlConfig(start_url=base_url, max_depth=20, max_pages=budget, concurrency=8, per_host_interval=0, **options)
+    stats = crawler_class(config, on_page=collect).run()
+    disallowed = {layout: layouts.pop(layout) for layout in DISALLOWED_LAYOUTS if layout in layouts}
+    return {
+        "pages_fetched": stats.pages_fetched,
+        "layouts_covered": len(layouts),
+        "disallowed_pages_fetched": sum(disallowed.values()),
+        "pages_per_layout": dict(sorted(layouts.items())),
+        "urls_from_sitemaps": stats.urls_from_sitemaps,
+        "urls_disallowed": stats.urls_disallowed,
+        "urls_collapsed": stats.urls_collapsed
+    }
+
+
+def visited_set_memory(count):
+    urls = [f"https://shop.example.com/product/{index}?color=red" for index in range(count)]
+    results = {}
+    for name, factory in (
+        ("set_of_strings", set),
+        ("hashed_set", HashedSet),
+        ("bloom_filter", lambda: BloomFilter(count))
+    ):
+        tracemalloc.start()
+        visited = factory()
+        for url in urls:
+            visited.add(url)
+        size = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        # The set of strings also owns its URL strings, which the list above shares
+        if name == "set_of_strings":
+            size += sum(url.__sizeof__() for url in urls)
+        results[name] = round(size / (1024 * 1024), 1)
+        del visited
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--budget", type=int, nargs="+", default=[50, 200])
+    parser.add_argument("--products", type=int, default=5000)
+    parser.add_argument("--urls", type=int, default=1000000, help="URLs for the visited-set memory comparison")
+    args = parser.parse_args()
+
+    site = CatalogSite(products=args.products)
+    runs = []
+    with SiteServer(site.make_app()) as server:
+        for budget in args.budget:
+            runs.append({
+                "budget": budget,
+                "breadth_first": run_crawl(
+                    BreadthFirstCrawler, site, server.base_url, budget,
+                    respect_robots=False, use_sitemaps=False, max_query_variants=0
+                ),
+                "frontier": run_crawl(Crawler, site, server.base_url, budget)
+            })
+
+    print(json.dumps({
+        "allowed_layouts": len({site.layout(path) for path in ("/", "/blog", "/blog/x", "/category/1", "/category/1?page=2",
+                                                               "/product/1")} | set(site.STATIC_PAGES)),
+        "runs": runs,
+        "visited_set_mb": {"urls": args.urls, **visited_set_memory(args.urls)} if args.urls else None
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+# accessibility_compliance/accessibility_compliance/benchmarks/bench_instrumentation.py
+"""Overhead of scan instrumentation on the static analysis of pages.
+
+Analyzes the fixture pages of bench_rules with the scanner's per-page metrics
+(analyze timer, counters, engine timings taken every checkpoint) and:
+
+- `uninstrumented`: no metrics and no rule timings
+- `instrumented`: metrics with rule timings off
+- `sampled`: metrics plus per-rule timings on every `--sample`th page (the default)
+- `profiled`: per-rule timings on every page, as a scan started with profiling
+
+Reports pages/second and the overhead of each mode against the
+uninstrumented run, plus the cost of a single stage observation.
+
+Usage:
+    python -m accessibility_compliance.accessibility_compliance.benchmarks.bench_instrumentation --pages 200 --sections 200
+"""
+import argparse
+import json
+import time
+
+from accessibility_compliance.accessibility_compliance.benchmarks.bench_rules import render_fixture
+from accessibility_compliance.accessibility_compliance.instrumentation import DEFAULT_RULE_SAMPLE_PAGES, ScanMetrics
+from accessibility_compliance.accessibility_compliance.rules import RuleEngine
+
+MODES = ("uninstrumented", "instrumented", "sampled", "profiled")
+
+
+def run(pages, mode, sample, checkpoint_pages=20):
+    sample_every = {"sampled": sample, "profiled": 1}.get(mode, 0)
+    engine = RuleEngine("AA", rule_sample_every=sample_every)
+    metrics = ScanMetrics() if mode != "uninstrumented" else None
+    started = time.perf_counter()
+    for index, page in enumerate(pages):
+        if metrics is None:
+            engine.analyze(page)
+            continue
+        with metrics.timer("analyze"):
+            issues = engine.analyze(page)
+        metrics.count("pages_analyzed")
+        metrics.count("issues_found", len(issues))
+        if index % checkpoint_pages == 0:
+            metrics.add_engine_timings(engine.take_timings())
+    elapsed = time.perf_counter() - started
+    return elapsed, metrics
+
+
+def observe_cost(observations=200000):
+    metrics = ScanMetrics()
+    started = time.perf_counter()
+    for _ in range(observations):
+        with metrics.timer("fetch"):
+            pass
+    return (time.perf_counter() - started) / observations
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", type=int, default=200)
+    parser.add_argument("--sections", type=int, default=200, help="content sections per fixture page")
+    parser.add_argument("--sample", type=int, default=DEFAULT_RULE_SAMPLE_PAGES, help="pages per timed page")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per mode; the fastest counts")
+    args = parser.parse_args()
+
+    pages = [render_fixture(index, args.sections).encode() for index in range(args.pages)]
+    run(pages[:20], "uninstrumented", args.sample)
+
+    best = {}
+    slowest_rules = None
+    for _ in range(args.repeat):
+        # Interleaved so drift in machine speed affects every mode alike
+        for mode in MODES:
+            elapsed, metrics = run(pages, mode, args.sample)
+            best[mode] = min(best.get(mode, elapsed), elapsed)
+            if mode == "sampled":
+                slowest_rules = list(metrics.rule_summary().items())[:3]
+
+    baseline = best["uninstrumented"]
+    print(json.dumps({
+        "pages": args.pages,
+        **{
+            mode: {
+                "pages_per_second": round(args.pages / best[mode], 1),
+                "overhead_pct": round((best[mode] / baseline - 1) * 100, 1)
+            }
+            for mode in MODES
+        },
+        "stage_observation_us": round(observe_cost() * 1e6, 2),
+        "slowest_rules_sampled": dict(slowest_rules or [])
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
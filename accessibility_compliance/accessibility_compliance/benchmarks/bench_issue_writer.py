@@ -0,0 +1,103 @@
+# accessibility_compliance/accessibility_compliance/benchmarks/bench_issue_writer.py
+"""Bulk issue insert vs per-document insert, and rows saved by cross-page deduplication.
+
+Needs a site, so run it through bench:
+    bench --site your-site execute \
+        accessibility_compliance.accessibility_compliance.benchmarks.bench_issue_writer.run \
+        --kwargs "{'count': 100000, 'per_doc_count': 2000}"
+
+The benchmark scan and its issues are deleted afterwards.
+"""
+import random
+import time
+
+import frappe
+
+from accessibility_compliance.accessibility_compliance.issue_writer import IssueWriter
+
+ISSUE_TEMPLATES = (
+    ("Missing Alt Text", "Critical", "1.1.1", "Image missing alternative text", "img", 1),
+    ("Form Labels", "Critical", "1.3.1", "Form input has no associated label", "input", 1),
+    ("Poor Color Contrast", "Major", "1.4.3", "Text color contrast ratio is below WCAG standards", "p", 1),
+    ("Heading Structure", "Major", "1.3.1", "Heading levels are skipped", "h3", 0),
+    ("Missing Table Caption", "Minor", "1.3.1", "Data table has no caption", "table", 0),
+)
+
+
+def synthetic_issues(count, seed=11):
+    rng = random.Random(seed)
+    for index in range(count):
+        issue_type, severity, criterion, description, tag, fixable = rng.choice(ISSUE_TEMPLATES)
+        yield {
+            "page_url": f"https://bench.example.com/page/{index // 50}",
+            "issue_type": issue_type,
+            "severity": severity,
+            "wcag_criterion": criterion,
+            "issue_description": description,
+            "element_selector": f"main > section:nth-of-type({index % 40 + 1}) > {tag}",
+            "auto_fixable": fixable
+        }
+
+
+def _create_scan():
+    scan = frappe.new_doc("Website Scan")
+    scan.website_url = "https://bench.example.com"
+    scan.wcag_level = "AA"
+    scan.scan_status = "Completed"
+    scan.insert(ignore_permissions=True)
+    frappe.db.commit()
+    return scan.name
+
+
+def _per_document(scan_id, issues):
+    for issue in issues:
+        doc = frappe.new_doc("Accessibility Issue")
+        doc.website_scan = scan_id
+        doc.update(issue)
+        doc.insert(ignore_permissions=True)
+    frappe.db.commit()
+
+
+def run(count=100000, per_doc_count=2000, chunk_size=None):
+    scan_id = _create_scan()
+    try:
+        started = time.perf_counter()
+        with IssueWriter(scan_id, chunk_size=chunk_size, dedupe=False) as writer:
+            writer.add_many(synthetic_issues(count))
+        bulk_elapsed = time.perf_counter() - started
+
+        dedupe_scan_id = _create_scan()
+        try:
+            started = time.perf_counter()
+            with IssueWriter(dedupe_scan_id, chunk_size=chunk_size) as dedupe_writer:
+                dedupe_writer.add_many(synthetic_issues(count))
+            dedupe_elapsed = time.perf_counter() - started
+        finally:
+            frappe.db.delete("Accessibility Issue", {"website_scan": dedupe_scan_id})
+            frappe.delete_doc("Website Scan", dedupe_scan_id, force=True, ignore_permissions=True)
+            frappe.db.commit()
+
+        started = time.perf_counter()
+        _per_document(scan_id, synthetic_issues(per_doc_count, seed=12))
+        per_doc_elapsed = time.perf_counter() - started
+
+        bulk_rate = count / bulk_elapsed
+        per_doc_rate = per_doc_count / per_doc_elapsed
+        result = {
+            "bulk": {"rows": count, "chunk_size": writer.chunk_size, "seconds": round(bulk_elapsed, 2),
+                     "rows_per_s": round(bulk_rate)},
+            "per_document": {"rows": per_doc_count, "seconds": round(per_doc_elapsed, 2),
+                             "rows_per_s": round(per_doc_rate),
+                             "projected_seconds_for_bulk_count": round(count / per_doc_rate, 1)},
+            "speedup": round(bulk_rate / per_doc_rate, 1),
+            "deduplicated": {"issues": count, "rows": dedupe_writer.rows_written,
+                             "seconds": round(dedupe_elapsed, 2),
+                             "row_reduction": round(count / max(dedupe_writer.rows_written, 1))}
+        }
+        print(frappe.as_json(result))
+        return result
+
+    finally:
+        frappe.db.delete("Accessibility Issue", {"website_scan": scan_id})
+        frappe.delete_doc("Website Scan", scan_id, force=True, ignore_permissions=True)
+        frappe.db.commit()
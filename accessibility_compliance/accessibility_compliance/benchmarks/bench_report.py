@@ -0,0 +1,73 @@
+# accessibility_compliance/accessibility_compliance/benchmarks/bench_report.py
+"""Remediation report: per-issue Python counting vs grouped queries vs the cached report.
+
+Loads `count` synthetic issues into one scan and times the original report
+path (every issue row fetched, severities counted in Python), a cold build
+from grouped queries and a cached read. Needs a site, so run it through bench:
+    bench --site your-site execute \
+        accessibility_compliance.accessibility_compliance.benchmarks.bench_report.run \
+        --kwargs "{'count': 500000}"
+
+The benchmark scan and its issues are deleted afterwards.
+"""
+import statistics
+import time
+
+import frappe
+
+from accessibility_compliance.accessibility_compliance.benchmarks.bench_issue_writer import (
+    _create_scan,
+    synthetic_issues
+)
+from accessibility_compliance.accessibility_compliance.issue_writer import IssueWriter
+from accessibility_compliance.accessibility_compliance.remediation_report import (
+    build_remediation_report,
+    clear_report_cache,
+    get_remediation_report
+)
+
+
+def _legacy_report(scan_id):
+    """The original path: every issue row materialized and counted in Python."""
+    issues = frappe.get_all("Accessibility Issue", filters={"website_scan": scan_id}, fields=["*"])
+    return (
+        len([i for i in issues if i.severity == "Critical"]),
+        len([i for i in issues if i.severity == "Major"]),
+        len([i for i in issues if i.severity == "Minor"])
+    )
+
+
+def _time(fn, iterations):
+    timings = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - started) * 1000)
+    return {"median_ms": round(statistics.median(timings), 3), "max_ms": round(max(timings), 3)}
+
+
+def run(count=500000, iterations=10):
+    scan_id = _create_scan()
+    try:
+        with IssueWriter(scan_id, chunk_size=5000, dedupe=False) as writer:
+            writer.add_many(synthetic_issues(count))
+
+        clear_report_cache(scan_id)
+        get_remediation_report(scan_id)
+        result = {
+            "rows": count,
+            "legacy_fetch_and_count": _time(lambda: _legacy_report(scan_id), max(1, iterations // 5)),
+            "grouped_queries": _time(lambda: build_remediation_report(scan_id), iterations),
+            "cached_report": _time(lambda: get_remediation_report(scan_id), iterations)
+        }
+        result["speedup_cached"] = round(
+            result["legacy_fetch_and_count"]["median_ms"] / max(result["cached_report"]["median_ms"], 0.001)
+        )
+        print(frappe.as_json(result))
+        return result
+
+    finally:
+        clear_report_cache(scan_id)
+        frappe.db.delete("Accessibility Issue", {"website_scan": scan_id})
+        frappe.delete_doc("Website Scan", scan_id, force=True, ignore_permissions=True)
+        frappe.db.commit()
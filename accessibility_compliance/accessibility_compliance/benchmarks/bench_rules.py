@@ -0,0 +1,118 @@
+# accessibility_compliance/accessibility_compliance/benchmarks/bench_rules.py
+"""Rule engine throughput over a corpus of large HTML fixtures.
+
+Reports pages/second for the single-pass engine and the time spent in each
+rule. Point `--corpus` at a directory of saved `.html` files to benchmark real
+pages; otherwise a synthetic corpus is generated in a temporary directory.
+
+Usage:
+    python -m accessibility_compliance.accessibility_compliance.benchmarks.bench_rules --pages 200 --sections 400
+"""
+import argparse
+import json
+import os
+import random
+import tempfile
+import time
+
+from accessibility_compliance.accessibility_compliance.rules import RuleEngine
+
+
+def render_fixture(index, sections, seed=7):
+    rng = random.Random(seed * 7919 + index)
+    parts = [
+        "<!DOCTYPE html>",
+        '<html lang="en">' if rng.random() > 0.2 else "<html>",
+        f"<head><title>Fixture {index}</title></head><body>",
+        '<a href="#main">Skip to content</a><nav><ul>'
+    ]
+    parts.extend(f'<li><a href="/p/{i}">Link {i}</a></li>' for i in range(40))
+    parts.append('</ul></nav><main id="main"><h1>Fixture</h1>')
+
+    for section in range(sections):
+        heading = rng.choice(("h2", "h3", "h4"))
+        parts.append(f'<section class="s{section % 13}"><{heading}>Section {section}</{heading}>')
+        parts.append(f"<p>Paragraph {section} " + "lorem ipsum " * rng.randint(5, 30) + "</p>")
+        if rng.random() < 0.4:
+            alt = f' alt="Image {section}"' if rng.random() > 0.1 else ""
+            parts.append(f'<img src="/img/{section}.png"{alt}>')
+        if rng.random() < 0.15:
+            labelled = rng.random() > 0.2
+            label = f'<label for="f{section}">Field</label>' if labelled else ""
+            parts.append(f'<form>{label}<input id="f{section}" type="text"><select name="s{section}"></select></form>')
+        if rng.random() < 0.05:
+            caption = "<caption>Data</caption>" if rng.random() > 0.5 else ""
+            rows = "".join(f"<tr><td>{r}</td><td>{r * 2}</td></tr>" for r in range(20))
+            parts.append(f"<table>{caption}<tr><th>A</th><th>B</th></tr>{rows}</table>")
+        if rng.random() < 0.1:
+            parts.append(f'<a href="/x/{section}"><span class="icon"></span></a>')
+        parts.append("</section>")
+
+    parts.append("</main><footer><p>Footer</p></footer></body></html>")
+    return "\n".join(parts)
+
+
+def write_corpus(directory, pages, sections):
+    for index in range(pages):
+        path = os.path.join(directory, f"fixture_{index:05d}.html")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(render_fixture(index, sections))
+
+
+def load_corpus(directory):
+    bodies = []
+    for name in sorted(os.listdir(directory)):
+        if name.endswith((".html", ".htm")):
+            with open(os.path.join(directory, name), "rb") as f:
+                bodies.append(f.read())
+    return bodies
+
+
+def run(bodies, wcag_level):
+    # Timed run without per-rule profiling, so the throughput number reflects production overhead
+    engine = RuleEngine(wcag_level)
+    issues = 0
+    started = time.perf_counter()
+    for body in bodies:
+        issues += len(engine.analyze(body))
+    elapsed = time.perf_counter() - started
+
+    profiled = RuleEngine(wcag_level, profile=True)
+    for body in bodies:
+        profiled.analyze(body)
+
+    total_bytes = sum(len(body) for body in bodies)
+    return {
+        "pages": len(bodies),
+        "corpus_mb": round(total_bytes / 1024 / 1024, 2),
+        "issues": issues,
+        "elapsed_s": round(elapsed, 3),
+        "pages_per_s": round(len(bodies) / elapsed, 1) if elapsed else None,
+        "parse_s": round(engine.parse_time, 3),
+        "rule_time_ms": {
+            name: round(seconds * 1000, 2)
+            for name, seconds in sorted(profiled.rule_timings.items(), key=lambda item: -item[1])
+        }
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--corpus", help="directory of .html fixtures (generated when omitted)")
+    parser.add_argument("--pages", type=int, default=200)
+    parser.add_argument("--sections", type=int, default=400, help="content sections per generated page")
+    parser.add_argument("--wcag-level", default="AAA")
+    args = parser.parse_args()
+
+    if args.corpus:
+        bodies = load_corpus(args.corpus)
+    else:
+        with tempfile.TemporaryDirectory() as directory:
+            write_corpus(directory, args.pages, args.sections)
+            bodies = load_corpus(directory)
+
+    print(json.dumps(run(bodies, args.wcag_level), indent=2))
+
+
+if __name__ == "__main__":
+    main()
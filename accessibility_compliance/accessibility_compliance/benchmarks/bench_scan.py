@@ -0,0 +1,253 @@
+# accessibility_compliance/accessibility_compliance/benchmarks/bench_scan.py
+"""End-to-end scan benchmark against a generated site served locally.
+
+Generates a TemplatedSite (page count, content blocks per page, templates and
+issue density are parameters; the same parameters always produce the same
+site), serves it on localhost and runs the whole `run_accessibility_scan`
+pipeline against it while a second connection polls `get_scan_status`. Then it
+pages through the full scan report, builds the remediation report cold and
+cached and applies the auto-fixes.
+
+Reports pages/second, p50/p99 per-page latency (request start until the
+page's issues are buffered, from the scan's `page` stage histogram), peak RSS
+of the job and the sampled peak of its analysis workers together, and database
+rows written per second.
+Needs a site, so run it through bench:
+    bench --site your-site execute \\
+        accessibility_compliance.accessibility_compliance.benchmarks.bench_scan.run \\
+        --kwargs "{'pages': 500, 'elements': 150, 'output': '/tmp/bench_scan.json'}"
+
+Pass the JSON of an earlier run as `baseline` to get the relative change of
+the headline numbers. AI suggestions and browser rendering are turned off for
+the run, the per-host politeness delay is dropped for the local server and
+the scan runs as a single batch job. The benchmark scan, its issues and page
+states are deleted afterwards unless `keep` is set.
+"""
+import json
+import resource
+import statistics
+import threading
+import time
+
+import frappe
+import psutil
+from frappe.utils import now
+
+from accessibility_compliance.accessibility_compliance.benchmarks.synthetic_site import SiteServer, TemplatedSite
+from accessibility_compliance.accessibility_compliance.checkpoint import delete_checkpoint
+from accessibility_compliance.accessibility_compliance.fixes import apply_fixes
+from accessibility_compliance.accessibility_compliance.instrumentation import load_scan_metrics
+from accessibility_compliance.accessibility_compliance.remediation_report import (
+    clear_report_cache,
+    get_remediation_report
+)
+from accessibility_compliance.accessibility_compliance.scan_report import get_report_page
+from accessibility_compliance.accessibility_compliance.scan_status import get_scan_status
+from accessibility_compliance.accessibility_compliance.scanner import run_accessibility_scan
+
+# Headline numbers compared against a baseline run, and whether higher is better
+HEADLINE = {
+    "pages_per_s": True,
+    "page_p50_ms": False,
+    "page_p99_ms": False,
+    "peak_rss_mb": False,
+    "db_rows_per_s": True
+}
+
+
+class StatusPoller(threading.Thread):
+    """Polls the status of a scan on its own site connection, as a client would while it runs.
+
+    Every poll also samples the memory of the analysis workers, which are not
+    children of the job with the forkserver start method and so are missing
+    from its rusage.
+    """
+
+    def __init__(self, site, sites_path, scan_id, interval):
+        super().__init__(daemon=True)
+        self.site = site
+        self.sites_path = sites_path
+        self.scan_id = scan_id
+        self.interval = interval
+        self.latencies = []
+        self.errors = 0
+        self.peak_workers_rss = 0
+        self._stopped = threading.Event()
+
+    def run(self):
+        frappe.init(site=self.site, sites_path=self.sites_path)
+        frappe.connect()
+        try:
+            while not self._stopped.wait(self.interval):
+                started = time.perf_counter()
+                try:
+                    get_scan_status(self.scan_id)
+                except Exception:
+                    self.errors += 1
+                self.latencies.append((time.perf_counter() - started) * 1000)
+                self._sample_workers()
+                # End the read snapshot so the next poll sees the scan's latest commit
+                frappe.db.rollback()
+        finally:
+            frappe.destroy()
+
+    def _sample_workers(self):
+        total = 0
+        for process in psutil.Process().children(recursive=True):
+            try:
+                total += process.memory_info().rss
+            except psutil.Error:
+                pass
+        self.peak_workers_rss = max(self.peak_workers_rss, total)
+
+    def stop(self):
+        self._stopped.set()
+        self.join()
+
+    def report(self):
+        latencies = sorted(self.latencies)
+        return {
+            "polls": len(latencies),
+            "errors": self.errors,
+            "median_ms": round(statistics.median(latencies), 3) if latencies else None,
+            "p99_ms": round(latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))], 3) if latencies else None
+        }
+
+
+def _create_scan(base_url, pages):
+    scan = frappe.new_doc("Website Scan")
+    scan.website_url = base_url
+    scan.wcag_level = "AA"
+    # Every page must be reachable however long the link chain to it is
+    scan.scan_depth = pages
+    scan.scan_status = "Pending"
+    scan.insert(ignore_permissions=True)
+    frappe.db.commit()
+    return scan.name
+
+
+def _time(fn):
+    started = time.perf_counter()
+    result = fn()
+    return result, round((time.perf_counter() - started) * 1000, 3)
+
+
+def _full_report(scan_id, limit=500):
+    """Every page of the scan report, following the cursors."""
+    cursor, pages, issues = None, 0, 0
+    while True:
+        page = get_report_page(scan_id, include_suggestions=False, cursor=cursor, limit=limit)
+        pages += 1
+        issues += sum(len(entry["issues"]) for entry in page["pages"])
+        cursor = page["next_cursor"]
+        if not cursor:
+            return {"report_pages": pages, "issues": issues}
+
+
+def _peak_rss_mb():
+    # ru_maxrss is in kilobytes on Linux
+    return round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+
+
+def _compare(result, baseline):
+    with open(baseline) as f:
+        before = json.load(f)
+    comparison = {}
+    for key, higher_is_better in HEADLINE.items():
+        old, new = before.get(key), result.get(key)
+        if not old or new is None:
+            continue
+        change = (new - old) / old * 100
+        comparison[key] = {
+            "baseline": old,
+            "change_pct": round(change, 1),
+            "regressed": change < 0 if higher_is_better else change > 0
+        }
+    return comparison
+
+
+def _cleanup(scan_id):
+    clear_report_cache(scan_id)
+    delete_checkpoint(scan_id)
+    frappe.db.delete("Accessibility Issue", {"website_scan": scan_id})
+    frappe.db.delete("Scanned Page", {"website_scan": scan_id})
+    frappe.delete_doc("Website Scan", scan_id, force=True, ignore_permissions=True)
+    frappe.db.commit()
+
+
+def run(pages=500, elements=150, templates=8, issue_density=0.05, latency=0.0, poll_interval=0.25,
+        output=None, baseline=None, keep=False):
+    site = TemplatedSite(page_count=pages, elements=elements, templates=templates,
+                         issue_density=issue_density, latency=latency)
+    overrides = {
+        "scan_batch_pages": pages + 1,
+        "scan_batch_seconds": 86400,
+        "scan_render_mode": "never",
+        "ai_suggestions_on_scan": 0,
+        "scan_per_host_interval": 0,
+        "scan_per_host_concurrency": frappe.conf.get("scan_concurrency") or 10
+    }
+    saved = {key: frappe.conf.get(key) for key in overrides}
+    frappe.conf.update(overrides)
+    scan_id = None
+    try:
+        with SiteServer(site.make_app()) as server:
+            scan_id = _create_scan(server.base_url, pages)
+            poller = StatusPoller(frappe.local.site, frappe.local.sites_path, scan_id, poll_interval)
+            poller.start()
+            started = time.perf_counter()
+            try:
+                scan_result = run_accessibility_scan(scan_id, max_pages=pages, incremental=0)
+            finally:
+                poller.stop()
+            scan_seconds = time.perf_counter() - started
+
+        metrics = load_scan_metrics(scan_id).summary()
+        page_stage = metrics["stages"].get("page", {})
+        issue_rows = frappe.db.count("Accessibility Issue", {"website_scan": scan_id})
+        page_rows = frappe.db.count("Scanned Page", {"website_scan": scan_id})
+
+        report, report_ms = _time(lambda: _full_report(scan_id))
+        clear_report_cache(scan_id)
+        _, remediation_cold_ms = _time(lambda: get_remediation_report(scan_id))
+        _, remediation_cached_ms = _time(lambda: get_remediation_report(scan_id))
+        fixed, fixes_ms = _time(lambda: apply_fixes(scan_id))
+
+        result = {
+            "recorded_at": now(),
+            "parameters": {"pages": pages, "elements": elements, "templates": templates,
+                           "issue_density": issue_density, "latency": latency},
+            "pages_fetched": scan_result["pages_fetched"],
+            "pages_failed": scan_result["pages_failed"],
+            "scan_s": round(scan_seconds, 2),
+            "pages_per_s": round(scan_result["pages_fetched"] / scan_seconds, 1),
+            "page_p50_ms": page_stage.get("p50_ms"),
+            "page_p99_ms": page_stage.get("p99_ms"),
+            "peak_rss_mb": _peak_rss_mb(),
+            "peak_workers_rss_mb": round(poller.peak_workers_rss / 1024 / 1024, 1),
+            "issue_rows": issue_rows,
+            "page_rows": page_rows,
+            "db_rows_per_s": round((issue_rows + page_rows) / scan_seconds, 1),
+            "status_polling": poller.report(),
+            "report": {**report, "ms": report_ms},
+            "remediation_report": {"cold_ms": remediation_cold_ms, "cached_ms": remediation_cached_ms},
+            "auto_fixes": {"fixed": len(fixed), "ms": fixes_ms},
+            "stages": metrics["stages"],
+            "slowest_rules": dict(list(metrics["rules"].items())[:5])
+        }
+        if baseline:
+            result["compared_to_baseline"] = _compare(result, baseline)
+        if output:
+            with open(output, "w") as f:
+                f.write(frappe.as_json(result))
+        print(frappe.as_json(result))
+        return result
+
+    finally:
+        for key, value in saved.items():
+            if value is None:
+                frappe.conf.pop(key, None)
+            else:
+                frappe.conf[key] = value
+        if scan_id and not keep:
+            _cleanup(scan_id)
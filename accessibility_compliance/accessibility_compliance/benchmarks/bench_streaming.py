@@ -0,0 +1,109 @@
+# accessibility_compliance/accessibility_compliance/benchmarks/bench_streaming.py
+"""Peak memory of the full-tree and streaming parse modes on very large pages.
+
+Each synthetic page is analyzed in a fresh subprocess per mode, so the peak
+RSS reported by the kernel belongs to that one parse. The issues of both
+modes are compared to make sure streaming finds exactly the same problems.
+
+Usage:
+    python -m accessibility_compliance.accessibility_compliance.benchmarks.bench_streaming --sizes 5 20 50
+"""
+import argparse
+import hashlib
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+from accessibility_compliance.accessibility_compliance.benchmarks.bench_rules import render_fixture
+from accessibility_compliance.accessibility_compliance.rules import RuleEngine, parse_html
+
+MODES = ("tree", "stream")
+
+
+def peak_rss_mb():
+    # ru_maxrss is in kilobytes on Linux and in bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024 if sys.platform == "darwin" else 1024)
+
+
+def write_page(path, size_mb):
+    """Write a synthetic page of roughly `size_mb` megabytes."""
+    sample = len(render_fixture(0, 1000).encode("utf-8"))
+    sections = max(1, int(size_mb * 1024 * 1024 * 1000 / sample))
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(render_fixture(0, sections))
+    return sections
+
+
+def issues_digest(issues):
+    keys = sorted(f"{i.issue_type}|{i.element_selector}|{i.html_snippet}|{i.issue_description}" for i in issues)
+    return hashlib.sha1("\n".join(keys).encode()).hexdigest()
+
+
+def analyze_once(mode, path, wcag_level):
+    """Child process: analyze one page in one mode and print the measurements."""
+    engine = RuleEngine(wcag_level)
+    with open(path, "rb") as f:
+        body = f.read()
+    baseline = peak_rss_mb()
+
+    started = time.perf_counter()
+    if mode == "stream":
+        issues = engine.analyze_stream(body, path).issues
+    else:
+        issues = engine.analyze_context(parse_html(body), path).issues
+    elapsed = time.perf_counter() - started
+
+    print(json.dumps({
+        "seconds": round(elapsed, 2),
+        "peak_rss_mb": round(peak_rss_mb(), 1),
+        "parse_rss_mb": round(peak_rss_mb() - baseline, 1),
+        "issues": len(issues),
+        "digest": issues_digest(issues)
+    }))
+
+
+def run_child(mode, path, wcag_level):
+    output = subprocess.run(
+        [sys.executable, "-m", __spec__.name, "--child", mode, path, "--wcag-level", wcag_level],
+        check=True,
+        capture_output=True,
+        text=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=float, nargs="+", default=[5, 20, 50], help="page sizes in MB")
+    parser.add_argument("--wcag-level", default="AA")
+    parser.add_argument("--child", nargs=2, metavar=("MODE", "PATH"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        analyze_once(args.child[0], args.child[1], args.wcag_level)
+        return
+
+    results = []
+    with tempfile.TemporaryDirectory(prefix="a11y-stream-bench-") as directory:
+        for size_mb in args.sizes:
+            path = os.path.join(directory, f"page_{size_mb:g}mb.html")
+            sections = write_page(path, size_mb)
+            result = {"size_mb": round(os.path.getsize(path) / (1024 * 1024), 1), "sections": sections}
+            for mode in MODES:
+                result[mode] = run_child(mode, path, args.wcag_level)
+            result["identical_issues"] = result["tree"]["digest"] == result["stream"]["digest"]
+            if result["stream"]["parse_rss_mb"]:
+                result["memory_reduction"] = round(result["tree"]["parse_rss_mb"] / result["stream"]["parse_rss_mb"], 1)
+            results.append(result)
+            os.remove(path)
+
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+# accessibility_compliance/accessibility_compliance/benchmarks/bench_stylesheets.py
+"""Static contrast checks against linked stylesheets: per-page parsing vs the shared cache and index.
+
+Generates a CSS bundle of many class rules (like a component framework) and
+pages that link it, then analyzes the pages three ways:
+
+- `parse_per_page`: every page downloads and parses the bundle again
+- `unindexed`: the bundle comes from the shared cache, but every rule is
+  tested against every element
+- `cached_indexed`: the shared cache and the selector index
+
+Reports pages/second, bundle fetches and whether all modes found the same
+contrast issues.
+
+Usage:
+    python -m accessibility_compliance.accessibility_compliance.benchmarks.bench_stylesheets --pages 20 --rules 3000
+"""
+import argparse
+import json
+import random
+import time
+
+from accessibility_compliance.accessibility_compliance.rules import RuleEngine
+from accessibility_compliance.accessibility_compliance.stylesheets import SelectorIndex, StylesheetCache
+
+COMPONENTS = ("btn", "card", "nav", "alert", "badge", "table", "form", "modal", "list", "tab")
+SHADES = ("#111", "#333", "#555", "#777", "#999", "#aaa", "#bbb", "#ccc", "#eee", "#fff")
+
+
+def render_bundle(rules, seed=11):
+    rng = random.Random(seed)
+    parts = ["body { color: #222; background: #fff }", "a { color: #0645ad }"]
+    for index in range(rules):
+        component = COMPONENTS[index % len(COMPONENTS)]
+        selector = rng.choice((
+            f".{component}-{index}",
+            f".{component} .{component}-{index}",
+            f"div.{component}-{index} > span",
+            f"#{component}-{index}"
+        ))
+        parts.append(f"{selector} {{ color: {rng.choice(SHADES)}; background-color: {rng.choice(SHADES)} }}")
+    return "\n".join(parts)
+
+
+def render_page(index, rules, elements, seed=5):
+    rng = random.Random(seed * 31 + index)
+    parts = ['<!DOCTYPE html><html lang="en"><head><title>Page</title>',
+             '<link rel="stylesheet" href="/static/bundle.css"></head><body><main>']
+    for element in range(elements):
+        rule = rng.randrange(rules)
+        component = COMPONENTS[rule % len(COMPONENTS)]
+        parts.append(f'<div class="{component}"><p class="{component}-{rule} text">Item {element}</p></div>')
+    parts.append("</main></body></html>")
+    return "".join(parts)
+
+
+class UnindexedSelectorIndex(SelectorIndex):
+    """Tests every rule against every element."""
+
+    def candidates(self, element):
+        return [entry for entries in (self.universal, *self.by_id.values(), *self.by_class.values(),
+                                      *self.by_tag.values()) for entry in entries]
+
+
+class UnindexedStylesheetCache(StylesheetCache):
+    def index(self, sheets):
+        return UnindexedSelectorIndex(sheets)
+
+
+class BundleFetcher:
+    """Serves the bundle from memory and counts the downloads."""
+
+    def __init__(self, bundle):
+        self.bundle = bundle.encode()
+        self.fetches = 0
+
+    def __call__(self, url):
+        self.fetches += 1
+        return self.bundle
+
+
+def run(pages, bundle, mode):
+    fetcher = BundleFetcher(bundle)
+    cache_class = UnindexedStylesheetCache if mode == "unindexed" else StylesheetCache
+    engine = RuleEngine("AA", stylesheets=cache_class(fetcher=fetcher))
+    started = time.perf_counter()
+    issues = []
+    for index, page in enumerate(pages):
+        if mode == "parse_per_page":
+            engine.stylesheets = cache_class(fetcher=fetcher)
+        issues.append(sorted(
+            issue.element_selector for issue in engine.analyze(page, f"https://example.com/{index}")
+            if issue.rule == "color-contrast"
+        ))
+    elapsed = time.perf_counter() - started
+    return {
+        "seconds": round(elapsed, 2),
+        "pages_per_second": round(len(pages) / elapsed, 1),
+        "bundle_fetches": fetcher.fetches,
+        "contrast_issues": sum(len(found) for found in issues)
+    }, issues
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", type=int, default=20)
+    parser.add_argument("--rules", type=int, default=3000, help="style rules in the CSS bundle")
+    parser.add_argument("--elements", type=int, default=300, help="styled elements per page")
+    args = parser.parse_args()
+
+    bundle = render_bundle(args.rules)
+    pages = [render_page(index, args.rules, args.elements).encode() for index in range(args.pages)]
+    results = {}
+    found = {}
+    for mode in ("parse_per_page", "unindexed", "cached_indexed"):
+        results[mode], found[mode] = run(pages, bundle, mode)
+
+    print(json.dumps({
+        "pages": args.pages,
+        "bundle_kb": round(len(bundle) / 1024, 1),
+        "rules": args.rules,
+        "elements_per_page": args.elements,
+        **results,
+        "same_issues": found["parse_per_page"] == found["unindexed"] == found["cached_indexed"]
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+# accessibility_compliance/accessibility_compliance/benchmarks/mock_model_server.py
+"""Local stand-in for an OpenAI-compatible chat completions endpoint.
+
+Answers every issue of a suggestion batch with a deterministic fix, after an
+optional latency, and can reject every n-th request with HTTP 429 to exercise
+retries. It records requests, issues and the peak number of requests in
+flight. Run it with SiteServer and point `openai_base_url` at `<base_url>v1`.
+"""
+import asyncio
+import json
+import time
+
+from aiohttp import web
+
+
+class MockModelServer:
+    def __init__(self, latency=0.0, fail_every=0):
+        self.latency = latency
+        self.fail_every = fail_every
+        self.requests = 0
+        self.rejected = 0
+        self.issues = 0
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.request_starts = []
+
+    @staticmethod
+    def fix_for(item):
+        return f"Fix {item.get('issue')} on {item.get('html') or 'the page'}"
+
+    def make_app(self):
+        async def completions(request):
+            payload = await request.json()
+            self.requests += 1
+            self.request_starts.append(time.monotonic())
+            if self.fail_every and self.requests % self.fail_every == 0:
+                self.rejected += 1
+                return web.json_response(
+                    {"error": {"message": "Rate limit reached", "type": "rate_limit_error"}},
+                    status=429,
+                    headers={"retry-after-ms": "10"}
+                )
+
+            self.in_flight += 1
+            self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+            try:
+                if self.latency:
+                    await asyncio.sleep(self.latency)
+                items = json.loads(payload["messages"][-1]["content"])
+            finally:
+                self.in_flight -= 1
+            self.issues += len(items)
+
+            content = json.dumps({"suggestions": [{"id": item["id"], "fix": self.fix_for(item)} for item in items]})
+            return web.json_response({
+                "id": f"chatcmpl-mock-{self.requests}",
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": payload.get("model"),
+                "choices": [{
+                    "index": 0,
+                    "message": {"role": "assistant", "content": content},
+                    "finish_reason": "stop"
+                }],
+                "usage": {
+                    "prompt_tokens": len(payload["messages"][-1]["content"]) // 4,
+                    "completion_tokens": len(content) // 4,
+                    "total_tokens": (len(payload["messages"][-1]["content"]) + len(content)) // 4
+                }
+            })
+
+        app = web.Application()
+        app.router.add_post("/v1/chat/completions", completions)
+        return app
@@ -0,0 +1,291 @@
+# accessibility_compliance/accessibility_compliance/benchmarks/synthetic_site.py
+"""Local stand-in HTTP servers serving deterministic synthetic websites."""
+import asyncio
+import gzip
+import random
+import threading
+
+from aiohttp import web
+
+
+class SyntheticSite:
+    """Deterministic site of `page_count` pages, each linking to `links_per_page` others."""
+
+    def __init__(self, page_count=5000, links_per_page=10, seed=42, latency=0.0):
+        self.page_count = page_count
+        self.links_per_page = links_per_page
+        self.seed = seed
+        self.latency = latency
+
+    def page_links(self, index):
+        rng = random.Random(self.seed * 1_000_003 + index)
+        # Always link to the next page so every page is reachable from the root
+        links = {(index + 1) % self.page_count}
+        while len(links) < min(self.links_per_page, self.page_count - 1):
+            links.add(rng.randrange(self.page_count))
+        links.discard(index)
+        return sorted(links)
+
+    def render_page(self, index):
+        links = "\n".join(
+            f'<li><a href="/page/{target}">Page {target}</a></li>' for target in self.page_links(index)
+        )
+        return (
+            "<!DOCTYPE html>\n"
+            f'<html lang="en"><head><title>Page {index}</title></head>\n'
+            "<body><header><nav><ul>\n"
+            f"{links}\n"
+            "</ul></nav></header>\n"
+            f"<main><h1>Page {index}</h1><p>Synthetic content for page {index}.</p>"
+            f'<img src="/static/{index}.png"></main>\n'
+            "</body></html>"
+        )
+
+    def make_app(self):
+        async def root(request):
+            return await page(request, 0)
+
+        async def page(request, index=None):
+            if index is None:
+                index = int(request.match_info["index"])
+            if index >= self.page_count:
+                raise web.HTTPNotFound()
+            if self.latency:
+                await asyncio.sleep(self.latency)
+            return web.Response(text=self.render_page(index), content_type="text/html")
+
+        app = web.Application()
+        app.router.add_get("/", root)
+        app.router.add_get("/page/{index:\\d+}", page)
+        return app
+
+
+class TemplatedSite(SyntheticSite):
+    """A deterministic site of `page_count` pages rendered from `templates` page templates.
+
+    Pages of the same template share its header, search form and footer,
+    including the template's own accessibility issues, so those repeat on every
+    page of the template as they do on real sites. The `elements` content
+    blocks of a page are generated from the page's index and each of them fails
+    a rule with probability `issue_density`. Pages link to each other as in
+    SyntheticSite.
+    """
+
+    BLOCK_KINDS = ("text", "image", "field", "link", "table", "button")
+
+    def __init__(self, page_count=500, elements=150, templates=8, issue_density=0.05, links_per_page=10,
+                 seed=42, latency=0.0):
+        super().__init__(page_count=page_count, links_per_page=links_per_page, seed=seed, latency=latency)
+        self.elements = elements
+        self.templates = max(1, templates)
+        self.issue_density = issue_density
+
+    def template(self, index):
+        return index % self.templates
+
+    def render_block(self, rng, index, block):
+        kind = self.BLOCK_KINDS[rng.randrange(len(self.BLOCK_KINDS))]
+        failing = rng.random() < self.issue_density
+        if kind == "text":
+            style = ' style="color: #999999; background-color: #aaaaaa"' if failing else ""
+            return f"<p{style}>Paragraph {block} of page {index}: " + "synthetic text " * rng.randint(3, 12) + "</p>"
+        if kind == "image":
+            alt = "" if failing else f' alt="Figure {block}"'
+            return f'<figure><img src="/static/{index}-{block}.png"{alt}><figcaption>Figure {block}</figcaption></figure>'
+        if kind == "field":
+            label = "" if failing else f'<label for="field-{block}">Field {block}</label>'
+            return f'<form>{label}<input id="field-{block}" name="field-{block}" type="text"></form>'
+        if kind == "link":
+            text = '<span class="icon"></span>' if failing else f"Section {block}"
+            return f'<p><a href="#block-{block}">{text}</a></p>'
+        if kind == "table":
+            caption = "" if failing else f"<caption>Table {block}</caption>"
+            rows = "".join(f"<tr><td>{row}</td><td>{row * block}</td></tr>" for row in range(rng.randint(2, 6)))
+            return f"<table>{caption}<tr><th>Row</th><th>Value</th></tr>{rows}</table>"
+        tabindex = f' tabindex="{rng.randint(1, 5)}"' if failing else ""
+        return f'<button type="button"{tabindex}>Action {block}</button>'
+
+    def render_page(self, index):
+        template = self.template(index)
+        rng = random.Random(self.seed * 1_000_003 + index * 7 + 1)
+        links = "\n".join(
+            f'<li><a href="/page/{target}">Page {target}</a></li>' for target in self.page_links(index)
+        )
+        logo_alt = "" if template % 3 == 0 else f' alt="Template {template} logo"'
+        search_label = "" if template % 4 == 1 else '<label for="search">Search</label>'
+        social = '<span class="icon"></span>' if template % 2 == 0 else "Follow us"
+        blocks = "\n".join(
+            f'<section id="block-{block}" class="t{template}-block">{self.render_block(rng, index, block)}</section>'
+            for block in range(self.elements)
+        )
+        return (
+            "<!DOCTYPE html>\n"
+            f'<html lang="en"><head><title>Template {template} page {index}</title></head>\n'
+            f'<body class="template-{template}"><a href="#main">Skip to content</a>\n'
+            f'<header><img src="/static/logo-{template}.png"{logo_alt}><nav><ul>\n{links}\n</ul></nav>'
+            f'<form role="search">{search_label}<input id="search" name="q" type="search"></form></header>\n'
+            f'<main id="main"><h1>Page {index}</h1>\n{blocks}\n</main>\n'
+            f'<footer><a href="#social">{social}</a><p>Synthetic site, template {template}</p></footer>\n'
+            "</body></html>"
+        )
+
+
+class CatalogSite:
+    """A deterministic shop-like site with few layouts and very many URLs.
+
+    Categories link to faceted (color, size, sort) and paginated variants of
+    themselves, products link to related products, and there is a blog and a
+    handful of static pages. robots.txt disallows the cart and search pages and
+    points at a sitemap index with a gzipped product sitemap. `layout(path)`
+    names the template a path renders, to measure how many layouts a crawl
+    covered.
+    """
+
+    COLORS = ("red", "green", "blue", "black", "white")
+    SIZES = ("s", "m", "l", "xl")
+    SORTS = ("price", "name", "newest")
+    STATIC_PAGES = ("about", "contact", "shipping", "returns", "privacy")
+
+    def __init__(self, products=5000, categories=20, posts=300, seed=42, latency=0.0):
+        self.products = products
+        self.categories = categories
+        self.posts = posts
+        self.seed = seed
+        self.latency = latency
+
+    @staticmethod
+    def layout(path):
+        """The template a path (with its query string) renders."""
+        segments = [segment for segment in path.split("?")[0].split("/") if segment]
+        if not segments:
+            return "home"
+        if segments[0] == "category":
+            return "category-filtered" if "?" in path else "category"
+        if segments[0] == "blog":
+            return "blog-post" if len(segments) > 1 else "blog-index"
+        return segments[0]
+
+    def post_slug(self, index):
+        return f"how-to-build-accessible-widgets-part-{index}"
+
+    def category_links(self, category):
+        rng = random.Random(self.seed * 7 + category)
+        links = [f"/product/{rng.randrange(self.products)}" for _ in range(30)]
+        links += [f"/category/{category}?color={color}&size={size}" for color in self.COLORS for size in self.SIZES]
+        links += [f"/category/{category}?sort={sort}" for sort in self.SORTS]
+        links += [f"/category/{category}?page={page}" for page in range(2, 40)]
+        return links
+
+    def page_links(self, path):
+        layout = self.layout(path)
+        rng = random.Random(f"{self.seed}:{path}")
+        links = ["/", "/blog", "/cart", "/search?q=widgets"] + [f"/{page}" for page in self.STATIC_PAGES]
+        links += [f"/category/{category}" for category in range(self.categories)]
+        if layout in ("category", "category-filtered"):
+            links += self.category_links(int(path.split("?")[0].rstrip("/").split("/")[-1]))
+        elif layout in ("product", "home"):
+            links += [f"/product/{rng.randrange(self.products)}" for _ in range(12)]
+        elif layout in ("blog-index", "blog-post"):
+            links += [f"/blog/{self.post_slug(rng.randrange(self.posts))}" for _ in range(10)]
+        return links
+
+    def render_page(self, path):
+        links = "\n".join(f'<li><a href="{link}">{link}</a></li>' for link in self.page_links(path))
+        layout = self.layout(path)
+        return (
+            "<!DOCTYPE html>\n"
+            f'<html lang="en"><head><title>{layout} {path}</title></head>\n'
+            f'<body class="layout-{layout}"><header><nav><ul>\n{links}\n</ul></nav></header>\n'
+            f"<main><h1>{layout}</h1><p>Synthetic {layout} content for {path}.</p>"
+            f'<img src="/static/{layout}.png"></main>\n'
+            "</body></html>"
+        )
+
+    def robots_txt(self, base_url):
+        return (
+            "User-agent: *\n"
+            "Disallow: /cart\n"
+            "Disallow: /search\n"
+            f"Sitemap: {base_url}sitemap_index.xml\n"
+        )
+
+    def sitemap(self, base_url, name):
+        if name == "index":
+            entries = "".join(
+                f"<sitemap><loc>{base_url}{sitemap}</loc></sitemap>"
+                for sitemap in ("sitemap-products.xml.gz", "sitemap-pages.xml")
+            )
+            return f'<?xml version="1.0"?><sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">{entries}</sitemapindex>'
+        if name == "products":
+            paths = [f"product/{index}" for index in range(self.products)]
+        else:
+            paths = ["", "blog"] + list(self.STATIC_PAGES) + [f"category/{index}" for index in range(self.categories)]
+            paths += [f"blog/{self.post_slug(index)}" for index in range(self.posts)]
+        entries = "".join(f"<url><loc>{base_url}{path}</loc></url>" for path in paths)
+        return f'<?xml version="1.0"?><urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">{entries}</urlset>'
+
+    def make_app(self):
+        async def page(request):
+            if self.latency:
+                await asyncio.sleep(self.latency)
+            return web.Response(text=self.render_page(request.path_qs), content_type="text/html")
+
+        async def robots(request):
+            return web.Response(text=self.robots_txt(f"{request.scheme}://{request.host}/"), content_type="text/plain")
+
+        async def sitemap_index(request):
+            return web.Response(text=self.sitemap(f"{request.scheme}://{request.host}/", "index"), content_type="application/xml")
+
+        async def product_sitemap(request):
+            body = gzip.compress(self.sitemap(f"{request.scheme}://{request.host}/", "products").encode())
+            return web.Response(body=body, content_type="application/gzip")
+
+        async def page_sitemap(request):
+            return web.Response(text=self.sitemap(f"{request.scheme}://{request.host}/", "pages"), content_type="application/xml")
+
+        app = web.Application()
+        app.router.add_get("/robots.txt", robots)
+        app.router.add_get("/sitemap_index.xml", sitemap_index)
+        app.router.add_get("/sitemap-products.xml.gz", product_sitemap)
+        app.router.add_get("/sitemap-pages.xml", page_sitemap)
+        app.router.add_get("/{path:.*}", page)
+        return app
+
+
+class SiteServer:
+    """Runs an aiohttp application on a background thread bound to localhost."""
+
+    def __init__(self, app, host="127.0.0.1", port=0):
+        self.app = app
+        self.host = host
+        self.port = port
+        self._loop = None
+        self._runner = None
+        self._thread = None
+        self._ready = threading.Event()
+
+    @property
+    def base_url(self):
+        return f"http://{self.host}:{self.port}/"
+
+    def __enter__(self):
+        self._thread = threading.Thread(target=self._serve, daemon=True)
+        self._thread.start()
+        self._ready.wait()
+        return self
+
+    def __exit__(self, *exc):
+        asyncio.run_coroutine_threadsafe(self._runner.cleanup(), self._loop).result()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+
+    def _serve(self):
+        self._loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self._loop)
+        self._runner = web.AppRunner(self.app, access_log=None)
+        self._loop.run_until_complete(self._runner.setup())
+        site = web.TCPSite(self._runner, self.host, self.port)
+        self._loop.run_until_complete(site.start())
+        self.port = site._server.sockets[0].getsockname()[1]
+        self._ready.set()
+        self._loop.run_forever()
@@ -0,0 +1,80 @@
+# accessibility_compliance/accessibility_compliance/checkpoint.py
+"""Checkpoints of scans that run as a chain of short batch jobs.
+
+A checkpoint holds everything needed to continue a crawl in a new job: the
+visited URLs with their depths, the frontier still to fetch, the crawler and
+progress counters and the running score totals. It is written in the same
+transaction as the issues of the pages it marks as done, so a job that dies
+loses at most the pages since its last checkpoint and never duplicates rows.
+"""
+import base64
+import json
+import zlib
+
+import frappe
+from frappe.utils import cint, now
+
+CHECKPOINT_DOCTYPE = "Website Scan Checkpoint"
+
+
+def _encode(state):
+    return base64.b64encode(zlib.compress(json.dumps(state, separators=(",", ":")).encode())).decode()
+
+
+def _decode(data):
+    return json.loads(zlib.decompress(base64.b64decode(data)))
+
+
+def load_checkpoint(scan_id):
+    """The checkpoint of an unfinished scan as a dict, or None if the scan has none."""
+    row = frappe.db.get_value(
+        CHECKPOINT_DOCTYPE, scan_id, ["batch", "attempts", "run_started", "state"], as_dict=True
+    )
+    if not row:
+        return None
+    return frappe._dict(
+        batch=cint(row.batch),
+        attempts=cint(row.attempts),
+        run_started=row.run_started,
+        state=_decode(row.state) if row.state else {}
+    )
+
+
+def checkpoint_summary(scan_id):
+    """Page counts of an unfinished scan for status responses, without decoding the state."""
+    return frappe.db.get_value(
+        CHECKPOINT_DOCTYPE, scan_id, ["batch", "pages_done", "pages_pending", "modified"], as_dict=True
+    )
+
+
+def create_checkpoint(scan_id, run_started):
+    frappe.get_doc({
+        "doctype": CHECKPOINT_DOCTYPE,
+        "website_scan": scan_id,
+        "batch": 0,
+        "attempts": 1,
+        "run_started": run_started,
+        "pages_done": 0,
+        "pages_pending": 0
+    }).insert(ignore_permissions=True)
+
+
+def save_checkpoint(scan_id, state, pages_done, pages_pending, batch=None):
+    """Store the crawl state; the caller commits it together with the issues it covers."""
+    values = {
+        "state": _encode(state),
+        "pages_done": pages_done,
+        "pages_pending": pages_pending,
+        "modified": now()
+    }
+    if batch is not None:
+        values.update({"batch": batch, "attempts": 1})
+    frappe.db.set_value(CHECKPOINT_DOCTYPE, scan_id, values, update_modified=False)
+
+
+def record_attempt(scan_id, attempts):
+    frappe.db.set_value(CHECKPOINT_DOCTYPE, scan_id, "attempts", attempts, update_modified=False)
+
+
+def delete_checkpoint(scan_id):
+    frappe.db.delete(CHECKPOINT_DOCTYPE, {"name": scan_id})
@@ -0,0 +1,219 @@
+# accessibility_compliance/accessibility_compliance/contrast.py
+"""WCAG color contrast computation.
+
+Colors are parsed once per distinct string (LRU cached) into sRGB components;
+contrast ratios for whole pages or sites are then computed in a single
+vectorized NumPy call.
+"""
+import colorsys
+import re
+from functools import lru_cache
+
+import numpy as np
+
+AA_NORMAL = 4.5
+AA_LARGE = 3.0
+AAA_NORMAL = 7.0
+AAA_LARGE = 4.5
+
+# Large text per WCAG: at least 18pt (24px), or 14pt (18.66px) bold
+LARGE_TEXT_PX = 24.0
+LARGE_BOLD_TEXT_PX = 18.66
+
+NAMED_COLORS = {
+    "aliceblue": "#f0f8ff", "antiquewhite": "#faebd7", "aqua": "#00ffff", "aquamarine": "#7fffd4",
+    "azure": "#f0ffff", "beige": "#f5f5dc", "bisque": "#ffe4c4", "black": "#000000",
+    "blanchedalmond": "#ffebcd", "blue": "#0000ff", "blueviolet": "#8a2be2", "brown": "#a52a2a",
+    "burlywood": "#deb887", "cadetblue": "#5f9ea0", "chartreuse": "#7fff00", "chocolate": "#d2691e",
+    "coral": "#ff7f50", "cornflowerblue": "#6495ed", "cornsilk": "#fff8dc", "crimson": "#dc143c",
+    "cyan": "#00ffff", "darkblue": "#00008b", "darkcyan": "#008b8b", "darkgoldenrod": "#b8860b",
+    "darkgray": "#a9a9a9", "darkgreen": "#006400", "darkgrey": "#a9a9a9", "darkkhaki": "#bdb76b",
+    "darkmagenta": "#8b008b", "darkolivegreen": "#556b2f", "darkorange": "#ff8c00", "darkorchid": "#9932cc",
+    "darkred": "#8b0000", "darksalmon": "#e9967a", "darkseagreen": "#8fbc8f", "darkslateblue": "#483d8b",
+    "darkslategray": "#2f4f4f", "darkslategrey": "#2f4f4f", "darkturquoise": "#00ced1", "darkviolet": "#9400d3",
+    "deeppink": "#ff1493", "deepskyblue": "#00bfff", "dimgray": "#696969", "dimgrey": "#696969",
+    "dodgerblue": "#1e90ff", "firebrick": "#b22222", "floralwhite": "#fffaf0", "forestgreen": "#228b22",
+    "fuchsia": "#ff00ff", "gainsboro": "#dcdcdc", "ghostwhite": "#f8f8ff", "gold": "#ffd700",
+    "goldenrod": "#daa520", "gray": "#808080", "green": "#008000", "greenyellow": "#adff2f",
+    "grey": "#808080", "honeydew": "#f0fff0", "hotpink": "#ff69b4", "indianred": "#cd5c5c",
+    "indigo": "#4b0082", "ivory": "#fffff0", "khaki": "#f0e68c", "lavender": "#e6e6fa",
+    "lavenderblush": "#fff0f5", "lawngreen": "#7cfc00", "lemonchiffon": "#fffacd", "lightblue": "#add8e6",
+    "lightcoral": "#f08080", "lightcyan": "#e0ffff", "lightgoldenrodyellow": "#fafad2", "lightgray": "#d3d3d3",
+    "lightgreen": "#90ee90", "lightgrey": "#d3d3d3", "lightpink": "#ffb6c1", "lightsalmon": "#ffa07a",
+    "lightseagreen": "#20b2aa", "lightskyblue": "#87cefa", "lightslategray": "#778899", "lightslategrey": "#778899",
+    "lightsteelblue": "#b0c4de", "lightyellow": "#ffffe0", "lime": "#00ff00", "limegreen": "#32cd32",
+    "linen": "#faf0e6", "magenta": "#ff00ff", "maroon": "#800000", "mediumaquamarine": "#66cdaa",
+    "mediumblue": "#0000cd", "mediumorchid": "#ba55d3", "mediumpurple": "#9370db", "mediumseagreen": "#3cb371",
+    "mediumslateblue": "#7b68ee", "mediumspringgreen": "#00fa9a", "mediumturquoise": "#48d1cc", "mediumvioletred": "#c71585",
+    "midnightblue": "#191970", "mintcream": "#f5fffa", "mistyrose": "#ffe4e1", "moccasin": "#ffe4b5",
+    "navajowhite": "#ffdead", "navy": "#000080", "oldlace": "#fdf5e6", "olive": "#808000",
+    "olivedrab": "#6b8e23", "orange": "#ffa500", "orangered": "#ff4500", "orchid": "#da70d6",
+    "palegoldenrod": "#eee8aa", "palegreen": "#98fb98", "paleturquoise": "#afeeee", "palevioletred": "#db7093",
+    "papayawhip": "#ffefd5", "peachpuff": "#ffdab9", "peru": "#cd853f", "pink": "#ffc0cb",
+    "plum": "#dda0dd", "powderblue": "#b0e0e6", "purple": "#800080", "rebeccapurple": "#663399",
+    "red": "#ff0000", "rosybrown": "#bc8f8f", "royalblue": "#4169e1", "saddlebrown": "#8b4513",
+    "salmon": "#fa8072", "sandybrown": "#f4a460", "seagreen": "#2e8b57", "seashell": "#fff5ee",
+    "sienna": "#a0522d", "silver": "#c0c0c0", "skyblue": "#87ceeb", "slateblue": "#6a5acd",
+    "slategray": "#708090", "slategrey": "#708090", "snow": "#fffafa", "springgreen": "#00ff7f",
+    "steelblue": "#4682b4", "tan": "#d2b48c", "teal": "#008080", "thistle": "#d8bfd8",
+    "tomato": "#ff6347", "turquoise": "#40e0d0", "violet": "#ee82ee", "wheat": "#f5deb3",
+    "white": "#ffffff", "whitesmoke": "#f5f5f5", "yellow": "#ffff00", "yellowgreen": "#9acd32",
+    "transparent": "#00000000"
+}
+
+_FUNC_RE = re.compile(r"^(rgba?|hsla?)\((.*)\)$")
+
+
+class InvalidColorError(ValueError):
+    pass
+
+
+def normalize_color(value):
+    """Canonical string form used as the cache key for a color."""
+    return re.sub(r"\s+", " ", (value or "").strip().lower())
+
+
+def _channel(value, scale):
+    value = value.strip()
+    if value.endswith("%"):
+        return float(value[:-1]) / 100.0
+    return float(value) / scale
+
+
+def _split_args(args):
+    # Accept both "r, g, b, a" and the CSS4 "r g b / a" syntaxes
+    args = args.replace("/", " ").replace(",", " ")
+    return args.split()
+
+
+def _hue(value):
+    value = value.strip()
+    for unit, factor in (("deg", 1.0), ("grad", 0.9), ("rad", 57.29577951308232), ("turn", 360.0)):
+        if value.endswith(unit):
+            return float(value[:-len(unit)]) * factor % 360
+    return float(value) % 360
+
+
+@lru_cache(maxsize=4096)
+def parse_color(value):
+    """Parse a CSS color into an (r, g, b, a) tuple of floats in 0..1."""
+    color = normalize_color(value)
+    color = NAMED_COLORS.get(color, color)
+
+    try:
+        if color.startswith("#"):
+            digits = color[1:]
+            if len(digits) in (3, 4):
+                digits = "".join(ch * 2 for ch in digits)
+            if len(digits) == 6:
+                digits += "ff"
+            if len(digits) != 8:
+                raise InvalidColorError(value)
+            r, g, b, a = (int(digits[i:i + 2], 16) / 255.0 for i in range(0, 8, 2))
+            return (r, g, b, a)
+
+        match = _FUNC_RE.match(color)
+        if match:
+            func, args = match.groups()
+            parts = _split_args(args)
+            if len(parts) not in (3, 4):
+                raise InvalidColorError(value)
+            alpha = _channel(parts[3], 1.0) if len(parts) == 4 else 1.0
+            if func.startswith("rgb"):
+                r, g, b = (_channel(part, 255.0) for part in parts[:3])
+            else:
+                h = _hue(parts[0]) / 360.0
+                s = _channel(parts[1] if parts[1].endswith("%") else parts[1] + "%", 1.0)
+                l = _channel(parts[2] if parts[2].endswith("%") else parts[2] + "%", 1.0)
+                r, g, b = colorsys.hls_to_rgb(h, l, s)
+            clamp = lambda x: min(1.0, max(0.0, x))
+            return (clamp(r), clamp(g), clamp(b), clamp(alpha))
+    except (ValueError, IndexError):
+        raise InvalidColorError(value)
+
+    raise InvalidColorError(value)
+
+
+def _linearize(channels):
+    return np.where(channels <= 0.04045, channels / 12.92, ((channels + 0.055) / 1.055) ** 2.4)
+
+
+def relative_luminance(rgb):
+    """WCAG relative luminance for an array of sRGB colors shaped (..., 3)."""
+    linear = _linearize(np.asarray(rgb, dtype=np.float64))
+    return linear @ np.array([0.2126, 0.7152, 0.0722])
+
+
+def _parse_many(colors):
+    if isinstance(colors, np.ndarray) and colors.dtype.kind == "f":
+        # Already numeric: (N, 3) RGB or (N, 4) RGBA in 0..1
+        if colors.shape[1] == 3:
+            return np.hstack([colors, np.ones((len(colors), 1))])
+        return colors
+
+    # Parse each distinct string once, then expand with a NumPy gather
+    lookup = {}
+    index = np.fromiter((lookup.setdefault(c, len(lookup)) for c in colors), dtype=np.intp, count=len(colors))
+    table = np.array([parse_color(c) for c in lookup], dtype=np.float64).reshape(-1, 4)
+    return table[index]
+
+
+def _color_arrays(foregrounds, backgrounds):
+    fg = _parse_many(foregrounds)
+    bg = _parse_many(backgrounds)
+    # Semi-transparent backgrounds sit on white; semi-transparent text is composited over its background
+    bg_rgb = bg[:, :3] * bg[:, 3:] + (1.0 - bg[:, 3:])
+    fg_rgb = fg[:, :3] * fg[:, 3:] + bg_rgb * (1.0 - fg[:, 3:])
+    return fg_rgb, bg_rgb
+
+
+def contrast_ratios(foregrounds, backgrounds):
+    """Vectorized contrast ratios for parallel sequences of foreground/background colors.
+
+    Each side may be a sequence of CSS color strings or a float array of RGB(A)
+    rows in 0..1.
+    """
+    if len(foregrounds) != len(backgrounds):
+        raise ValueError("foregrounds and backgrounds must have the same length")
+    if not len(foregrounds):
+        return np.empty(0)
+
+    fg_rgb, bg_rgb = _color_arrays(foregrounds, backgrounds)
+    luminance = relative_luminance(np.concatenate([fg_rgb, bg_rgb]))
+    fg_lum, bg_lum = luminance[:len(fg_rgb)], luminance[len(fg_rgb):]
+    return (np.maximum(fg_lum, bg_lum) + 0.05) / (np.minimum(fg_lum, bg_lum) + 0.05)
+
+
+def contrast_ratio(foreground, background):
+    """Contrast ratio for a single pair; score many pairs with `evaluate_contrast` instead."""
+    return float(contrast_ratios([foreground], [background])[0])
+
+
+def is_large_text(font_size_px=None, font_weight=None, text_size=None):
+    """WCAG large-text test from a pixel size and weight, or an explicit `text_size` of normal/large."""
+    if text_size:
+        return text_size == "large"
+    if not font_size_px:
+        return False
+    weight = font_weight or 400
+    if isinstance(weight, str):
+        weight = 700 if weight in ("bold", "bolder") else int(weight) if weight.isdigit() else 400
+    return font_size_px >= LARGE_TEXT_PX or (weight >= 700 and font_size_px >= LARGE_BOLD_TEXT_PX)
+
+
+def thresholds(large):
+    """Return the (AA, AAA) minimum contrast ratios."""
+    return (AA_LARGE, AAA_LARGE) if large else (AA_NORMAL, AAA_NORMAL)
+
+
+def evaluate_contrast(foregrounds, backgrounds, large_text=None):
+    """Score many pairs at once.
+
+    Returns a dict of NumPy arrays: `ratio`, `aa` and `aaa` pass flags.
+    `large_text` is an optional boolean sequence aligned with the colors.
+    """
+    ratios = contrast_ratios(foregrounds, backgrounds)
+    large = np.zeros(len(ratios), dtype=bool) if large_text is None else np.asarray(large_text, dtype=bool)
+    aa_min = np.where(large, AA_LARGE, AA_NORMAL)
+    aaa_min = np.where(large, AAA_LARGE, AAA_NORMAL)
+    return {"ratio": ratios, "aa": ratios >= aa_min, "aaa": ratios >= aaa_min}
@@ -0,0 +1,512 @@
+# accessibility_compliance/accessibility_compliance/crawler.py
+import asyncio
+import re
+import time
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from urllib.parse import parse_qsl, urlencode, urljoin, urlparse, urlunparse
+
+import aiohttp
+
+from accessibility_compliance.accessibility_compliance.frontier import (
+    MAX_SITEMAP_BYTES,
+    FrontierPolicy,
+    allow_all_robots,
+    parse_robots,
+    parse_sitemap
+)
+
+DEFAULT_USER_AGENT = "AccessibilityComplianceBot/1.0 (+https://github.com/chinmaybhatk/accessibility_compliance)"
+
+try:
+    import brotli  # noqa: F401
+
+    ACCEPT_ENCODING = "gzip, deflate, br"
+except ImportError:
+    ACCEPT_ENCODING = "gzip, deflate"
+
+# Links to these resources are never HTML pages, so they would only waste the page budget
+SKIPPED_EXTENSIONS = (
+    ".png", ".jpg", ".jpeg", ".gif", ".svg", ".webp", ".ico", ".bmp",
+    ".pdf", ".zip", ".gz", ".tar", ".rar", ".7z", ".exe", ".dmg",
+    ".mp3", ".mp4", ".avi", ".mov", ".webm", ".woff", ".woff2", ".ttf",
+    ".css", ".js", ".json", ".xml", ".rss", ".txt", ".csv", ".doc", ".docx",
+    ".xls", ".xlsx", ".ppt", ".pptx"
+)
+
+MAX_BODY_BYTES = 5 * 1024 * 1024
+MAX_ROBOTS_BYTES = 512 * 1024
+MAX_SITEMAP_FILES = 20
+
+# Query parameters that identify a visitor or campaign rather than content
+TRACKING_PARAMS = {"gclid", "fbclid", "msclkid", "dclid", "yclid", "igshid", "mc_cid", "mc_eid", "_ga", "_gl",
+                   "sessionid", "sid", "phpsessid", "jsessionid"}
+
+_HREF_RE = re.compile(rb"""<a\s[^>]*?href\s*=\s*(?:"([^"]*)"|'([^']*)'|([^\s>]+))""", re.IGNORECASE)
+_BASE_RE = re.compile(rb"""<base\s[^>]*?href\s*=\s*(?:"([^"]*)"|'([^']*)'|([^\s>]+))""", re.IGNORECASE)
+
+
+async def read_body(response, limit):
+    """Read at most `limit` bytes of an aiohttp response; anything past the cap is not downloaded."""
+    chunks = []
+    size = 0
+    while size < limit:
+        chunk = await response.content.read(limit - size)
+        if not chunk:
+            break
+        chunks.append(chunk)
+        size += len(chunk)
+    return b"".join(chunks)
+
+
+@dataclass
+class CrawlConfig:
+    """Settings for a single crawl."""
+    start_url: str
+    max_depth: int = 3
+    max_pages: int = 50
+    include_subdomains: bool = False
+    concurrency: int = 10
+    per_host_concurrency: int = 4
+    per_host_interval: float = 0.1
+    timeout: float = 20.0
+    user_agent: str = DEFAULT_USER_AGENT
+    max_body_bytes: int = MAX_BODY_BYTES
+    respect_robots: bool = True
+    use_sitemaps: bool = True
+    max_frontier: int = 5000
+    max_query_variants: int = 3
+    bloom_capacity: int = 0
+
+
+@dataclass
+class FetchedPage:
+    """A page returned by the crawler."""
+    url: str
+    depth: int
+    status: int = 0
+    content_type: str = ""
+    body: bytes = b""
+    headers: dict = field(default_factory=dict)
+    elapsed: float = 0.0
+    error: str = None
+    links: list = field(default_factory=list)
+    requested_url: str = None
+
+    @property
+    def is_html(self):
+        return self.status == 200 and "html" in self.content_type
+
+    @property
+    def not_modified(self):
+        """The server confirmed the page is unchanged since the validators sent with the request."""
+        return self.status == 304
+
+
+@dataclass
+class KnownPage:
+    """What a previous crawl learned about a page, used for conditional requests."""
+    etag: str = None
+    last_modified: str = None
+    links: tuple = ()
+
+
+@dataclass
+class CrawlStats:
+    """Counters collected while crawling."""
+    pages_discovered: int = 0
+    pages_fetched: int = 0
+    pages_failed: int = 0
+    bytes_downloaded: int = 0
+    duration: float = 0.0
+    urls_from_sitemaps: int = 0
+    urls_disallowed: int = 0
+    urls_collapsed: int = 0
+
+
+def normalize_url(url, base=None):
+    """Return a canonical form of `url` used for deduplication, or None if it is not crawlable."""
+    if base:
+        url = urljoin(base, url.strip())
+
+    parsed = urlparse(url)
+    scheme = parsed.scheme.lower()
+    if scheme not in ("http", "https") or not parsed.hostname:
+        return None
+
+    host = parsed.hostname.lower()
+    port = parsed.port
+    if port and not ((scheme == "http" and port == 80) or (scheme == "https" and port == 443)):
+        host = f"{host}:{port}"
+
+    path = re.sub(r"/{2,}", "/", parsed.path or "/")
+    query = urlencode(sorted(
+        (name, value) for name, value in parse_qsl(parsed.query, keep_blank_values=True)
+        if not name.lower().startswith("utm_") and name.lower() not in TRACKING_PARAMS
+    ))
+
+    return urlunparse((scheme, host, path, "", query, ""))
+
+
+def site_host(url):
+    """Return the host of `url` without a leading `www.`."""
+    host = (urlparse(url).hostname or "").lower()
+    return host[4:] if host.startswith("www.") else host
+
+
+def is_in_scope(url, root_host, include_subdomains=False):
+    """Check whether `url` belongs to the site rooted at `root_host`."""
+    host = site_host(url)
+    if host == root_host:
+        return True
+    return bool(include_subdomains and host.endswith("." + root_host))
+
+
+def extract_links(body, base_url):
+    """Extract raw `<a href>` targets from an HTML body without building a DOM."""
+    base_match = _BASE_RE.search(body)
+    if base_match:
+        base_href = next(g for g in base_match.groups() if g is not None)
+        base_url = urljoin(base_url, base_href.decode("utf-8", "ignore"))
+
+    links = []
+    for match in _HREF_RE.finditer(body):
+        href = next(g for g in match.groups() if g is not None).decode("utf-8", "ignore").strip()
+        if not href or href.startswith(("#", "mailto:", "tel:", "javascript:", "data:")):
+            continue
+        links.append(urljoin(base_url, href))
+    return links
+
+
+class HostRateLimiter:
+    """Caps concurrent requests per host and spaces request starts by a minimum interval."""
+
+    def __init__(self, max_concurrency=4, min_interval=0.0):
+        self.max_concurrency = max_concurrency
+        self.min_interval = min_interval
+        self._semaphores = {}
+        self._locks = {}
+        self._next_slot = {}
+
+    @asynccontextmanager
+    async def slot(self, host):
+        semaphore = self._semaphores.setdefault(host, asyncio.Semaphore(self.max_concurrency))
+        async with semaphore:
+            if self.min_interval > 0:
+                lock = self._locks.setdefault(host, asyncio.Lock())
+                async with lock:
+                    loop = asyncio.get_running_loop()
+                    now = loop.time()
+                    wait = self._next_slot.get(host, now) - now
+                    if wait > 0:
+                        await asyncio.sleep(wait)
+                    self._next_slot[host] = max(now, self._next_slot.get(host, now)) + self.min_interval
+            yield
+
+
+class Crawler:
+    """Concurrent crawler with per-host politeness and a prioritized frontier.
+
+    The frontier is seeded from the start URL and the site's sitemaps and
+    honors robots.txt. URLs are fetched in order of their rank from
+    `FrontierPolicy` (distinct page templates first), then depth, until
+    `max_pages` pages have been fetched; at most `max_frontier` URLs wait in
+    the frontier at a time.
+
+    Pages are handed to `on_page` as soon as they are fetched so analysis can
+    overlap with the rest of the crawl. `on_page` may be a plain function or a
+    coroutine function.
+
+    `known_pages` maps normalized URLs to `KnownPage` entries from an earlier
+    crawl. Those pages are requested conditionally; a 304 response has no body,
+    so the crawl continues through the links recorded for the page last time.
+
+    A crawl can be stopped early with `stop()` and continued later by another
+    crawler through `resume()` with the visited URLs and the `pending()` frontier.
+    """
+
+    def __init__(self, config, on_page=None, session=None, known_pages=None):
+        self.config = config
+        self.on_page = on_page
+        self.known_pages = known_pages or {}
+        self.stats = CrawlStats()
+        self.limiter = HostRateLimiter(config.per_host_concurrency, config.per_host_interval)
+        self._session = session
+        self._root_host = site_host(config.start_url)
+        self.policy = FrontierPolicy(config.max_query_variants, config.bloom_capacity, max_rank=config.max_pages)
+        self.robots = allow_all_robots()
+        self._seen = {}
+        self._frontier = None
+        self._fetched = 0
+        self._in_flight = set()
+        self._sequence = 0
+        self._stopping = False
+        self._error = None
+        self._queue = None
+
+    @property
+    def visited(self):
+        """URL -> depth of every page discovered so far (fetched or still queued)."""
+        return self._seen
+
+    @property
+    def budget_spent(self):
+        return self._fetched >= self.config.max_pages
+
+    def resume(self, visited, frontier):
+        """Continue an earlier crawl: `visited` maps URLs to depths, `frontier` lists (url, depth) to fetch."""
+        self._seen = dict(visited)
+        self._frontier = [tuple(item) for item in frontier]
+        self._fetched = len(self._seen) - len(self._frontier)
+
+    def stop(self):
+        """Finish the pages being fetched and leave everything still queued unfetched."""
+        self._stopping = True
+
+    def pending(self, completed):
+        """(url, depth) of every discovered page that is not in `completed`."""
+        if self.budget_spent:
+            # Queued URLs beyond the page budget will never be fetched
+            self._seen = {url: depth for url, depth in self._seen.items() if url in completed or url in self._in_flight}
+        return [(url, depth) for url, depth in self._seen.items() if url not in completed]
+
+    def run(self):
+        """Run the crawl to completion from synchronous code."""
+        return asyncio.run(self.crawl())
+
+    async def crawl(self):
+        start = time.monotonic()
+        self._queue = asyncio.PriorityQueue()
+
+        async with self._client() as session:
+            if self.config.respect_robots or self.config.use_sitemaps:
+                await self._load_robots(session)
+
+            if self._frontier is not None:
+                queued = {url for url, _depth in self._frontier}
+                for url in self._seen:
+                    self.policy.consider(url)
+                    if url not in queued:
+                        self.policy.rank(url)
+                for url, depth in self._frontier:
+                    self._push(url, depth, self.policy.rank(url))
+            else:
+                start_url = normalize_url(self.config.start_url)
+                if start_url:
+                    # The start URL was asked for explicitly, so robots.txt does not apply to it
+                    self._enqueue(start_url, 0, check_robots=False)
+
+            workers = [
+                asyncio.create_task(self._worker(session))
+                for _ in range(max(1, self.config.concurrency))
+            ]
+            # Sitemaps are read while the workers already fetch the pages queued so far
+            seeding = None
+            if self._frontier is None and self.config.use_sitemaps and self.config.max_depth > 0:
+                seeding = asyncio.create_task(self._seed_from_sitemaps(session))
+                workers.append(seeding)
+            try:
+                if seeding is not None:
+                    await seeding
+                await self._queue.join()
+            finally:
+                for worker in workers:
+                    worker.cancel()
+                await asyncio.gather(*workers, return_exceptions=True)
+
+        self.stats.duration += time.monotonic() - start
+        if self._error is not None:
+            raise self._error
+        return self.stats
+
+    @asynccontextmanager
+    async def _client(self):
+        if self._session is not None:
+            yield self._session
+            return
+
+        connector = aiohttp.TCPConnector(
+            limit=self.config.concurrency,
+            limit_per_host=self.config.per_host_concurrency,
+            ttl_dns_cache=300,
+            enable_cleanup_closed=True
+        )
+        timeout = aiohttp.ClientTimeout(total=self.config.timeout)
+        headers = {
+            "User-Agent": self.config.user_agent,
+            "Accept": "text/html,application/xhtml+xml",
+            "Accept-Encoding": ACCEPT_ENCODING
+        }
+        async with aiohttp.ClientSession(connector=connector, timeout=timeout, headers=headers) as session:
+            yield session
+
+    def _enqueue(self, url, depth, check_robots=True):
+        """Add `url` to the frontier; returns whether it was added."""
+        if url in self._seen or self.budget_spent:
+            return False
+        if len(self._seen) - self._fetched >= self.config.max_frontier:
+            return False
+        if not self.policy.consider(url):
+            return False
+        if check_robots and self.config.respect_robots and not self.robots.can_fetch(self.config.user_agent, url):
+            self.stats.urls_disallowed += 1
+            return False
+        rank = self.policy.admit(url)
+        if rank is None:
+            self.stats.urls_collapsed += 1
+            return False
+        self._seen[url] = depth
+        self.stats.pages_discovered += 1
+        self._push(url, depth, rank)
+        return True
+
+    def _push(self, url, depth, rank):
+        self._sequence += 1
+        self._queue.put_nowait((rank, depth, self._sequence, url))
+
+    async def _worker(self, session):
+        while True:
+            _rank, depth, _sequence, url = await self._queue.get()
+            try:
+                if self._stopping or self.budget_spent:
+                    continue
+                self._fetched += 1
+                self._in_flight.add(url)
+                page = await self._fetch(session, url, depth)
+                if page.is_html:
+                    page.links = extract_links(page.body, page.url)
+                elif page.not_modified and url in self.known_pages:
+                    page.links = list(self.known_pages[url].links)
+                if depth < self.config.max_depth:
+                    self._follow_links(page)
+                await self._deliver(page)
+            except Exception as e:
+                # An error here, usually from the page callback, fails the crawl: the queue drains
+                # unfetched and crawl() re-raises it once the workers are gone
+                if self._error is None:
+                    self._error = e
+                self._stopping = True
+            finally:
+                self._in_flight.discard(url)
+                self._queue.task_done()
+
+    async def _fetch(self, session, url, depth):
+        page = FetchedPage(url=url, depth=depth, requested_url=url)
+        started = time.monotonic()
+        try:
+            async with self.limiter.slot(site_host(url)):
+                async with session.get(url, allow_redirects=True, headers=self._conditional_headers(url)) as response:
+                    page.status = response.status
+                    page.headers = dict(response.headers)
+                    page.content_type = response.headers.get("Content-Type", "").lower()
+                    if "html" in page.content_type:
+                        page.body = await read_body(response, self.config.max_body_bytes)
+                    final_url = normalize_url(str(response.url))
+                    if final_url and final_url != url:
+                        page.url = final_url
+            self.stats.pages_fetched += 1
+            self.stats.bytes_downloaded += len(page.body)
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            page.error = str(e) or e.__class__.__name__
+            self.stats.pages_failed += 1
+        page.elapsed = time.monotonic() - started
+        return page
+
+    def _conditional_headers(self, url):
+        known = self.known_pages.get(url)
+        if known is None:
+            return None
+        headers = {}
+        if known.etag:
+            headers["If-None-Match"] = known.etag
+        if known.last_modified:
+            headers["If-Modified-Since"] = known.last_modified
+        return headers or None
+
+    def _crawlable(self, url):
+        if not url or urlparse(url).path.lower().endswith(SKIPPED_EXTENSIONS):
+            return False
+        return is_in_scope(url, self._root_host, self.config.include_subdomains)
+
+    def _follow_links(self, page):
+        for link in page.links:
+            url = normalize_url(link)
+            if self._crawlable(url):
+                self._enqueue(url, page.depth + 1)
+
+    async def _get_text(self, session, url, limit):
+        """Status and body of a small site file such as robots.txt; (0, b"") when it cannot be fetched."""
+        try:
+            async with self.limiter.slot(site_host(url)):
+                async with session.get(url, allow_redirects=True, headers={"Accept": "*/*"}) as response:
+                    return response.status, await read_body(response, limit) if response.status == 200 else b""
+        except (aiohttp.ClientError, asyncio.TimeoutError):
+            return 0, b""
+
+    async def _load_robots(self, session):
+        parsed = urlparse(normalize_url(self.config.start_url) or self.config.start_url)
+        status, body = await self._get_text(session, f"{parsed.scheme}://{parsed.netloc}/robots.txt", MAX_ROBOTS_BYTES)
+        if status in (401, 403):
+            # As urllib.robotparser does: a protected robots.txt disallows everything
+            self.robots = parse_robots("User-agent: *\nDisallow: /")
+        elif status == 200:
+            self.robots = parse_robots(body.decode("utf-8", "ignore"))
+        delay = self.robots.crawl_delay(self.config.user_agent)
+        if delay and float(delay) > self.limiter.min_interval:
+            self.limiter.min_interval = float(delay)
+
+    async def _seed_from_sitemaps(self, session):
+        """Queue the pages listed in the sitemaps from robots.txt, or /sitemap.xml, following sitemap indexes.
+
+        Runs next to the workers and stops once the page budget is spent or the crawl stops.
+        """
+        parsed = urlparse(normalize_url(self.config.start_url) or self.config.start_url)
+        queue = list(self.robots.site_maps() or []) or [f"{parsed.scheme}://{parsed.netloc}/sitemap.xml"]
+        fetched = set()
+        loop = asyncio.get_running_loop()
+        while queue and len(fetched) < MAX_SITEMAP_FILES:
+            if self._stopping or self.budget_spent:
+                return
+            sitemap_url = queue.pop(0)
+            if sitemap_url in fetched:
+                continue
+            fetched.add(sitemap_url)
+            status, body = await self._get_text(session, sitemap_url, MAX_SITEMAP_BYTES)
+            if status != 200:
+                continue
+            # Sitemaps run to tens of megabytes; parsing them would stall the workers' fetches
+            pages, sitemaps = await loop.run_in_executor(None, parse_sitemap, body)
+            queue.extend(sitemaps)
+            for link in pages:
+                url = normalize_url(link)
+                if self._crawlable(url) and self._enqueue(url, 1):
+                    self.stats.urls_from_sitemaps += 1
+                if len(self._seen) - self._fetched >= self.config.max_frontier:
+                    return
+
+    async def _deliver(self, page):
+        if self.on_page is None:
+            return
+        result = self.on_page(page)
+        if asyncio.iscoroutine(result):
+            await result
+
+
+def crawl_site(start_url, max_depth=3, max_pages=50, include_subdomains=False, on_page=None, **options):
+    """Crawl a site and return the fetched pages along with crawl statistics."""
+    pages = []
+
+    def collect(page):
+        pages.append(page)
+        if on_page:
+            on_page(page)
+
+    config = CrawlConfig(
+        start_url=start_url,
+        max_depth=max_depth,
+        max_pages=max_pages,
+        include_subdomains=include_subdomains,
+        **options
+    )
+    stats = Crawler(config, on_page=collect).run()
+    return pages, stats
@@ -0,0 +1,125 @@
+# accessibility_compliance/accessibility_compliance/dashboard.py
+"""Materialized compliance dashboard aggregates.
+
+The dashboard totals live in Redis and are updated incrementally as scans are
+created and completed, issues are written and fixes are applied, so serving
+the dashboard never touches `tabAccessibility Issue`. If the aggregates are
+missing (cache flushed) they are rebuilt from the database once; a daily job
+reconciles them with the tables to correct any drift.
+"""
+import frappe
+from frappe.utils import cint, flt
+
+COUNTERS_KEY = "accessibility_dashboard|counters"
+ISSUE_TYPES_KEY = "accessibility_dashboard|issue_types"
+
+
+def _key(name):
+    return frappe.cache.make_key(name)
+
+
+def _rollup_exists():
+    return bool(frappe.cache.exists(_key(COUNTERS_KEY)))
+
+
+def _increment(counters=None, issue_types=None):
+    # Updates are skipped until the rollup exists; the rebuild picks them up from the tables
+    if not _rollup_exists():
+        return
+    pipe = frappe.cache.pipeline()
+    for field, amount in (counters or {}).items():
+        if amount:
+            pipe.hincrbyfloat(_key(COUNTERS_KEY), field, amount)
+    for issue_type, amount in (issue_types or {}).items():
+        if issue_type and amount:
+            pipe.zincrby(_key(ISSUE_TYPES_KEY), amount, issue_type)
+    pipe.execute()
+
+
+def record_scan_created():
+    _increment({"total_scans": 1})
+
+
+def record_scan_deleted(completed_score=None):
+    counters = {"total_scans": -1}
+    if completed_score is not None:
+        counters.update({"completed_scans": -1, "score_sum": -flt(completed_score)})
+    _increment(counters)
+
+
+def record_scan_completed(score):
+    _increment({"completed_scans": 1, "score_sum": flt(score)})
+
+
+def record_scan_reopened(previous_score):
+    """Withdraw the score of a completed scan that is being run again."""
+    _increment({"completed_scans": -1, "score_sum": -flt(previous_score)})
+
+
+def record_issues_written(issue_type_counts):
+    _increment(issue_types=issue_type_counts)
+
+
+def record_issues_deleted(issue_type_counts, fixed_count=0):
+    _increment({"total_issues_fixed": -cint(fixed_count)},
+               {issue_type: -count for issue_type, count in issue_type_counts.items()})
+
+
+def record_fixes_applied(count):
+    _increment({"total_issues_fixed": cint(count)})
+
+
+def rebuild_dashboard_rollup():
+    """Recompute every aggregate from the database. Runs daily and whenever the rollup is missing."""
+    total_scans = frappe.db.count("Website Scan")
+    completed_scans, score_sum = frappe.db.sql("""
+        SELECT COUNT(*), IFNULL(SUM(compliance_score), 0)
+        FROM `tabWebsite Scan`
+        WHERE scan_status = 'Completed' AND compliance_score IS NOT NULL
+    """)[0]
+    total_issues_fixed = frappe.db.count("Accessibility Issue", {"fix_applied": 1})
+    issue_types = frappe.db.sql("""
+        SELECT issue_type, COUNT(*)
+        FROM `tabAccessibility Issue`
+        WHERE issue_type IS NOT NULL
+        GROUP BY issue_type
+    """)
+
+    counters_key, types_key = _key(COUNTERS_KEY), _key(ISSUE_TYPES_KEY)
+    pipe = frappe.cache.pipeline()
+    pipe.delete(counters_key, types_key)
+    pipe.hset(counters_key, mapping={
+        "total_scans": total_scans,
+        "completed_scans": completed_scans,
+        "score_sum": flt(score_sum),
+        "total_issues_fixed": total_issues_fixed
+    })
+    if issue_types:
+        pipe.zadd(types_key, {issue_type: count for issue_type, count in issue_types})
+    pipe.execute()
+
+
+def get_dashboard_statistics(top_issue_types=10):
+    """Dashboard totals read from the rollup in constant time."""
+    if not _rollup_exists():
+        rebuild_dashboard_rollup()
+
+    pipe = frappe.cache.pipeline()
+    pipe.hgetall(_key(COUNTERS_KEY))
+    pipe.zrevrange(_key(ISSUE_TYPES_KEY), 0, top_issue_types - 1, withscores=True)
+    counters, issue_types = pipe.execute()
+
+    counters = {key.decode(): flt(value.decode()) for key, value in counters.items()}
+    completed = counters.get("completed_scans", 0)
+    return {
+        "statistics": {
+            "total_scans": cint(counters.get("total_scans")),
+            "average_compliance": round(counters.get("score_sum", 0) / completed, 1) if completed else 0,
+            "total_issues_fixed": cint(counters.get("total_issues_fixed"))
+        },
+        "issue_type_distribution": [
+            {"issue_type": issue_type.decode(), "count": cint(count)}
+            for issue_type, count in issue_types
+            if count > 0
+        ]
+    }
@@ -0,0 +1,10 @@
+# Copyright (c) 2024, Accessibility Compliance and contributors
+# License: MIT
+
+from frappe.model.document import Document
+
+
+class MonitoredSite(Document):
+	def validate(self):
+		if not self.website_url.startswith(("http://", "https://")):
+			self.website_url = "https://" + self.website_url
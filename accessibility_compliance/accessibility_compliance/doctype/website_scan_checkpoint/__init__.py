@@ -0,0 +1 @@
+# License: MIT
\ No newline at end of file
@@ -0,0 +1,8 @@
+# Copyright (c) 2024, Accessibility Compliance and contributors
+# License: MIT
+
+from frappe.model.document import Document
+
+
+class WebsiteScanCheckpoint(Document):
+	pass
@@ -0,0 +1,74 @@
+# accessibility_compliance/accessibility_compliance/fixes.py
+import json
+
+import frappe
+from frappe.utils import cint, now
+
+from accessibility_compliance.accessibility_compliance.dashboard import record_fixes_applied
+from accessibility_compliance.accessibility_compliance.remediation_report import clear_report_cache
+
+DEFAULT_FIX_CHUNK_SIZE = 5000
+AUTO_FIX_NOTE = "Automatically fixed by AI system"
+
+
+def _as_list(value):
+    if not value:
+        return None
+    if isinstance(value, str):
+        value = json.loads(value) if value.strip().startswith("[") else [value]
+    return list(value)
+
+
+def apply_fixes(scan_id, issue_ids=None, fix_types=None, developer_notes=AUTO_FIX_NOTE, chunk_size=None):
+    """Mark every matching auto-fixable issue of a scan as fixed with set-based updates.
+
+    Matching rows are selected and locked in one query, then updated in chunks
+    of `chunk_size` names per UPDATE. All chunks run in one transaction which is
+    committed at the end, so a request either fixes every matching issue or none.
+    Needs write permission on the scan. Returns the names of the issues that
+    were updated.
+    """
+    # The updates bypass the documents' own permission checks
+    frappe.has_permission("Website Scan", "write", doc=scan_id, throw=True)
+    issue_ids = _as_list(issue_ids)
+    fix_types = _as_list(fix_types)
+    chunk_size = cint(chunk_size) or cint(frappe.conf.get("fix_update_chunk_size")) or DEFAULT_FIX_CHUNK_SIZE
+
+    Issue = frappe.qb.DocType("Accessibility Issue")
+    query = (
+        frappe.qb.from_(Issue)
+        .select(Issue.name)
+        .where(Issue.website_scan == scan_id)
+        .where(Issue.auto_fixable == 1)
+        .where(Issue.fix_applied == 0)
+        .for_update()
+    )
+    if issue_ids:
+        query = query.where(Issue.name.isin(issue_ids))
+    if fix_types:
+        query = query.where(Issue.issue_type.isin(fix_types))
+
+    try:
+        names = query.run(pluck=True)
+        timestamp = now()
+        for start in range(0, len(names), chunk_size):
+            chunk = names[start:start + chunk_size]
+            (
+                frappe.qb.update(Issue)
+                .set(Issue.fix_applied, 1)
+                .set(Issue.fix_date, timestamp)
+                .set(Issue.status, "Fixed")
+                .set(Issue.developer_notes, developer_notes)
+                .set(Issue.modified, timestamp)
+                .set(Issue.modified_by, frappe.session.user)
+                .where(Issue.name.isin(chunk))
+            ).run()
+        frappe.db.commit()
+    except Exception:
+        frappe.db.rollback()
+        raise
+
+    record_fixes_applied(len(names))
+    if names:
+        clear_report_cache(scan_id)
+    return names
@@ -0,0 +1,199 @@
+# accessibility_compliance/accessibility_compliance/frontier.py
+"""URL frontier policy for the crawler.
+
+On large sites most discovered URLs are variants of a few layouts: product
+pages, pagination and faceted-search queries. The frontier ranks every URL by
+how many URLs of the same template (path shape and query parameter names) were
+queued before it, so the page budget covers each distinct layout before it
+spends pages on more of the same. Query-string variants of one path
+(filters, sorting, pagination) are capped, and a template never queues more
+URLs than the page budget could fetch.
+
+URLs that were already considered are remembered in a compact set of 64-bit
+hashes, or in a fixed-size Bloom filter for very large crawls, so the memory
+for discovered links stays small however many links the pages contain.
+
+Parsing helpers for `robots.txt` and sitemaps (urlsets, sitemap indexes and
+gzipped sitemaps) live here too; the crawler does the fetching.
+"""
+import hashlib
+import io
+import math
+import re
+import zlib
+from urllib.parse import parse_qsl, urlparse
+from urllib.robotparser import RobotFileParser
+
+from lxml import etree
+
+MAX_SITEMAP_BYTES = 50 * 1024 * 1024
+
+# Numbers, hashes and long slugs vary from page to page of the same layout
+_VARIABLE_SEGMENT_RE = re.compile(r"\d|^[0-9a-f]{12,}$|^[\w%]+(?:[-_.][\w%]+){2,}$", re.IGNORECASE)
+
+
+def url_template(url):
+    """The layout a URL most likely renders: host, path shape and query parameter names.
+
+    `/products/1234?color=red` and `/products/987?color=blue` share the template
+    `host/products/:?color`.
+    """
+    parsed = urlparse(url)
+    segments = [":" if _VARIABLE_SEGMENT_RE.search(segment) else segment for segment in parsed.path.split("/") if segment]
+    template = f"{parsed.netloc}/{'/'.join(segments)}"
+    names = sorted({name for name, _value in parse_qsl(parsed.query, keep_blank_values=True)})
+    if names:
+        template += "?" + "&".join(names)
+    return template
+
+
+def query_variant_key(url):
+    """URLs of the same path that differ only in their query string are variants of one page."""
+    parsed = urlparse(url)
+    if not parsed.query:
+        return None
+    return f"{parsed.netloc}{parsed.path}"
+
+
+def _url_hash(url):
+    return hashlib.blake2b(url.encode("utf-8"), digest_size=16).digest()
+
+
+class HashedSet:
+    """An exact-enough set of URLs stored as 64-bit hashes instead of strings."""
+
+    def __init__(self):
+        self._hashes = set()
+
+    def add(self, url):
+        self._hashes.add(int.from_bytes(_url_hash(url)[:8], "little"))
+
+    def __contains__(self, url):
+        return int.from_bytes(_url_hash(url)[:8], "little") in self._hashes
+
+    def __len__(self):
+        return len(self._hashes)
+
+
+class BloomFilter:
+    """A fixed-size set of URLs with a small false positive rate and no false negatives.
+
+    A false positive makes the crawler treat a new URL as already seen, so
+    `error_rate` is the share of new URLs that may be skipped.
+    """
+
+    def __init__(self, capacity, error_rate=0.001):
+        self.size = max(8, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+        self.count = 0
+        self._bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, url):
+        digest = _url_hash(url)
+        first = int.from_bytes(digest[:8], "little")
+        second = int.from_bytes(digest[8:], "little") | 1
+        return [(first + index * second) % self.size for index in range(self.hash_count)]
+
+    def add(self, url):
+        for position in self._positions(url):
+            self._bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, url):
+        return all(self._bits[position >> 3] & (1 << (position & 7)) for position in self._positions(url))
+
+    def __len__(self):
+        return self.count
+
+
+class FrontierPolicy:
+    """Decides which discovered URLs are queued and in which order.
+
+    `consider(url)` filters out URLs seen before. `admit(url)` then returns
+    the URL's rank, the number of URLs of its template queued before it, or
+    None when it is one query variant too many or its rank is beyond
+    `max_rank`. Lower ranks are fetched first.
+    """
+
+    def __init__(self, max_query_variants=3, bloom_capacity=0, max_rank=None):
+        self.max_query_variants = max_query_variants
+        self.max_rank = max_rank
+        self.considered = BloomFilter(bloom_capacity) if bloom_capacity else HashedSet()
+        self.template_counts = {}
+        self.variant_counts = {}
+        self.collapsed = 0
+
+    def consider(self, url):
+        """True the first time `url` is seen, False for every later time."""
+        if url in self.considered:
+            return False
+        self.considered.add(url)
+        return True
+
+    def admit(self, url):
+        if self.max_query_variants:
+            key = query_variant_key(url)
+            if key is not None:
+                variants = self.variant_counts.get(key, 0)
+                if variants >= self.max_query_variants:
+                    self.collapsed += 1
+                    return None
+                self.variant_counts[key] = variants + 1
+        if self.max_rank is not None and self.template_counts.get(url_template(url), 0) >= self.max_rank:
+            # Every other template would be fetched this many times first: past the page budget
+            self.collapsed += 1
+            return None
+        return self.rank(url)
+
+    def rank(self, url):
+        """Count `url` against its template and return its rank; for URLs admitted by an earlier crawl."""
+        template = url_template(url)
+        rank = self.template_counts.get(template, 0)
+        self.template_counts[template] = rank + 1
+        return rank
+
+
+def parse_robots(text):
+    """A RobotFileParser for the body of a robots.txt file."""
+    parser = RobotFileParser()
+    parser.parse(text.splitlines())
+    return parser
+
+
+def allow_all_robots():
+    """The robots policy of a site without a robots.txt."""
+    parser = RobotFileParser()
+    parser.allow_all = True
+    return parser
+
+
+def parse_sitemap(body):
+    """Return (page URLs, nested sitemap URLs) from a sitemap or sitemap index, gzipped or not."""
+    if body[:2] == b"\x1f\x8b":
+        try:
+            # Bounded, so a small gzip bomb cannot expand without limit
+            body = zlib.decompressobj(16 + zlib.MAX_WBITS).decompress(body, MAX_SITEMAP_BYTES)
+        except zlib.error:
+            return [], []
+
+    pages = []
+    sitemaps = []
+    try:
+        for _event, element in etree.iterparse(
+            io.BytesIO(body), events=("end",), tag="{*}loc", resolve_entities=False, no_network=True, recover=True
+        ):
+            location = (element.text or "").strip()
+            parent = element.getparent()
+            if location and parent is not None:
+                if etree.QName(parent).localname == "sitemap":
+                    sitemaps.append(location)
+                else:
+                    pages.append(location)
+            element.clear()
+            # Entries already read are dropped so large sitemaps parse in constant memory
+            if parent is not None:
+                while parent.getprevious() is not None:
+                    del parent.getparent()[0]
+    except etree.LxmlError:
+        pass
+    return pages, sitemaps
@@ -0,0 +1,489 @@
+# accessibility_compliance/accessibility_compliance/http_client.py
+"""Shared HTTP client and on-disk response cache.
+
+Every worker process keeps one pooled `requests` session per site, so
+single-page checks and asset fetches reuse keep-alive connections, and asks
+for gzip (and brotli when a decoder is installed) encoded responses. Responses
+go through a size-bounded on-disk cache: a SQLite index next to the cached
+bodies, shared by all worker processes of the site. The cache follows
+Cache-Control (no-store, no-cache, max-age), Expires and a Last-Modified
+heuristic, revalidates stale entries with ETag / Last-Modified, and evicts
+the least recently used entries once `http_cache_max_mb` is exceeded. Bytes
+served from the cache instead of the network are counted in the index, and
+triggers keep a running total of the bytes stored so eviction checks read one
+row instead of summing the table.
+"""
+import asyncio
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass, field
+from email.utils import parsedate_to_datetime
+
+import frappe
+import requests
+from frappe.utils import cint
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from accessibility_compliance.accessibility_compliance.crawler import ACCEPT_ENCODING, DEFAULT_USER_AGENT, read_body
+from accessibility_compliance.accessibility_compliance.stylesheets import (
+    DEFAULT_CACHE_MB as DEFAULT_STYLESHEET_CACHE_MB,
+    MAX_STYLESHEET_BYTES,
+    StylesheetCache
+)
+
+DEFAULT_CACHE_MAX_MB = 256
+DEFAULT_POOL_SIZE = 20
+DEFAULT_TIMEOUT = 20
+# Freshness given to responses with only a Last-Modified date (RFC 9111 4.2.2), capped
+HEURISTIC_FRACTION = 0.1
+MAX_HEURISTIC_SECONDS = 86400
+# Eviction frees space down to this fraction of the limit, so it does not run on every store
+EVICT_TO = 0.9
+CACHEABLE_STATUSES = (200, 203)
+
+
+@dataclass
+class CacheEntry:
+    key: str
+    url: str
+    status: int
+    headers: dict
+    size: int
+    expires: float
+    etag: str = None
+    last_modified: str = None
+
+
+@dataclass
+class HttpResponse:
+    """The parts of a response the scanner uses, whether it came from the network or the cache."""
+    url: str
+    status: int
+    headers: dict = field(default_factory=dict)
+    content: bytes = b""
+    from_cache: bool = False
+
+    def raise_for_status(self):
+        if self.status >= 400:
+            raise requests.HTTPError(f"{self.status} error for url: {self.url}")
+
+
+def _parse_cache_control(value):
+    directives = {}
+    for part in (value or "").split(","):
+        name, _, argument = part.strip().partition("=")
+        if name:
+            directives[name.lower()] = argument.strip().strip('"')
+    return directives
+
+
+def _http_date(value):
+    try:
+        return parsedate_to_datetime(value).timestamp() if value else None
+    except (TypeError, ValueError):
+        return None
+
+
+def cache_policy(status, headers, now=None):
+    """Expiry timestamp of a response, or None if it must not be stored.
+
+    Responses that are already stale are only worth storing when they carry a
+    validator, since they are revalidated before every use.
+    """
+    if status not in CACHEABLE_STATUSES:
+        return None
+    headers = {key.lower(): value for key, value in headers.items()}
+    now = now or time.time()
+    directives = _parse_cache_control(headers.get("cache-control"))
+    if "no-store" in directives or headers.get("vary", "").strip() == "*":
+        return None
+
+    if "no-cache" in directives:
+        expires = now
+    elif "max-age" in directives:
+        expires = now + cint(directives["max-age"])
+    elif headers.get("expires"):
+        # Expires is relative to the server's clock
+        server_now = _http_date(headers.get("date")) or now
+        expires = now + ((_http_date(headers["expires"]) or server_now) - server_now)
+    elif headers.get("last-modified"):
+        age = (_http_date(headers.get("date")) or now) - (_http_date(headers["last-modified"]) or now)
+        expires = now + min(max(age, 0) * HEURISTIC_FRACTION, MAX_HEURISTIC_SECONDS)
+    else:
+        expires = now
+
+    if expires <= now and not (headers.get("etag") or headers.get("last-modified")):
+        return None
+    return expires
+
+
+class ResponseCache:
+    """Size-bounded LRU cache of response bodies on disk, indexed in SQLite."""
+
+    def __init__(self, directory, max_bytes):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._local = threading.local()
+        os.makedirs(os.path.join(directory, "bodies"), exist_ok=True)
+        with self._db() as db:
+            db.execute("""
+                CREATE TABLE IF NOT EXISTS entries (
+                    key TEXT PRIMARY KEY, url TEXT, status INTEGER, headers TEXT, size INTEGER,
+                    expires REAL, etag TEXT, last_modified TEXT, last_access REAL
+                )
+            """)
+            db.execute("CREATE INDEX IF NOT EXISTS entries_last_access ON entries (last_access)")
+            db.execute("CREATE TABLE IF NOT EXISTS counters (name TEXT PRIMARY KEY, value INTEGER)")
+            # Caches created before the running total start from the size of what they hold
+            db.execute("INSERT OR IGNORE INTO counters SELECT 'bytes_stored', IFNULL(SUM(size), 0) FROM entries")
+            for event, delta in (
+                ("INSERT", "NEW.size"),
+                ("UPDATE OF size", "NEW.size - OLD.size"),
+                ("DELETE", "-OLD.size")
+            ):
+                db.execute(f"""
+                    CREATE TRIGGER IF NOT EXISTS entries_size_{event.split()[0].lower()} AFTER {event} ON entries
+                    BEGIN
+                        UPDATE counters SET value = value + {delta} WHERE name = 'bytes_stored';
+                    END
+                """)
+
+    def _db(self):
+        db = getattr(self._local, "db", None)
+        if db is None:
+            db = sqlite3.connect(os.path.join(self.directory, "index.sqlite3"), timeout=30)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+            self._local.db = db
+        return db
+
+    @staticmethod
+    def key(url):
+        return hashlib.sha256(url.encode()).hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.directory, "bodies", key[:2], key)
+
+    def lookup(self, url):
+        key = self.key(url)
+        row = self._db().execute(
+            "SELECT url, status, headers, size, expires, etag, last_modified FROM entries WHERE key = ?", (key,)
+        ).fetchone()
+        if not row:
+            return None
+        return CacheEntry(key, row[0], row[1], json.loads(row[2]), row[3], row[4], row[5], row[6])
+
+    def read(self, entry):
+        """Body of an entry, or None if the file was evicted by another process."""
+        try:
+            with open(self._path(entry.key), "rb") as f:
+                return f.read()
+        except FileNotFoundError:
+            with self._db() as db:
+                db.execute("DELETE FROM entries WHERE key = ?", (entry.key,))
+            return None
+
+    @staticmethod
+    def is_fresh(entry, now=None):
+        return entry.expires > (now or time.time())
+
+    @staticmethod
+    def conditional_headers(entry):
+        headers = {}
+        if entry.etag:
+            headers["If-None-Match"] = entry.etag
+        if entry.last_modified:
+            headers["If-Modified-Since"] = entry.last_modified
+        return headers
+
+    def store(self, url, status, headers, body, final_url=None):
+        """Cache a response if its headers allow it; returns whether it was stored."""
+        expires = cache_policy(status, headers)
+        if expires is None or len(body) > self.max_bytes * (1 - EVICT_TO):
+            return False
+        key = self.key(url)
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        temporary = f"{path}.{os.getpid()}.{threading.get_ident()}"
+        with open(temporary, "wb") as f:
+            f.write(body)
+        os.replace(temporary, path)
+
+        lowered = {name.lower(): value for name, value in headers.items()}
+        kept = {name: value for name, value in lowered.items() if name in ("content-type", "etag", "last-modified")}
+        with self._db() as db:
+            # An upsert rather than INSERT OR REPLACE, whose implicit delete would not fire the size trigger
+            db.execute("""
+                INSERT INTO entries VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(key) DO UPDATE SET
+                    url = excluded.url, status = excluded.status, headers = excluded.headers,
+                    size = excluded.size, expires = excluded.expires, etag = excluded.etag,
+                    last_modified = excluded.last_modified, last_access = excluded.last_access
+            """, (key, final_url or url, status, json.dumps(kept), len(body), expires,
+                  lowered.get("etag"), lowered.get("last-modified"), time.time()))
+        self._evict()
+        return True
+
+    def hit(self, entry, revalidated_headers=None):
+        """Record a use of `entry`; after a 304 the response headers extend its freshness."""
+        values = {"last_access": time.time()}
+        if revalidated_headers is not None:
+            expires = cache_policy(entry.status, revalidated_headers)
+            values["expires"] = expires if expires is not None else 0
+        with self._db() as db:
+            db.execute(
+                f"UPDATE entries SET {', '.join(f'{name} = ?' for name in values)} WHERE key = ?",
+                (*values.values(), entry.key)
+            )
+            self._count(db, "revalidated" if revalidated_headers is not None else "hits", 1)
+            self._count(db, "bytes_saved", entry.size)
+
+    def miss(self, size):
+        with self._db() as db:
+            self._count(db, "misses", 1)
+            self._count(db, "bytes_downloaded", size)
+
+    @staticmethod
+    def _count(db, name, amount):
+        db.execute(
+            "INSERT INTO counters VALUES (?, ?) ON CONFLICT(name) DO UPDATE SET value = value + excluded.value",
+            (name, amount)
+        )
+
+    def _evict(self):
+        db = self._db()
+        total = db.execute("SELECT value FROM counters WHERE name = 'bytes_stored'").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        target = self.max_bytes * EVICT_TO
+        evicted = []
+        for key, size in db.execute("SELECT key, size FROM entries ORDER BY last_access"):
+            if total <= target:
+                break
+            evicted.append(key)
+            total -= size
+        with db:
+            db.executemany("DELETE FROM entries WHERE key = ?", [(key,) for key in evicted])
+            self._count(db, "evictions", len(evicted))
+        for key in evicted:
+            try:
+                os.remove(self._path(key))
+            except FileNotFoundError:
+                pass
+
+    def stats(self):
+        db = self._db()
+        entries = db.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+        stats = {"entries": entries, "max_bytes": self.max_bytes}
+        for name in ("hits", "revalidated", "misses", "evictions", "bytes_saved", "bytes_downloaded"):
+            stats[name] = 0
+        stats.update(db.execute("SELECT name, value FROM counters").fetchall())
+        return stats
+
+
+def read_limited(response, limit):
+    """Read at most `limit` bytes of a streamed `requests` response, like crawler.read_body for aiohttp."""
+    chunks = []
+    size = 0
+    for chunk in response.iter_content(chunk_size=min(limit, 64 * 1024)):
+        chunks.append(chunk[:limit - size])
+        size += len(chunks[-1])
+        if size >= limit:
+            break
+    return b"".join(chunks)
+
+
+class HttpClient:
+    """Pooled keep-alive `requests` session that serves and fills a ResponseCache."""
+
+    def __init__(self, cache=None, pool_size=DEFAULT_POOL_SIZE, timeout=DEFAULT_TIMEOUT, user_agent=DEFAULT_USER_AGENT):
+        self.cache = cache
+        self.timeout = timeout
+        self.session = requests.Session()
+        retries = Retry(total=2, backoff_factor=0.2, status_forcelist=(502, 503, 504), allowed_methods=("GET", "HEAD"))
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retries)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.session.headers.update({"User-Agent": user_agent, "Accept-Encoding": ACCEPT_ENCODING})
+
+    def get(self, url, timeout=None, headers=None, max_bytes=None):
+        """GET `url` through the cache; with `max_bytes` the body is read no further than that.
+
+        A body cut off at `max_bytes` is returned but never cached as if it were complete.
+        """
+        entry = self.cache.lookup(url) if self.cache else None
+        if entry and self.cache.is_fresh(entry):
+            body = self.cache.read(entry)
+            if body is not None:
+                self.cache.hit(entry)
+                return HttpResponse(entry.url, entry.status, entry.headers, body, from_cache=True)
+            entry = None
+
+        request_headers = dict(headers or {})
+        if entry:
+            request_headers.update(self.cache.conditional_headers(entry))
+        response = self.session.get(url, timeout=timeout or self.timeout, headers=request_headers, stream=True)
+
+        if entry and response.status_code == 304:
+            response.close()
+            body = self.cache.read(entry)
+            if body is not None:
+                self.cache.hit(entry, revalidated_headers=response.headers)
+                return HttpResponse(entry.url, entry.status, entry.headers, body, from_cache=True)
+            # The body was evicted between lookup and revalidation
+            response = self.session.get(url, timeout=timeout or self.timeout, headers=headers, stream=True)
+
+        with response:
+            content = read_limited(response, max_bytes) if max_bytes else response.content
+        if self.cache:
+            self.cache.miss(len(content))
+            if not max_bytes or len(content) < max_bytes:
+                self.cache.store(url, response.status_code, response.headers, content, final_url=response.url)
+        return HttpResponse(response.url, response.status_code, dict(response.headers), content)
+
+    def close(self):
+        self.session.close()
+
+
+def _fresh_body(cache, url):
+    """The cache entry of `url` and, when it is fresh and its body is still on disk, that body (counted as a hit)."""
+    entry = cache.lookup(url)
+    if entry and cache.is_fresh(entry):
+        body = cache.read(entry)
+        if body is not None:
+            cache.hit(entry)
+            return entry, body
+        return None, None
+    return entry, None
+
+
+def _revalidated_body(cache, entry, headers):
+    body = cache.read(entry)
+    if body is not None:
+        cache.hit(entry, revalidated_headers=headers)
+    return body
+
+
+def _store_miss(cache, url, response, complete):
+    cache.miss(len(response.content))
+    if complete:
+        cache.store(url, response.status, response.headers, response.content, final_url=response.url)
+
+
+async def fetch_cached(session, url, cache=None, max_bytes=None, headers=None):
+    """The async counterpart of HttpClient.get for an aiohttp session (such as the crawler's).
+
+    Cache lookups and writes touch SQLite and the body files, so they run on
+    the loop's default executor rather than on the event loop. A body cut
+    off at `max_bytes` is returned but never cached as if it were complete.
+    """
+    loop = asyncio.get_running_loop()
+    entry, body = await loop.run_in_executor(None, _fresh_body, cache, url) if cache else (None, None)
+    if body is not None:
+        return HttpResponse(entry.url, entry.status, entry.headers, body, from_cache=True)
+
+    request_headers = {"Accept-Encoding": ACCEPT_ENCODING, **(headers or {})}
+    if entry:
+        request_headers.update(cache.conditional_headers(entry))
+    async with session.get(url, allow_redirects=True, headers=request_headers) as response:
+        if entry and response.status == 304:
+            body = await loop.run_in_executor(None, _revalidated_body, cache, entry, response.headers)
+            if body is None:
+                # Evicted meanwhile: fetch again without validators
+                return await fetch_cached(session, url, None, max_bytes, headers)
+            return HttpResponse(entry.url, entry.status, entry.headers, body, from_cache=True)
+        content = await (read_body(response, max_bytes) if max_bytes else response.read())
+        result = HttpResponse(str(response.url), response.status, dict(response.headers), content)
+
+    if cache:
+        complete = not max_bytes or len(content) < max_bytes
+        await loop.run_in_executor(None, _store_miss, cache, url, result, complete)
+    return result
+
+
+class StylesheetFetcher:
+    """Loads stylesheet bodies for a StylesheetCache through a pooled client and the on-disk response cache.
+
+    Holds only paths and sizes, so it can be pickled to analysis workers,
+    which open their own client on first use.
+    """
+
+    def __init__(self, cache_directory=None, cache_max_bytes=DEFAULT_CACHE_MAX_MB * 1024 * 1024,
+                 pool_size=DEFAULT_POOL_SIZE, timeout=10):
+        self.cache_directory = cache_directory
+        self.cache_max_bytes = cache_max_bytes
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self._client = None
+
+    def __getstate__(self):
+        return {**self.__dict__, "_client": None}
+
+    def __call__(self, url):
+        if self._client is None:
+            cache = ResponseCache(self.cache_directory, self.cache_max_bytes) if self.cache_directory else None
+            self._client = HttpClient(cache=cache, pool_size=self.pool_size, timeout=self.timeout)
+        try:
+            response = self._client.get(url, headers={"Accept": "text/css,*/*;q=0.1"}, max_bytes=MAX_STYLESHEET_BYTES)
+        except requests.RequestException:
+            return None
+        content_type = {name.lower(): value for name, value in response.headers.items()}.get("content-type", "")
+        # An error or login page served in place of the stylesheet
+        if response.status >= 400 or "html" in content_type:
+            return None
+        return response.content
+
+
+def get_http_settings():
+    return frappe._dict(
+        enabled=bool(cint(frappe.conf.get("http_cache_enabled", 1))),
+        directory=frappe.conf.get("http_cache_dir") or frappe.get_site_path("accessibility_http_cache"),
+        max_bytes=(cint(frappe.conf.get("http_cache_max_mb")) or DEFAULT_CACHE_MAX_MB) * 1024 * 1024,
+        pool_size=cint(frappe.conf.get("http_pool_size")) or DEFAULT_POOL_SIZE
+    )
+
+
+_clients = {}
+_stylesheet_caches = {}
+
+
+def get_response_cache():
+    """This process's response cache for the current site, or None when disabled."""
+    return get_http_client().cache
+
+
+def get_http_client():
+    """This process's shared client for the current site."""
+    site = getattr(frappe.local, "site", None)
+    client = _clients.get(site)
+    if client is None:
+        settings = get_http_settings()
+        cache = ResponseCache(os.path.abspath(settings.directory), settings.max_bytes) if settings.enabled else None
+        client = _clients[site] = HttpClient(cache=cache, pool_size=settings.pool_size)
+    return client
+
+
+def get_stylesheet_cache():
+    """This process's cache of parsed stylesheets for the current site, shared by its scans and checks."""
+    site = getattr(frappe.local, "site", None)
+    cache = _stylesheet_caches.get(site)
+    if cache is None:
+        settings = get_http_settings()
+        fetcher = StylesheetFetcher(
+            os.path.abspath(settings.directory) if settings.enabled else None,
+            settings.max_bytes,
+            pool_size=settings.pool_size
+        )
+        max_mb = cint(frappe.conf.get("stylesheet_cache_max_mb")) or DEFAULT_STYLESHEET_CACHE_MB
+        cache = _stylesheet_caches[site] = StylesheetCache(max_mb * 1024 * 1024, fetcher=fetcher)
+    return cache
+
+
+def get_http_cache_stats():
+    cache = get_response_cache()
+    return cache.stats() if cache else {"enabled": False}
@@ -1,12 +1,111 @@
 # accessibility_compliance/accessibility_compliance/install.py
 import frappe
 from frappe import _
+from frappe.custom.doctype.custom_field.custom_field import create_custom_fields
 
 def after_install():
     """Setup after app installation."""
     create_custom_roles()
     create_sample_data()
     setup_website_settings()
+    create_custom_fields(CUSTOM_FIELDS, update=True)
+    create_indexes()
+
+def after_migrate():
+    """Keep custom fields and database indexes in place on existing sites."""
+    create_custom_fields(CUSTOM_FIELDS, update=True)
+    create_indexes()
+
+CUSTOM_FIELDS = {
+    "Accessibility Issue": [
+        {
+            "fieldname": "fingerprint",
+            "label": "Fingerprint",
+            "fieldtype": "Data",
+            "insert_after": "element_selector",
+            "read_only": 1,
+            "description": "Rule, normalized selector and snippet hash; identical issues on different pages share it"
+        },
+        {
+            "fieldname": "occurrence_count",
+            "label": "Occurrences",
+            "fieldtype": "Int",
+            "insert_after": "fingerprint",
+            "default": "1",
+            "read_only": 1
+        },
+        {
+            "fieldname": "page_count",
+            "label": "Affected Pages",
+            "fieldtype": "Int",
+            "insert_after": "occurrence_count",
+            "default": "1",
+            "read_only": 1
+        },
+        {
+            "fieldname": "affected_pages",
+            "label": "Affected Page URLs",
+            "fieldtype": "Long Text",
+            "insert_after": "page_count",
+            "read_only": 1
+        },
+        {
+            "fieldname": "html_snippet",
+            "label": "HTML Snippet",
+            "fieldtype": "Small Text",
+            "insert_after": "affected_pages",
+            "read_only": 1,
+            "description": "Opening tag of the failing element, sent to the model for AI fix suggestions"
+        }
+    ],
+    "Website Scan": [
+        {
+            "fieldname": "issue_occurrences",
+            "label": "Issue Occurrences",
+            "fieldtype": "Int",
+            "insert_after": "minor_issues",
+            "read_only": 1,
+            "description": "Occurrences of the scan's issues on all pages; the issue counters count each deduplicated issue once"
+        },
+        {
+            "fieldname": "scan_metrics",
+            "label": "Scan Metrics",
+            "fieldtype": "JSON",
+            "insert_after": "last_scan_date",
+            "read_only": 1,
+            "description": "Stage timings, counters, sampled rule timings and profiles recorded during the scan"
+        }
+    ]
+}
+
+# Composite indexes for the scanner's hot queries
+INDEXES = {
+    "Accessibility Issue": [
+        # Keyset pagination of scan reports and exports
+        ["website_scan", "page_url", "name"],
+        # Per-scan severity counts and dashboard aggregates
+        ["website_scan", "severity"],
+        # Deduplicated issues and carried-forward occurrences
+        ["website_scan", "fingerprint"],
+        ["fix_applied"],
+        ["issue_type"]
+    ],
+    "Scanned Page": [
+        # Per-page issue counts and filters of a scan report
+        ["website_scan"]
+    ],
+    "Website Scan": [
+        ["scan_status", "compliance_score"],
+        # Retention ranks each site's scans by age
+        ["website_url", "creation"]
+    ]
+}
+
+def create_indexes():
+    """Create the composite indexes listed in INDEXES if they do not exist."""
+    for doctype, index_list in INDEXES.items():
+        for fields in index_list:
+            frappe.db.add_index(doctype, fields)
 
 def create_custom_roles():
     """Create custom roles for accessibility management."""
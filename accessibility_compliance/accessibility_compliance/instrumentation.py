@@ -0,0 +1,361 @@
+# accessibility_compliance/accessibility_compliance/instrumentation.py
+"""Scan metrics: stage histograms, counters, sampled rule timings and profiles.
+
+Each scan keeps a ScanMetrics with a fixed-bucket histogram per stage (fetch,
+analyze, render, database writes, AI requests) and a set of counters. The
+metrics travel with the scan's checkpoint from batch to batch and a summary
+with per-stage percentiles is stored on the Website Scan when the scan ends.
+Every checkpoint also adds what changed since the previous one to site-wide
+totals in Redis, which `render_prometheus` serves in the Prometheus text
+format.
+
+Recording a stage costs two clock reads and a bucket increment. Per-rule time
+is measured on a sample of pages only (`scan_rule_sample_pages`); a scan
+started with profiling on measures every page and also runs under cProfile.
+"""
+import cProfile
+import json
+import os
+import pstats
+import time
+from bisect import bisect_left
+from collections import Counter
+from contextlib import contextmanager
+
+import frappe
+from frappe.utils import cint, flt
+from werkzeug.wrappers import Response
+
+# Upper bounds in seconds; the last bucket of every histogram is +Inf
+STAGE_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+DEFAULT_RULE_SAMPLE_PAGES = 20
+PROFILE_TOP_FUNCTIONS = 30
+PROFILE_DIRECTORY = "accessibility_profiles"
+
+HISTOGRAMS_KEY = "accessibility_metrics|histograms"
+COUNTERS_KEY = "accessibility_metrics|counters"
+
+# Counters named "<base>|<value>" are exposed with the value as this label
+COUNTER_LABELS = {
+    "rule_seconds": "rule",
+    "pages_by_tier": "tier",
+    "errors": "stage"
+}
+
+
+class Histogram:
+    """Counts of observations per bucket of STAGE_BUCKETS, with their sum and maximum."""
+
+    __slots__ = ("counts", "total", "count", "max")
+
+    def __init__(self, counts=None, total=0.0, count=0, max=0.0):
+        self.counts = list(counts) if counts else [0] * (len(STAGE_BUCKETS) + 1)
+        self.total = total
+        self.count = count
+        self.max = max
+
+    def observe(self, value):
+        self.counts[bisect_left(STAGE_BUCKETS, value)] += 1
+        self.total += value
+        self.count += 1
+        if value > self.max:
+            self.max = value
+
+    def merge(self, other):
+        self.counts = [mine + theirs for mine, theirs in zip(self.counts, other.counts)]
+        self.total += other.total
+        self.count += other.count
+        self.max = max(self.max, other.max)
+
+    def quantile(self, q):
+        """Estimate a quantile by interpolating within the bucket that contains it."""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for index, count in enumerate(self.counts):
+            if count and seen + count >= rank:
+                lower = STAGE_BUCKETS[index - 1] if index else 0.0
+                upper = STAGE_BUCKETS[index] if index < len(STAGE_BUCKETS) else self.max
+                return min(lower + (upper - lower) * (rank - seen) / count, self.max)
+            seen += count
+        return self.max
+
+    def summary(self):
+        return {
+            "count": self.count,
+            "total_s": round(self.total, 3),
+            "mean_ms": round(self.total / self.count * 1000, 2) if self.count else 0,
+            "p50_ms": round(self.quantile(0.5) * 1000, 2),
+            "p95_ms": round(self.quantile(0.95) * 1000, 2),
+            "p99_ms": round(self.quantile(0.99) * 1000, 2),
+            "max_ms": round(self.max * 1000, 2)
+        }
+
+    def as_list(self):
+        return [self.counts, self.total, self.count, self.max]
+
+    def copy(self):
+        return Histogram(*self.as_list())
+
+
+class ScanMetrics:
+    """Stage timings and counters of one scan.
+
+        metrics = ScanMetrics()
+        with metrics.timer("db_write"):
+            writer.flush()
+        metrics.count("pages_fetched")
+    """
+
+    def __init__(self):
+        self.histograms = {}
+        self.counters = Counter()
+        self.profiles = []
+        self._published = ({}, Counter())
+
+    def observe(self, stage, seconds):
+        histogram = self.histograms.get(stage)
+        if histogram is None:
+            histogram = self.histograms[stage] = Histogram()
+        histogram.observe(seconds)
+
+    def count(self, name, amount=1):
+        self.counters[name] += amount
+
+    @contextmanager
+    def timer(self, stage):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(stage, time.perf_counter() - started)
+
+    def add_engine_timings(self, timings):
+        """Count parse and sampled rule time reported by `RuleEngine.take_timings`."""
+        if not timings or not timings["pages"]:
+            return
+        self.count("parse_seconds", timings["parse_s"])
+        self.count("rule_pages", timings["pages"])
+        self.count("rule_pages_sampled", timings["sampled_pages"])
+        for rule, seconds in timings["rule_s"].items():
+            if seconds:
+                self.count(f"rule_seconds|{rule}", seconds)
+
+    def merge(self, other):
+        for stage, histogram in other.histograms.items():
+            if stage in self.histograms:
+                self.histograms[stage].merge(histogram)
+            else:
+                self.histograms[stage] = histogram.copy()
+        self.counters.update(other.counters)
+        self.profiles.extend(other.profiles)
+
+    def state(self):
+        """Everything needed to continue the metrics in the next batch job, as JSON-safe values."""
+        return {
+            "histograms": {stage: histogram.as_list() for stage, histogram in self.histograms.items()},
+            "counters": dict(self.counters),
+            "profiles": self.profiles
+        }
+
+    def restore(self, state):
+        """Continue from `state()` of an earlier batch, whose values were already published."""
+        if not state:
+            return self
+        self.histograms = {stage: Histogram(*values) for stage, values in state.get("histograms", {}).items()}
+        self.counters = Counter(state.get("counters") or {})
+        self.profiles = list(state.get("profiles") or [])
+        self._mark_published()
+        return self
+
+    def summary(self):
+        """Per-stage percentiles, counters and estimated time per rule, as stored on the Website Scan."""
+        counters = {name: value for name, value in self.counters.items() if not name.startswith("rule_seconds|")}
+        summary = {
+            "stages": {stage: self.histograms[stage].summary() for stage in sorted(self.histograms)},
+            "counters": {name: round(flt(value), 3) for name, value in sorted(counters.items())},
+            "rules": self.rule_summary()
+        }
+        if self.profiles:
+            summary["profiles"] = self.profiles
+        return summary
+
+    def rule_summary(self):
+        """Time per rule measured on the sampled pages and extrapolated to every analyzed page."""
+        sampled = flt(self.counters.get("rule_pages_sampled"))
+        if not sampled:
+            return {}
+        pages = flt(self.counters.get("rule_pages"))
+        rules = {}
+        for name, seconds in self.counters.items():
+            if name.startswith("rule_seconds|"):
+                per_page = seconds / sampled
+                rules[name.split("|", 1)[1]] = {
+                    "per_page_ms": round(per_page * 1000, 3),
+                    "estimated_s": round(per_page * pages, 3)
+                }
+        return dict(sorted(rules.items(), key=lambda item: -item[1]["per_page_ms"]))
+
+    def to_json(self):
+        return json.dumps({"summary": self.summary(), "state": self.state()}, separators=(",", ":"))
+
+    @classmethod
+    def from_json(cls, value):
+        metrics = cls()
+        if value:
+            metrics.restore((json.loads(value) if isinstance(value, str) else value).get("state"))
+        return metrics
+
+    def publish(self):
+        """Add what was observed since the last publish to the site-wide totals in Redis."""
+        published_histograms, published_counters = self._published
+        histograms_key, counters_key = _key(HISTOGRAMS_KEY), _key(COUNTERS_KEY)
+        pipe = frappe.cache.pipeline()
+        changed = False
+        for stage, histogram in self.histograms.items():
+            before = published_histograms.get(stage) or Histogram()
+            if histogram.count == before.count:
+                continue
+            changed = True
+            for index, (now_count, then_count) in enumerate(zip(histogram.counts, before.counts)):
+                if now_count != then_count:
+                    pipe.hincrbyfloat(histograms_key, f"{stage}|{index}", now_count - then_count)
+            pipe.hincrbyfloat(histograms_key, f"{stage}|sum", histogram.total - before.total)
+            pipe.hincrbyfloat(histograms_key, f"{stage}|count", histogram.count - before.count)
+        for name, value in self.counters.items():
+            delta = value - published_counters.get(name, 0)
+            if delta:
+                changed = True
+                pipe.hincrbyfloat(counters_key, name, delta)
+        if changed:
+            pipe.execute()
+        self._mark_published()
+
+    def _mark_published(self):
+        self._published = (
+            {stage: histogram.copy() for stage, histogram in self.histograms.items()},
+            Counter(self.counters)
+        )
+
+
+def _key(name):
+    return frappe.cache.make_key(name)
+
+
+def get_rule_sample_pages():
+    """Every how many pages the engine times each rule, from `scan_rule_sample_pages`; 0 turns sampling off."""
+    return cint(frappe.conf.get("scan_rule_sample_pages", DEFAULT_RULE_SAMPLE_PAGES))
+
+
+def profiling_enabled(profile=None):
+    """Whether to profile a scan: requested when it was started, or `scan_profile: 1` for every scan."""
+    if profile is not None:
+        return bool(cint(profile))
+    return bool(cint(frappe.conf.get("scan_profile")))
+
+
+def profile_path(scan_id, batch=0):
+    return frappe.get_site_path("private", "files", PROFILE_DIRECTORY, f"{scan_id}-batch{batch}.prof")
+
+
+@contextmanager
+def profile_scan(metrics, scan_id, batch=0):
+    """Run the block under cProfile, then write the profile to the site's private files.
+
+    The file loads with `pstats` or snakeviz; its top functions by cumulative
+    time are kept with the scan's metrics.
+    """
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield
+    finally:
+        profiler.disable()
+        path = profile_path(scan_id, batch)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        profiler.dump_stats(path)
+        metrics.profiles.append({"batch": batch, "path": path, "top": top_functions(profiler)})
+
+
+def top_functions(profiler, limit=PROFILE_TOP_FUNCTIONS):
+    stats = pstats.Stats(profiler).stats
+    ranked = sorted(stats.items(), key=lambda item: -item[1][3])[:limit]
+    return [
+        {
+            "function": f"{os.path.basename(filename)}:{line}({function})",
+            "calls": calls,
+            "own_s": round(own, 4),
+            "cumulative_s": round(cumulative, 4)
+        }
+        for (filename, line, function), (_primitive, calls, own, cumulative, _callers) in ranked
+    ]
+
+
+def load_scan_metrics(scan_id):
+    return ScanMetrics.from_json(frappe.db.get_value("Website Scan", scan_id, "scan_metrics"))
+
+
+def record_scan_metrics(scan_id, metrics):
+    """Merge `metrics` into the summary stored on a Website Scan and publish them once that is committed.
+
+    A job retried after a rollback therefore publishes its deltas only once.
+    """
+    stored = load_scan_metrics(scan_id)
+    stored.merge(metrics)
+    frappe.db.set_value("Website Scan", scan_id, "scan_metrics", stored.to_json(), update_modified=False)
+    frappe.db.after_commit.add(metrics.publish)
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+
+def _number(value):
+    value = flt(value)
+    return str(int(value)) if value.is_integer() else repr(value)
+
+
+def render_prometheus():
+    """The site-wide scan metrics in the Prometheus text exposition format (version 0.0.4)."""
+    pipe = frappe.cache.pipeline()
+    pipe.hgetall(_key(HISTOGRAMS_KEY))
+    pipe.hgetall(_key(COUNTERS_KEY))
+    histogram_fields, counter_fields = pipe.execute()
+
+    stages = {}
+    for field, value in histogram_fields.items():
+        stage, part = field.decode().rsplit("|", 1)
+        stages.setdefault(stage, {})[part] = flt(value.decode())
+
+    lines = [
+        "# HELP accessibility_stage_seconds Time spent per scan stage.",
+        "# TYPE accessibility_stage_seconds histogram"
+    ]
+    for stage in sorted(stages):
+        values = stages[stage]
+        cumulative = 0
+        for index, bound in enumerate(STAGE_BUCKETS + ("+Inf",)):
+            cumulative += values.get(str(index), 0)
+            lines.append(f'accessibility_stage_seconds_bucket{{stage="{_escape(stage)}",le="{bound}"}} '
+                         f"{_number(cumulative)}")
+        lines.append(f'accessibility_stage_seconds_sum{{stage="{_escape(stage)}"}} {_number(values.get("sum"))}')
+        lines.append(f'accessibility_stage_seconds_count{{stage="{_escape(stage)}"}} {_number(values.get("count"))}')
+
+    counters = {}
+    for field, value in counter_fields.items():
+        name, _, label = field.decode().partition("|")
+        metric = f"accessibility_{name}_total"
+        sample = f'{metric}{{{COUNTER_LABELS.get(name, "label")}="{_escape(label)}"}}' if label else metric
+        counters.setdefault(metric, []).append(f"{sample} {_number(value.decode())}")
+    for metric in sorted(counters):
+        lines.append(f"# TYPE {metric} counter")
+        lines.extend(sorted(counters[metric]))
+
+    lines.append("# TYPE accessibility_scans_in_progress gauge")
+    lines.append(f'accessibility_scans_in_progress {frappe.db.count("Website Scan", {"scan_status": "In Progress"})}')
+    return "\n".join(lines) + "\n"
+
+
+def prometheus_response():
+    return Response(render_prometheus(), content_type="text/plain; version=0.0.4; charset=utf-8")
@@ -0,0 +1,240 @@
+# accessibility_compliance/accessibility_compliance/issue_writer.py
+import time
+from collections import Counter
+from functools import partial
+
+import frappe
+from frappe.utils import cint, now
+
+from accessibility_compliance.accessibility_compliance.dashboard import record_issues_written
+from accessibility_compliance.accessibility_compliance.rules import issue_fingerprint
+from accessibility_compliance.accessibility_compliance.scan_status import (
+    clear_scan_status_cache,
+    increment_severity_counters
+)
+
+DEFAULT_CHUNK_SIZE = 1000
+
+ISSUE_FIELDS = (
+    "name",
+    "owner",
+    "creation",
+    "modified",
+    "modified_by",
+    "docstatus",
+    "website_scan",
+    "page_url",
+    "issue_type",
+    "severity",
+    "wcag_criterion",
+    "issue_description",
+    "element_selector",
+    "auto_fixable",
+    "ai_suggested_fix",
+    "status",
+    "fix_applied",
+    "fingerprint",
+    "occurrence_count",
+    "page_count",
+    "affected_pages",
+    "html_snippet"
+)
+SEVERITY_INDEX = ISSUE_FIELDS.index("severity")
+ISSUE_TYPE_INDEX = ISSUE_FIELDS.index("issue_type")
+OCCURRENCES_INDEX = ISSUE_FIELDS.index("occurrence_count")
+PAGE_COUNT_INDEX = ISSUE_FIELDS.index("page_count")
+AFFECTED_PAGES_INDEX = ISSUE_FIELDS.index("affected_pages")
+
+# Page URLs listed on a deduplicated issue; `page_count` keeps counting past this
+MAX_AFFECTED_PAGES = 100
+
+
+def get_chunk_size(chunk_size=None):
+    """Resolve the flush size from the argument or `issue_insert_chunk_size` in site config."""
+    return cint(chunk_size) or cint(frappe.conf.get("issue_insert_chunk_size")) or DEFAULT_CHUNK_SIZE
+
+
+def fingerprint_of(issue):
+    """Fingerprint of a rules.Issue, or of a dict that carries one (or the fields to compute it)."""
+    if isinstance(issue, dict):
+        return issue.get("fingerprint") or issue_fingerprint(
+            issue.get("rule") or issue.get("issue_type"), issue.get("element_selector"), issue.get("html_snippet")
+        )
+    return issue.fingerprint
+
+
+class _Occurrences:
+    """Running totals of one deduplicated issue within a scan."""
+    __slots__ = ("name", "row", "last_page", "page_count", "new_occurrences", "new_pages")
+
+    def __init__(self, name, row=None, page_count=0):
+        self.name = name
+        self.row = row
+        self.last_page = None
+        self.page_count = page_count
+        self.new_occurrences = 0
+        self.new_pages = []
+
+
+class IssueWriter:
+    """Buffers Accessibility Issue rows and writes them with multi-row INSERTs.
+
+    Each flush inserts one chunk and commits it, so a chunk is a single
+    transaction and a failed scan keeps everything flushed before the failure.
+    Rows bypass document hooks and validation; the scanner only produces
+    values that are valid for the doctype. The severity counters on the
+    Website Scan are bumped in the same transaction as each chunk.
+
+    With `dedupe` (the default) an issue is stored once per fingerprint and
+    scan: repeated occurrences, such as a header image on every page, only
+    raise `occurrence_count` and `page_count` and add to `affected_pages`.
+    Issues are expected page by page, as the scanner adds them. With
+    `metrics` (an instrumentation.ScanMetrics), every flush is timed as the
+    "db_write" stage.
+
+        with IssueWriter(scan_id) as writer:
+            writer.add_many(issues)
+    """
+
+    def __init__(self, scan_id, chunk_size=None, commit=True, dedupe=True, metrics=None):
+        self.scan_id = scan_id
+        self.chunk_size = get_chunk_size(chunk_size)
+        self.commit = commit
+        self.dedupe = dedupe
+        self.metrics = metrics
+        self.rows_written = 0
+        self._buffer = []
+        self._new_issues = Counter()
+        self._unique = self._load_unique() if dedupe else {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.flush()
+        return False
+
+    def _load_unique(self):
+        # Issues written by earlier batch jobs of the same scan
+        rows = frappe.db.sql("""
+            SELECT fingerprint, name, page_count
+            FROM `tabAccessibility Issue`
+            WHERE website_scan = %s AND fingerprint IS NOT NULL
+        """, self.scan_id)
+        return {fingerprint: _Occurrences(name, page_count=cint(page_count)) for fingerprint, name, page_count in rows}
+
+    def add(self, issue):
+        """Queue an issue (a rules.Issue or a dict with the same keys) and return its fingerprint."""
+        fingerprint = fingerprint_of(issue)
+        entry = self._unique.get(fingerprint) if self.dedupe else None
+        if entry is None:
+            row = self._row(issue, fingerprint)
+            self._buffer.append(row)
+            self._new_issues[row[SEVERITY_INDEX]] += 1
+            if self.dedupe:
+                entry = self._unique[fingerprint] = _Occurrences(row[0], row, page_count=1)
+                entry.last_page = row[ISSUE_FIELDS.index("page_url")]
+            if len(self._buffer) >= self.chunk_size:
+                self.flush()
+            return fingerprint
+
+        page_url = issue.get("page_url") if isinstance(issue, dict) else issue.page_url
+        new_page = page_url != entry.last_page
+        entry.last_page = page_url
+        if entry.row is not None:
+            # Still buffered: count straight into the row that will be inserted
+            entry.row[OCCURRENCES_INDEX] += 1
+            if new_page:
+                entry.row[PAGE_COUNT_INDEX] += 1
+                if entry.row[PAGE_COUNT_INDEX] <= MAX_AFFECTED_PAGES:
+                    entry.row[AFFECTED_PAGES_INDEX] += "\n" + (page_url or "")
+        else:
+            entry.new_occurrences += 1
+            if new_page:
+                entry.page_count += 1
+                if entry.page_count <= MAX_AFFECTED_PAGES:
+                    entry.new_pages.append(page_url or "")
+        return fingerprint
+
+    def add_many(self, issues):
+        """Queue several issues and return their fingerprints."""
+        return [self.add(issue) for issue in issues]
+
+    def take_new_issues(self):
+        """Per-severity counts of the issues stored for the first time since the previous call."""
+        new_issues, self._new_issues = self._new_issues, Counter()
+        return new_issues
+
+    def flush(self):
+        if not self._buffer and not self._has_pending_updates():
+            return 0
+        started = time.perf_counter()
+        rows, self._buffer = self._buffer, []
+        if rows:
+            frappe.db.bulk_insert("Accessibility Issue", ISSUE_FIELDS, rows, chunk_size=self.chunk_size)
+        occurrences = sum(row[OCCURRENCES_INDEX] for row in rows) + self._write_occurrences()
+        increment_severity_counters(self.scan_id, Counter(row[SEVERITY_INDEX] for row in rows), occurrences)
+        if rows:
+            # The Redis rollup only counts rows once they are committed, so a rollback cannot inflate it
+            frappe.db.after_commit.add(partial(record_issues_written, Counter(row[ISSUE_TYPE_INDEX] for row in rows)))
+        if self.commit:
+            frappe.db.commit()
+            clear_scan_status_cache(self.scan_id)
+        self.rows_written += len(rows)
+        if self.metrics is not None:
+            self.metrics.observe("db_write", time.perf_counter() - started)
+            self.metrics.count("issue_rows_written", len(rows))
+        return len(rows)
+
+    def _has_pending_updates(self):
+        return any(entry.new_occurrences for entry in self._unique.values())
+
+    def _write_occurrences(self):
+        occurrences = 0
+        for entry in self._unique.values():
+            # Rows inserted by this flush now count through UPDATEs like older ones
+            entry.row = None
+            if not entry.new_occurrences:
+                continue
+            new_pages = "".join("\n" + url for url in entry.new_pages)
+            frappe.db.sql("""
+                UPDATE `tabAccessibility Issue`
+                SET occurrence_count = IFNULL(occurrence_count, 1) + %s,
+                    page_count = %s,
+                    affected_pages = CONCAT(IFNULL(affected_pages, ''), %s)
+                WHERE name = %s
+            """, (entry.new_occurrences, entry.page_count, new_pages, entry.name))
+            occurrences += entry.new_occurrences
+            entry.new_occurrences = 0
+            entry.new_pages = []
+        return occurrences
+
+    def _row(self, issue, fingerprint):
+        get = issue.get if isinstance(issue, dict) else lambda key, default=None: getattr(issue, key, default)
+        timestamp = now()
+        user = frappe.session.user
+        return [
+            frappe.generate_hash(length=10),
+            user,
+            timestamp,
+            timestamp,
+            user,
+            0,
+            self.scan_id,
+            get("page_url"),
+            get("issue_type"),
+            get("severity"),
+            get("wcag_criterion"),
+            get("issue_description"),
+            get("element_selector"),
+            cint(get("auto_fixable")),
+            get("ai_suggested_fix"),
+            get("status") or "Open",
+            cint(get("fix_applied")),
+            fingerprint,
+            1,
+            1,
+            get("page_url") or "",
+            get("html_snippet")
+        ]
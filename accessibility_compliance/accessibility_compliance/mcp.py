@@ -7,6 +7,16 @@ from bs4 import BeautifulSoup
 import re
 from urllib.parse import urljoin, urlparse
 
+from accessibility_compliance.accessibility_compliance.batch_check import check_pages_batch
+from accessibility_compliance.accessibility_compliance.contrast import (
+    InvalidColorError,
+    evaluate_contrast,
+    thresholds as contrast_thresholds
+)
+from accessibility_compliance.accessibility_compliance.fixes import apply_fixes
+from accessibility_compliance.accessibility_compliance.remediation_report import get_remediation_report
+from accessibility_compliance.accessibility_compliance.scanner import enqueue_scan
+
 mcp = frappe_mcp.MCP("accessibility-compliance-mcp")
 
 @mcp.tool()
@@ -28,12 +38,7 @@ def scan_website_accessibility(website_url: str, wcag_level: str = "AA", max_pag
         
         # For now, return a mock response since we can't run full selenium in this context
         # In production, this would trigger the background scan
-        frappe.enqueue(
-            'accessibility_compliance.accessibility_compliance.scanner.run_accessibility_scan',
-            scan_id=scan_doc.name,
-            queue='long',
-            timeout=1800
-        )
+        enqueue_scan(scan_doc.name, max_pages=max_pages)
         
         return {
             "scan_id": scan_doc.name,
@@ -53,22 +58,15 @@ def generate_remediation_report(scan_id: str):
         scan_id: ID of the website scan
     """
     try:
-        scan_doc = frappe.get_doc("Website Scan", scan_id)
-        issues = frappe.get_all("Accessibility Issue", 
-                               filters={"website_scan": scan_id},
-                               fields=["*"])
-        
-        # Generate comprehensive report
-        report = generate_comprehensive_report(scan_doc, issues)
-        
-        # Update scan with AI suggestions
-        scan_doc.remediation_suggestions = report
-        scan_doc.save()
-        
+        frappe.has_permission("Website Scan", doc=scan_id, throw=True)
+        # Built from grouped queries and cached until the scan's issues or fixes change
+        report = get_remediation_report(scan_id)
+
         return {
             "scan_id": scan_id,
-            "report": report,
-            "total_issues": len(issues)
+            "report": report["report"],
+            "total_issues": report["total_issues"],
+            "total_occurrences": report["total_occurrences"]
         }
         
     except Exception as e:
@@ -84,27 +82,7 @@ def apply_automated_fixes(scan_id: str, fix_types: list = None):
         fix_types: List of issue types to fix (optional, defaults to all auto-fixable)
     """
     try:
-        issues = frappe.get_all("Accessibility Issue",
-                               filters={
-                                   "website_scan": scan_id,
-                                   "auto_fixable": 1,
-                                   "fix_applied": 0
-                               },
-                               fields=["*"])
-        
-        if fix_types:
-            issues = [i for i in issues if i.issue_type in fix_types]
-        
-        fixes_applied = []
-        
-        for issue in issues:
-            # Simulate fix application
-            issue_doc = frappe.get_doc("Accessibility Issue", issue.name)
-            issue_doc.fix_applied = 1
-            issue_doc.fix_date = frappe.utils.now()
-            issue_doc.status = "Fixed"
-            issue_doc.save()
-            fixes_applied.append(issue.name)
+        fixes_applied = apply_fixes(scan_id, fix_types=fix_types)
         
         return {
             "scan_id": scan_id,
@@ -116,6 +94,24 @@ def apply_automated_fixes(scan_id: str, fix_types: list = None):
         frappe.log_error(f"Automated fix failed: {str(e)}")
         return {"error": str(e)}
 
+@mcp.tool()
+def check_pages_accessibility(page_urls: list, wcag_level: str = "AA", deadline: float = None):
+    """Check a list of pages for accessibility issues in one call.
+    
+    Args:
+        page_urls: URLs of the pages to check, such as the pages touched by a deploy
+        wcag_level: WCAG compliance level (A, AA, AAA)
+        deadline: Seconds to wait for the batch; unfinished pages are returned as timed out
+    """
+    # The pages are fetched from the server, as with api.check_pages
+    frappe.has_permission("Website Scan", "create", throw=True)
+    try:
+        return check_pages_batch(page_urls, wcag_level, deadline=deadline)
+        
+    except Exception as e:
+        frappe.log_error(f"Batch page check failed: {str(e)}")
+        return {"error": str(e)}
+
 @mcp.tool()
 def check_color_contrast(foreground_color: str, background_color: str, text_size: str = "normal"):
     """Check color contrast ratio for WCAG compliance.
@@ -126,27 +122,20 @@ def check_color_contrast(foreground_color: str, background_color: str, text_size
         text_size: Text size category (normal, large)
     """
     try:
-        # Simple contrast calculation (would use colour library in production)
-        # For demo purposes, return mock data
-        contrast_ratio = 4.8  # Mock value
-        
-        # WCAG standards
-        if text_size == "large":
-            aa_threshold = 3.0
-            aaa_threshold = 4.5
-        else:
-            aa_threshold = 4.5
-            aaa_threshold = 7.0
+        large = text_size == "large"
+        result = evaluate_contrast([foreground_color], [background_color], [large])
+        contrast_ratio = round(float(result["ratio"][0]), 2)
+        aa_threshold, aaa_threshold = contrast_thresholds(large)
         
         compliance = {
-            "AA": contrast_ratio >= aa_threshold,
-            "AAA": contrast_ratio >= aaa_threshold
+            "AA": bool(result["aa"][0]),
+            "AAA": bool(result["aaa"][0])
         }
         
         recommendations = []
-        if contrast_ratio < aa_threshold:
+        if not compliance["AA"]:
             recommendations.append("Increase contrast to meet WCAG AA standards")
-        elif contrast_ratio < aaa_threshold:
+        elif not compliance["AAA"]:
             recommendations.append("Consider improving contrast for AAA compliance")
         else:
             recommendations.append("Excellent contrast ratio!")
@@ -154,55 +143,15 @@ def check_color_contrast(foreground_color: str, background_color: str, text_size
         return {
             "contrast_ratio": contrast_ratio,
             "compliance": compliance,
+            "thresholds": {"AA": aa_threshold, "AAA": aaa_threshold},
             "recommendations": recommendations
         }
         
+    except InvalidColorError as e:
+        return {"error": f"Unrecognized color: {e}"}
     except Exception as e:
         return {"error": str(e)}
 
-def generate_comprehensive_report(scan_doc, issues):
-    """Generate a comprehensive accessibility remediation report."""
-    total_issues = len(issues)
-    critical_issues = len([i for i in issues if i.severity == "Critical"])
-    major_issues = len([i for i in issues if i.severity == "Major"])
-    minor_issues = len([i for i in issues if i.severity == "Minor"])
-    
-    report = f"""
-# Accessibility Compliance Report for {scan_doc.website_url}
-
-## Executive Summary
-- **Compliance Score**: {scan_doc.compliance_score or 0}%
-- **Total Issues Found**: {total_issues}
-- **WCAG Level**: {scan_doc.wcag_level}
-
-## Issues Breakdown
-- **Critical Issues**: {critical_issues}
-- **Major Issues**: {major_issues}
-- **Minor Issues**: {minor_issues}
-
-## Priority Recommendations
-
-### Immediate Actions (Critical & Major Issues)
-1. Fix all critical accessibility barriers
-2. Address major usability issues
-3. Implement proper form labeling
-4. Ensure keyboard navigation works
-5. Add missing alt text for images
-
-### Implementation Timeline
-- **Week 1**: Fix all critical issues
-- **Week 2-3**: Address major issues  
-- **Week 4**: Review and fix minor issues
-
-## Next Steps
-1. Apply automated fixes where possible
-2. Manual review of complex issues
-3. User testing with assistive technologies
-4. Regular compliance monitoring
-"""
-    
-    return report
-
 @mcp.register()
 def handle_mcp():
     """MCP endpoint for accessibility compliance tools."""
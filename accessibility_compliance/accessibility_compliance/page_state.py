@@ -0,0 +1,268 @@
+# accessibility_compliance/accessibility_compliance/page_state.py
+"""Per-page state for incremental re-scans.
+
+Every analyzed page leaves a Scanned Page row holding a hash of its markup,
+the HTTP validators (ETag / Last-Modified) it was served with, its outgoing
+links, the content keys of its linked stylesheets, the fingerprints of its
+issues and the scan that holds them. The next scan of the site requests
+those pages conditionally and, when nothing changed, carries the earlier
+issues forward instead of running the rules again. A page whose markup is
+unchanged but one of whose stylesheets changed is analyzed again.
+"""
+import hashlib
+import re
+from urllib.parse import urljoin
+
+import frappe
+from frappe.utils import cint, now
+
+from accessibility_compliance.accessibility_compliance.crawler import KnownPage, normalize_url
+
+# Markup that changes on every request without changing the DOM the rules see
+_VOLATILE_RE = re.compile(
+    rb"<!--.*?-->"
+    rb"|\s(?:nonce|data-csrf[\w-]*|csrf[\w-]*)\s*=\s*(?:\"[^\"]*\"|'[^']*'|[^\s>]+)"
+    rb"|<input[^>]+name=[\"']?(?:csrf[\w-]*|_token|authenticity_token)[^>]*>",
+    re.IGNORECASE | re.DOTALL
+)
+_WHITESPACE_RE = re.compile(rb"\s+")
+_LINK_RE = re.compile(rb"<link\b[^>]*>", re.IGNORECASE)
+_ATTRIBUTE_RE = re.compile(rb"""([\w-]+)\s*=\s*(?:"([^"]*)"|'([^']*)'|([^\s>]+))""")
+
+CARRIED_FIELDS = (
+    "fingerprint",
+    "issue_type",
+    "severity",
+    "wcag_criterion",
+    "issue_description",
+    "element_selector",
+    "html_snippet",
+    "auto_fixable",
+    "ai_suggested_fix"
+)
+
+
+def content_hash(body):
+    """Hash of a page's markup with comments, CSRF tokens, nonces and whitespace runs removed."""
+    normalized = _WHITESPACE_RE.sub(b" ", _VOLATILE_RE.sub(b"", body or b""))
+    return hashlib.sha256(normalized).hexdigest()
+
+
+def site_key(website_url):
+    return normalize_url(website_url) or website_url
+
+
+def page_name(site, page_url):
+    return hashlib.sha1(f"{site}\n{page_url}".encode()).hexdigest()
+
+
+def load_page_states(website_url):
+    """Page states of a site keyed by page URL, limited to pages whose issues still exist."""
+    rows = frappe.db.sql("""
+        SELECT page.page_url, page.content_hash, page.etag, page.last_modified,
+            page.links, page.rules_signature, page.website_scan, page.issue_fingerprints,
+            page.stylesheet_keys
+        FROM `tabScanned Page` page
+        INNER JOIN `tabWebsite Scan` scan ON scan.name = page.website_scan
+        WHERE page.site = %s
+    """, site_key(website_url), as_dict=True)
+    return {row.page_url: row for row in rows}
+
+
+def linked_stylesheets(body, page_url):
+    """Absolute URLs of the `<link rel="stylesheet">` elements of a page, in document order."""
+    urls = []
+    for tag in _LINK_RE.findall(body or b""):
+        attributes = {
+            name.decode().lower(): (double or single or bare).decode("utf-8", "replace")
+            for name, double, single, bare in _ATTRIBUTE_RE.findall(tag)
+        }
+        if "stylesheet" in attributes.get("rel", "").lower().split() and attributes.get("href"):
+            url = urljoin(page_url or "", attributes["href"].strip())
+            if url.startswith(("http://", "https://")):
+                urls.append(url)
+    return list(dict.fromkeys(urls))
+
+
+def _stylesheet_hash(stylesheets, url):
+    sheet = stylesheets.load(url)
+    return sheet.key[1] if sheet is not None else "-"
+
+
+def stylesheet_keys(stylesheets, body, page_url):
+    """`hash url` lines for the linked stylesheets of a page as `stylesheets` (a StylesheetCache) loads them now.
+
+    None when linked stylesheets are not loaded, so the rules never saw them.
+    Fetches stylesheets that are not cached yet, so call it off the event loop.
+    """
+    if stylesheets is None or stylesheets.fetcher is None:
+        return None
+    return "\n".join(f"{_stylesheet_hash(stylesheets, url)} {url}" for url in linked_stylesheets(body, page_url))
+
+
+def without_restyled_pages(states, stylesheets):
+    """The page states whose linked stylesheets still have the content the page was analyzed with.
+
+    Contrast results depend on the stylesheets as much as on the markup. A
+    dropped page is neither requested conditionally nor carried forward, so
+    it is analyzed again. Each distinct stylesheet is loaded once.
+    """
+    if stylesheets is None or stylesheets.fetcher is None:
+        return states
+    current = {}
+    kept = {}
+    for page_url, state in states.items():
+        if state.stylesheet_keys is None:
+            # Recorded before stylesheets were tracked
+            continue
+        unchanged = True
+        for line in filter(None, state.stylesheet_keys.split("\n")):
+            stored_hash, _, url = line.partition(" ")
+            if url not in current:
+                current[url] = _stylesheet_hash(stylesheets, url)
+            if current[url] != stored_hash:
+                unchanged = False
+                break
+        if unchanged:
+            kept[page_url] = state
+    return kept
+
+
+def known_pages(states, rules_signature):
+    """Crawler validators for the pages whose stored results are still valid for this rule set."""
+    return {
+        url: KnownPage(etag=state.etag, last_modified=state.last_modified,
+                       links=tuple(filter(None, (state.links or "").split("\n"))))
+        for url, state in states.items()
+        if state.rules_signature == rules_signature and (state.etag or state.last_modified)
+    }
+
+
+def encode_fingerprints(fingerprints):
+    """Per-page issue fingerprints as `fingerprint:count` lines; an empty string means no issues."""
+    counts = {}
+    for fingerprint in fingerprints:
+        counts[fingerprint] = counts.get(fingerprint, 0) + 1
+    return "\n".join(f"{fingerprint}:{count}" for fingerprint, count in counts.items())
+
+
+def decode_fingerprints(value):
+    counts = {}
+    for line in filter(None, value.split("\n")):
+        fingerprint, _, count = line.partition(":")
+        counts[fingerprint] = cint(count) or 1
+    return counts
+
+
+def scan_page_fingerprints(scan_id, page_urls):
+    """Issue fingerprint counts of the given pages, for the pages whose current state the scan recorded.
+
+    A page analyzed again by a later scan of the site has moved on to that
+    scan and is left out, as are pages recorded before fingerprints were stored.
+    """
+    if not page_urls:
+        return {}
+    rows = frappe.db.sql("""
+        SELECT page_url, issue_fingerprints
+        FROM `tabScanned Page`
+        WHERE website_scan = %s AND page_url IN %s AND issue_fingerprints IS NOT NULL
+    """, (scan_id, tuple(page_urls)), as_dict=True)
+    return {row.page_url: decode_fingerprints(row.issue_fingerprints) for row in rows}
+
+
+def carry_forward_issues(prior_scan, page_url, stored_fingerprints, writer):
+    """Re-add the issues of an unchanged page from the scan that last analyzed it.
+
+    The page's fingerprints select the (deduplicated) issue rows of the prior
+    scan; each is added to the writer once per occurrence on this page, Open
+    and unfixed like a newly found issue, as fixes are recorded per scan.
+    Returns the issues added, or None when the prior results are incomplete
+    (recorded before fingerprints were stored, or purged since) and the page
+    has to be analyzed again.
+    """
+    if stored_fingerprints is None:
+        return None
+    counts = decode_fingerprints(stored_fingerprints)
+    if not counts:
+        return []
+    rows = frappe.get_all(
+        "Accessibility Issue",
+        filters={"website_scan": prior_scan, "fingerprint": ["in", list(counts)]},
+        fields=list(CARRIED_FIELDS)
+    )
+    if len(rows) < len(counts):
+        return None
+
+    issues = []
+    for row in rows:
+        row.page_url = page_url
+        issues.extend([row] * counts[row.fingerprint])
+    writer.add_many(issues)
+    return issues
+
+
+class PageStateWriter:
+    """Buffers page states and upserts them in multi-row statements."""
+
+    def __init__(self, website_url, scan_id, rules_signature, chunk_size=500):
+        self.site = site_key(website_url)
+        self.scan_id = scan_id
+        self.rules_signature = rules_signature
+        self.chunk_size = chunk_size
+        self._buffer = []
+
+    def record(self, page, digest, changed, fingerprints, stylesheets=None):
+        """Store the state of a page that was analyzed (`changed`) or carried forward.
+
+        `stylesheets` are the page's `stylesheet_keys`.
+        """
+        timestamp = now()
+        headers = {key.lower(): value for key, value in page.headers.items()}
+        self._buffer.append((
+            page_name(self.site, page.url),
+            frappe.session.user,
+            timestamp,
+            timestamp,
+            frappe.session.user,
+            self.site,
+            page.url,
+            digest,
+            headers.get("etag"),
+            headers.get("last-modified"),
+            "\n".join(dict.fromkeys(page.links)),
+            self.rules_signature,
+            self.scan_id,
+            timestamp,
+            timestamp if changed else None,
+            encode_fingerprints(fingerprints),
+            stylesheets
+        ))
+        if len(self._buffer) >= self.chunk_size:
+            self.flush()
+
+    def flush(self):
+        if not self._buffer:
+            return
+        rows, self._buffer = self._buffer, []
+        placeholders = ", ".join(["(" + ", ".join(["%s"] * len(rows[0])) + ")"] * len(rows))
+        # A carried-forward page keeps its hash and validators unless the response supplied new ones
+        frappe.db.sql(f"""
+            INSERT INTO `tabScanned Page`
+                (name, owner, creation, modified, modified_by, site, page_url, content_hash,
+                 etag, last_modified, links, rules_signature, website_scan, last_checked, last_changed,
+                 issue_fingerprints, stylesheet_keys)
+            VALUES {placeholders}
+            ON DUPLICATE KEY UPDATE
+                modified = VALUES(modified),
+                modified_by = VALUES(modified_by),
+                content_hash = IFNULL(VALUES(content_hash), content_hash),
+                etag = IFNULL(VALUES(etag), etag),
+                last_modified = IFNULL(VALUES(last_modified), last_modified),
+                links = VALUES(links),
+                rules_signature = VALUES(rules_signature),
+                website_scan = VALUES(website_scan),
+                last_checked = VALUES(last_checked),
+                last_changed = IFNULL(VALUES(last_changed), last_changed),
+                issue_fingerprints = VALUES(issue_fingerprints),
+                stylesheet_keys = VALUES(stylesheet_keys)
+        """, [value for row in rows for value in row])
@@ -0,0 +1,156 @@
+# accessibility_compliance/accessibility_compliance/progress.py
+import time
+
+import frappe
+from frappe.utils import cint, flt
+
+PROGRESS_EVENT = "accessibility_scan_progress"
+PROGRESS_TTL = 24 * 60 * 60
+DEFAULT_PUBLISH_INTERVAL = 1.0
+
+
+def _cache_key(scan_id):
+    return f"accessibility_scan_progress|{scan_id}"
+
+
+def get_scan_progress(scan_id):
+    """Live progress counters of a scan from the cache, or None if the scan never reported any."""
+    return frappe.cache.get_value(_cache_key(scan_id))
+
+
+def clear_scan_progress(scan_id):
+    frappe.cache.delete_value(_cache_key(scan_id))
+
+
+class ScanProgress:
+    """Tracks a running scan's counters in the cache and pushes them to clients.
+
+    Counters are updated in memory on every page; the cache write and the
+    `frappe.publish_realtime` push happen at most once per `interval` seconds
+    (plus a final forced update), so progress reporting costs the same whether
+    a site has 50 pages or 50,000.
+    """
+
+    def __init__(self, scan_id, interval=None, max_pages=None):
+        self.scan_id = scan_id
+        self.interval = flt(interval or frappe.conf.get("scan_progress_interval")) or DEFAULT_PUBLISH_INTERVAL
+        self.max_pages = cint(max_pages)
+        self.started_at = time.time()
+        self.status = "In Progress"
+        self.pages_discovered = 0
+        self.pages_fetched = 0
+        self.pages_failed = 0
+        self.pages_analyzed = 0
+        self.pages_skipped = 0
+        self.pages_unchanged = 0
+        self.issues_found = 0
+        self.occurrences = 0
+        self.issues_by_severity = {"critical": 0, "major": 0, "minor": 0}
+        self._last_published = 0.0
+
+    def restore(self, data):
+        """Continue from the counters of an earlier batch of the same scan (an `as_dict()` result)."""
+        if not data:
+            return
+        for key in ("pages_discovered", "pages_fetched", "pages_failed", "pages_analyzed",
+                    "pages_skipped", "pages_unchanged", "issues_found", "occurrences"):
+            setattr(self, key, cint(data.get(key)))
+        self.issues_by_severity = dict(data.get("issues_summary") or self.issues_by_severity)
+        self.started_at = data["updated_at"] - data["elapsed_seconds"]
+
+    def update_crawl(self, stats):
+        """Copy the crawler's counters."""
+        self.pages_discovered = stats.pages_discovered
+        self.pages_fetched = stats.pages_fetched
+        self.pages_failed = stats.pages_failed
+
+    def page_analyzed(self, severity_counts, unchanged=False, new_issues=None):
+        """Record one analyzed page, the issues found on it and those of them the scan had not seen before.
+
+        `severity_counts` counts every issue on the page and adds to `occurrences`;
+        `new_issues` (severity -> count) are the deduplicated issues that add to
+        `issues_found` and the severity summary, the unit of the stored counters.
+        `unchanged` pages had their earlier issues carried forward instead of being analyzed again.
+        """
+        self.pages_analyzed += 1
+        if unchanged:
+            self.pages_unchanged += 1
+        self.occurrences += sum(severity_counts.values())
+        for severity, value in (new_issues or {}).items():
+            key = severity.lower()
+            self.issues_by_severity[key] = self.issues_by_severity.get(key, 0) + value
+            self.issues_found += value
+        self.publish()
+
+    def page_skipped(self):
+        """Record a fetched page that was not analyzed (non-HTML or an error status)."""
+        self.pages_skipped += 1
+        self.publish()
+
+    def finish(self, status="Completed"):
+        self.status = status
+        self.publish(force=True)
+
+    @property
+    def pages_done(self):
+        return self.pages_analyzed + self.pages_skipped + self.pages_failed
+
+    @property
+    def pages_expected(self):
+        """Pages the scan will handle: the discovered ones, up to the page budget."""
+        if self.max_pages:
+            return min(self.pages_discovered, self.max_pages)
+        return self.pages_discovered
+
+    @property
+    def percent(self):
+        if self.status == "Completed":
+            return 100
+        done = self.pages_done
+        total = max(self.pages_expected, done, 1)
+        # Never report 100 before the scan is actually finished
+        return min(99, int(done * 100 / total))
+
+    @property
+    def eta_seconds(self):
+        done = self.pages_done
+        remaining = max(self.pages_expected - done, 0)
+        if self.status != "In Progress" or not done:
+            return None
+        elapsed = time.time() - self.started_at
+        return round(elapsed / done * remaining, 1)
+
+    def as_dict(self):
+        return {
+            "scan_id": self.scan_id,
+            "status": self.status,
+            "progress": self.percent,
+            "pages_discovered": self.pages_discovered,
+            "pages_fetched": self.pages_fetched,
+            "pages_failed": self.pages_failed,
+            "pages_analyzed": self.pages_analyzed,
+            "pages_skipped": self.pages_skipped,
+            "pages_unchanged": self.pages_unchanged,
+            "issues_found": self.issues_found,
+            "occurrences": self.occurrences,
+            "issues_summary": dict(self.issues_by_severity),
+            "max_pages": self.max_pages,
+            "elapsed_seconds": round(time.time() - self.started_at, 1),
+            "eta_seconds": self.eta_seconds,
+            "updated_at": time.time()
+        }
+
+    def publish(self, force=False):
+        now = time.monotonic()
+        if not force and now - self._last_published < self.interval:
+            return
+        self._last_published = now
+
+        data = self.as_dict()
+        frappe.cache.set_value(_cache_key(self.scan_id), data, expires_in_sec=PROGRESS_TTL)
+        frappe.publish_realtime(
+            PROGRESS_EVENT,
+            data,
+            doctype="Website Scan",
+            docname=self.scan_id
+        )
@@ -0,0 +1,317 @@
+# accessibility_compliance/accessibility_compliance/remediation_report.py
+"""Remediation report of a scan, built from grouped queries.
+
+Severity, issue type, WCAG criterion and page totals each come from one
+GROUP BY over the scan's issues, the top offenders from one ordered LIMIT
+query and the trend from the site's earlier scans, so no issue rows are
+materialized however large the scan. Scans whose issue rows were purged by
+retention fall back to their Website Scan Summary.
+
+The rendered report is cached per scan until fixes, AI suggestions or a
+re-run change what it describes; those paths call `clear_report_cache`.
+"""
+import json
+
+import frappe
+from frappe import _
+from frappe.utils import cint, flt
+
+SEVERITIES = ("Critical", "Major", "Minor")
+TOP_ISSUE_TYPES = 10
+TOP_CRITERIA = 10
+TOP_PAGES = 10
+TOP_OFFENDERS = 10
+TREND_SCANS = 6
+DEFAULT_REPORT_CACHE_TTL = 86400
+MAX_FIX_LENGTH = 300
+
+
+def _cache_key(scan_id):
+    return f"accessibility_remediation_report|{scan_id}"
+
+
+def clear_report_cache(scan_id):
+    """Drop the cached report of a scan; call whenever its issues or fixes change."""
+    frappe.cache.delete_value(_cache_key(scan_id))
+
+
+def get_remediation_report(scan_id):
+    """The rendered report of a scan with its headline totals, from cache when possible."""
+    key = _cache_key(scan_id)
+    report = frappe.cache.get_value(key)
+    if report is None:
+        report = build_remediation_report(scan_id)
+        ttl = cint(frappe.conf.get("remediation_report_cache_ttl")) or DEFAULT_REPORT_CACHE_TTL
+        frappe.cache.set_value(key, report, expires_in_sec=ttl)
+    return report
+
+
+def build_remediation_report(scan_id):
+    scan = frappe.db.get_value("Website Scan", scan_id, [
+        "name", "website_url", "wcag_level", "compliance_score", "total_pages_scanned",
+        "last_scan_date", "creation"
+    ], as_dict=True)
+    if not scan:
+        frappe.throw(_("Website Scan {0} not found").format(scan_id), frappe.DoesNotExistError)
+
+    data = report_aggregates(scan_id) or summary_aggregates(scan_id) or _empty_aggregates()
+    data["trend"] = scan_trend(scan)
+    report = render_report(scan, data)
+    # Keep the latest rendering on the scan for get_scan_report's ai_insights
+    frappe.db.set_value("Website Scan", scan_id, "remediation_suggestions", report, update_modified=False)
+    return {
+        "report": report,
+        "total_issues": data["totals"]["issues"],
+        "total_occurrences": data["totals"]["occurrences"]
+    }
+
+
+def _empty_aggregates():
+    return {
+        "totals": {"issues": 0, "occurrences": 0, "fixed": 0, "auto_fixable": 0},
+        "by_severity": {},
+        "by_issue_type": [],
+        "by_criterion": [],
+        "top_pages": [],
+        "top_offenders": []
+    }
+
+
+def report_aggregates(scan_id):
+    """Grouped totals of a scan's issues, or None if the scan has no issue rows."""
+    by_severity = {}
+    totals = {"issues": 0, "occurrences": 0, "fixed": 0, "auto_fixable": 0}
+    for row in frappe.db.sql("""
+        SELECT severity,
+            COUNT(*) AS issues,
+            SUM(IFNULL(occurrence_count, 1)) AS occurrences,
+            SUM(fix_applied) AS fixed,
+            SUM(auto_fixable = 1 AND fix_applied = 0) AS auto_fixable
+        FROM `tabAccessibility Issue`
+        WHERE website_scan = %s
+        GROUP BY severity
+    """, scan_id, as_dict=True):
+        counts = {key: cint(row[key]) for key in totals}
+        by_severity[row.severity] = counts
+        for key, value in counts.items():
+            totals[key] += value
+    if not totals["issues"]:
+        return None
+
+    by_issue_type = frappe.db.sql("""
+        SELECT issue_type,
+            COUNT(*) AS issues,
+            SUM(IFNULL(occurrence_count, 1)) AS occurrences,
+            SUM(severity = 'Critical') AS critical,
+            SUM(fix_applied = 0) AS open_issues,
+            SUM(auto_fixable = 1 AND fix_applied = 0) AS auto_fixable
+        FROM `tabAccessibility Issue`
+        WHERE website_scan = %s
+        GROUP BY issue_type
+        ORDER BY critical DESC, occurrences DESC
+        LIMIT %s
+    """, (scan_id, TOP_ISSUE_TYPES), as_dict=True)
+    by_criterion = frappe.db.sql("""
+        SELECT wcag_criterion, COUNT(*) AS issues, SUM(IFNULL(occurrence_count, 1)) AS occurrences
+        FROM `tabAccessibility Issue`
+        WHERE website_scan = %s
+        GROUP BY wcag_criterion
+        ORDER BY occurrences DESC
+        LIMIT %s
+    """, (scan_id, TOP_CRITERIA), as_dict=True)
+    # Deduplicated issues live on the first page they were found on
+    top_pages = frappe.db.sql("""
+        SELECT page_url AS url, COUNT(*) AS issues, SUM(severity = 'Critical') AS critical
+        FROM `tabAccessibility Issue`
+        WHERE website_scan = %s AND fix_applied = 0
+        GROUP BY page_url
+        ORDER BY critical DESC, issues DESC
+        LIMIT %s
+    """, (scan_id, TOP_PAGES), as_dict=True)
+    top_offenders = frappe.db.sql("""
+        SELECT issue_type, severity, wcag_criterion, element_selector, ai_suggested_fix,
+            IFNULL(occurrence_count, 1) AS occurrences, IFNULL(page_count, 1) AS pages
+        FROM `tabAccessibility Issue`
+        WHERE website_scan = %s AND fix_applied = 0
+        ORDER BY FIELD(severity, 'Critical', 'Major', 'Minor'), occurrences DESC
+        LIMIT %s
+    """, (scan_id, TOP_OFFENDERS), as_dict=True)
+
+    return {
+        "totals": totals,
+        "by_severity": by_severity,
+        "by_issue_type": by_issue_type,
+        "by_criterion": by_criterion,
+        "top_pages": top_pages,
+        "top_offenders": top_offenders
+    }
+
+
+def summary_aggregates(scan_id):
+    """The same shape rebuilt from the Website Scan Summary of a purged scan, or None."""
+    summary = frappe.db.get_value("Website Scan Summary", scan_id, [
+        "total_issues", "fixed_issues", "critical_issues", "major_issues", "minor_issues", "breakdown"
+    ], as_dict=True)
+    if not summary:
+        return None
+    breakdown = json.loads(summary.breakdown or "{}")
+
+    totals = {"issues": cint(summary.total_issues), "occurrences": cint(summary.total_issues),
+              "fixed": cint(summary.fixed_issues), "auto_fixable": 0}
+    by_severity = {
+        severity: {"issues": cint(summary[f"{severity.lower()}_issues"])} for severity in SEVERITIES
+    }
+    by_issue_type = sorted((
+        frappe._dict(
+            issue_type=issue_type,
+            issues=sum(counts.values()),
+            occurrences=sum(counts.values()),
+            critical=counts.get("Critical", 0)
+        ) for issue_type, counts in breakdown.get("by_issue_type", {}).items()
+    ), key=lambda row: (row.critical, row.occurrences), reverse=True)[:TOP_ISSUE_TYPES]
+    by_criterion = sorted((
+        frappe._dict(wcag_criterion=criterion, issues=count, occurrences=count)
+        for criterion, count in breakdown.get("by_wcag_criterion", {}).items()
+    ), key=lambda row: row.occurrences, reverse=True)[:TOP_CRITERIA]
+
+    return {
+        "totals": totals,
+        "by_severity": by_severity,
+        "by_issue_type": by_issue_type,
+        "by_criterion": by_criterion,
+        "top_pages": [frappe._dict(page) for page in breakdown.get("top_pages", [])[:TOP_PAGES]],
+        "top_offenders": []
+    }
+
+
+def scan_trend(scan):
+    """Score and issue counts of the site's completed scans up to this one, oldest first."""
+    rows = frappe.get_all(
+        "Website Scan",
+        filters={
+            "website_url": scan.website_url,
+            "scan_status": "Completed",
+            "creation": ["<=", scan.creation]
+        },
+        fields=["name", "last_scan_date", "compliance_score", "total_issues", "critical_issues"],
+        order_by="creation desc",
+        limit=TREND_SCANS
+    )
+    return list(reversed(rows))
+
+
+def _percent(part, whole):
+    return round(part * 100 / whole) if whole else 0
+
+
+def _table(headers, rows):
+    lines = ["| " + " | ".join(headers) + " |", "|" + "---|" * len(headers)]
+    lines.extend("| " + " | ".join(str(value) for value in row) + " |" for row in rows)
+    return "\n".join(lines)
+
+
+def _cell(text, limit=MAX_FIX_LENGTH):
+    text = " ".join(str(text or "").split()).replace("|", "\\|")
+    return text if len(text) <= limit else text[:limit - 1] + "…"
+
+
+def _recommendations(data):
+    recommendations = []
+    totals = data["totals"]
+    critical_types = [row for row in data["by_issue_type"] if cint(row.critical)]
+    for row in critical_types[:3]:
+        recommendations.append(
+            f"Fix **{row.issue_type}** first: {cint(row.critical)} critical issues, "
+            f"{cint(row.occurrences)} occurrences"
+        )
+    if totals["auto_fixable"]:
+        recommendations.append(
+            f"Apply automated fixes to {totals['auto_fixable']} open auto-fixable issues"
+        )
+    shared = [row for row in data["top_offenders"] if cint(row.pages) > 1]
+    if shared:
+        recommendations.append(
+            f"Fix shared templates: {len(shared)} top issues repeat across pages, "
+            f"up to {max(cint(row.pages) for row in shared)} pages for one issue"
+        )
+    remaining = [row for row in data["by_issue_type"] if not cint(row.critical)]
+    for row in remaining[:max(0, 5 - len(recommendations))]:
+        recommendations.append(f"Address **{row.issue_type}** ({cint(row.occurrences)} occurrences)")
+    return recommendations or ["No open issues; keep monitoring with scheduled scans"]
+
+
+def render_report(scan, data):
+    """Render the aggregates of `report_aggregates` as a markdown report."""
+    totals = data["totals"]
+    by_severity = data["by_severity"]
+    severity_count = {severity: cint((by_severity.get(severity) or {}).get("issues")) for severity in SEVERITIES}
+    open_count = {
+        severity: severity_count[severity] - cint((by_severity.get(severity) or {}).get("fixed"))
+        for severity in SEVERITIES
+    }
+    open_issues = totals["issues"] - totals["fixed"]
+
+    sections = [
+        f"# Accessibility Compliance Report for {scan.website_url}",
+        "## Executive Summary\n"
+        f"- **Compliance Score**: {flt(scan.compliance_score, 1)}%\n"
+        f"- **Pages Scanned**: {cint(scan.total_pages_scanned)}\n"
+        f"- **Unique Issues Found**: {totals['issues']}\n"
+        f"- **Total Occurrences**: {totals['occurrences']}\n"
+        f"- **Fixed**: {totals['fixed']} ({_percent(totals['fixed'], totals['issues'])}%), "
+        f"**Open**: {open_issues}\n"
+        f"- **WCAG Level**: {scan.wcag_level}",
+        "## Issues Breakdown\n"
+        + "\n".join(f"- **{severity} Issues**: {severity_count[severity]}" for severity in SEVERITIES),
+        "## Priority Recommendations\n"
+        + "\n".join(f"{index}. {text}" for index, text in enumerate(_recommendations(data), 1))
+    ]
+
+    if data["by_issue_type"]:
+        sections.append("## Top Issue Types\n" + _table(
+            ["Issue Type", "Unique", "Occurrences", "Critical", "Auto-fixable"],
+            [(_cell(row.issue_type), cint(row.issues), cint(row.occurrences), cint(row.critical),
+              cint(row.get("auto_fixable"))) for row in data["by_issue_type"]]
+        ))
+    if data["top_offenders"]:
+        sections.append("## Top Offenders\n" + _table(
+            ["Issue", "Severity", "WCAG", "Element", "Occurrences", "Pages", "Suggested Fix"],
+            [(_cell(row.issue_type), row.severity, row.wcag_criterion or "", _cell(row.element_selector, 80),
+              cint(row.occurrences), cint(row.pages), _cell(row.ai_suggested_fix)) for row in data["top_offenders"]]
+        ))
+    if data["by_criterion"]:
+        sections.append("## WCAG Criteria\n" + _table(
+            ["Criterion", "Unique", "Occurrences"],
+            [(row.wcag_criterion or "Unknown", cint(row.issues), cint(row.occurrences)) for row in data["by_criterion"]]
+        ))
+    if data["top_pages"]:
+        sections.append("## Pages With Most Open Issues\n" + _table(
+            ["Page", "Issues", "Critical"],
+            [(_cell(row.url, 120), cint(row.issues), cint(row.critical)) for row in data["top_pages"]]
+        ))
+    if len(data["trend"]) > 1:
+        first, last = data["trend"][0], data["trend"][-1]
+        change = flt(last.compliance_score) - flt(first.compliance_score)
+        sections.append(
+            f"## Trend\nScore {'up' if change >= 0 else 'down'} {abs(round(change, 1))} points "
+            f"over the last {len(data['trend'])} scans.\n\n" + _table(
+                ["Scan Date", "Score", "Issues", "Critical"],
+                [(row.last_scan_date or "", flt(row.compliance_score, 1), cint(row.total_issues),
+                  cint(row.critical_issues)) for row in data["trend"]]
+            )
+        )
+
+    sections.append(
+        "## Implementation Timeline\n"
+        f"- **Week 1**: Fix {open_count['Critical']} critical issues\n"
+        f"- **Week 2-3**: Address {open_count['Major']} major issues\n"
+        f"- **Week 4**: Review and fix {open_count['Minor']} minor issues"
+    )
+    sections.append(
+        "## Next Steps\n"
+        "1. Apply automated fixes where possible\n"
+        "2. Manual review of complex issues\n"
+        "3. User testing with assistive technologies\n"
+        "4. Regular compliance monitoring"
+    )
+    return "\n\n".join(sections) + "\n"
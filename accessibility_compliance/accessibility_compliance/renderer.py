@@ -0,0 +1,305 @@
+# accessibility_compliance/accessibility_compliance/renderer.py
+"""Tiered page rendering.
+
+Every page gets the static lxml pass. Only pages that look script-rendered, or
+on which a rule asked for computed styles, are sent to a pool of long-lived
+headless Chrome sessions. Browser startup happens once when the pool starts,
+outside of any page's latency.
+"""
+import asyncio
+import queue
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from selenium import webdriver
+from selenium.webdriver.chrome.service import Service
+from webdriver_manager.chrome import ChromeDriverManager
+
+TIER_STATIC = "static"
+TIER_BROWSER = "browser"
+TIER_BROWSER_FAILED = "browser_failed"
+
+# Empty mount points used by client-side frameworks
+_APP_ROOT_IDS = {"root", "app", "__next", "__nuxt", "___gatsby", "svelte", "main-app"}
+_NOSCRIPT_JS_RE = re.compile(r"enable\s+javascript|requires\s+javascript|javascript\s+(is\s+)?(required|disabled)", re.I)
+
+# Annotates text-bearing elements with their computed colors and font so the
+# static rules can read them from the serialized DOM as data attributes.
+COMPUTED_STYLE_SCRIPT = """
+const limit = arguments[0];
+let annotated = 0;
+const walker = document.createTreeWalker(document.body || document.documentElement, NodeFilter.SHOW_ELEMENT);
+while (walker.nextNode() && annotated < limit) {
+    const el = walker.currentNode;
+    const hasText = Array.from(el.childNodes).some(n => n.nodeType === 3 && n.textContent.trim());
+    if (!hasText) continue;
+    const style = getComputedStyle(el);
+    let bg = style.backgroundColor, node = el;
+    while ((bg === 'rgba(0, 0, 0, 0)' || bg === 'transparent') && node.parentElement) {
+        node = node.parentElement;
+        bg = getComputedStyle(node).backgroundColor;
+    }
+    el.setAttribute('data-a11y-color', style.color);
+    el.setAttribute('data-a11y-bg', bg === 'rgba(0, 0, 0, 0)' ? 'rgb(255, 255, 255)' : bg);
+    el.setAttribute('data-a11y-font-size', style.fontSize);
+    el.setAttribute('data-a11y-font-weight', style.fontWeight);
+    annotated++;
+}
+return annotated;
+"""
+
+
+def looks_script_rendered(root):
+    """Heuristic: does the static HTML depend on JavaScript to produce its content?"""
+    if root is None:
+        return True
+
+    body_el = root.find("body")
+    if body_el is None:
+        return True
+
+    text_length = 0
+    script_count = 0
+    for element in body_el.iter():
+        tag = element.tag
+        if not isinstance(tag, str):
+            continue
+        if tag == "script":
+            script_count += 1
+            continue
+        if tag == "noscript":
+            if _NOSCRIPT_JS_RE.search("".join(element.itertext())):
+                return True
+            continue
+        if element.text and tag != "style":
+            text_length += len(element.text.strip())
+        if element.tail:
+            text_length += len(element.tail.strip())
+
+        if tag == "div" and element.get("id") in _APP_ROOT_IDS and len(element) == 0 and not (element.text or "").strip():
+            return True
+
+    # Pages with almost no server-rendered text but several scripts are client-rendered
+    return text_length < 200 and script_count >= 2
+
+
+class BrowserPool:
+    """A fixed set of reused headless Chrome sessions.
+
+    Each session keeps a single long-lived tab that is navigated from page to
+    page, and is recycled after `max_pages_per_session` renders to bound the
+    browser's memory growth.
+    """
+
+    def __init__(self, size=2, page_timeout=30, max_pages_per_session=200, annotate_limit=5000):
+        self.size = max(1, size)
+        self.page_timeout = page_timeout
+        self.max_pages_per_session = max_pages_per_session
+        self.annotate_limit = annotate_limit
+        self.startup_time = 0.0
+        self.render_time = 0.0
+        self.pages_rendered = 0
+        self.startup_error = None
+        self._sessions = queue.Queue()
+        self._executor = ThreadPoolExecutor(max_workers=self.size, thread_name_prefix="a11y-browser")
+        self._driver_path = None
+        self._started = threading.Event()
+        self._lock = threading.Lock()
+        self._closed = False
+
+    def start(self):
+        """Launch all sessions in parallel; safe to call more than once."""
+        with self._lock:
+            if self._started.is_set():
+                return
+            started = time.monotonic()
+            try:
+                if self._closed:
+                    raise RuntimeError("the pool was closed before it started")
+                self._driver_path = ChromeDriverManager().install()
+                # A separate executor, so renders already queued on the pool cannot starve startup
+                with ThreadPoolExecutor(max_workers=self.size) as launcher:
+                    launches = [launcher.submit(self._new_driver) for _ in range(self.size)]
+                drivers, errors = [], []
+                for launch in launches:
+                    try:
+                        drivers.append(launch.result())
+                    except Exception as e:
+                        errors.append(e)
+                if errors:
+                    # Sessions that did launch would otherwise be left running
+                    for driver in drivers:
+                        self._quit(driver)
+                    raise errors[0]
+                for driver in drivers:
+                    self._sessions.put([driver, 0])
+            except Exception as e:
+                self.startup_error = e
+            finally:
+                self.startup_time = time.monotonic() - started
+                self._started.set()
+
+    def start_in_background(self):
+        """Warm the pool while the crawl is already running."""
+        thread = threading.Thread(target=self.start, daemon=True)
+        thread.start()
+        return thread
+
+    def close(self):
+        with self._lock:
+            # Waits for a launch still running on the startup thread; a later start() launches nothing
+            self._closed = True
+        self._executor.shutdown(wait=True)
+        while not self._sessions.empty():
+            driver, _ = self._sessions.get_nowait()
+            self._quit(driver)
+
+    def render(self, url, computed_styles=False):
+        """Load `url` in a pooled session and return the rendered DOM as HTML."""
+        self._started.wait()
+        if self.startup_error is not None:
+            raise RuntimeError(f"Headless browser pool failed to start: {self.startup_error}")
+        session = self._sessions.get()
+        try:
+            started = time.monotonic()
+            driver = session[0]
+            driver.get(url)
+            if computed_styles:
+                driver.execute_script(COMPUTED_STYLE_SCRIPT, self.annotate_limit)
+            html = driver.page_source
+            self.render_time += time.monotonic() - started
+            self.pages_rendered += 1
+            session[1] += 1
+            return html
+        except Exception:
+            # A crashed or wedged session is replaced rather than reused
+            session[1] = self.max_pages_per_session
+            raise
+        finally:
+            if session[1] >= self.max_pages_per_session:
+                session = self._replace(session)
+            self._sessions.put(session)
+
+    async def render_async(self, url, computed_styles=False):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, self.render, url, computed_styles)
+
+    def _replace(self, session):
+        self._quit(session[0])
+        try:
+            return [self._new_driver(), 0]
+        except Exception:
+            # Keep the slot so the pool never shrinks; the next render retries the launch
+            return session
+
+    def _quit(self, driver):
+        try:
+            driver.quit()
+        except Exception:
+            pass
+
+    def _new_driver(self):
+        options = webdriver.ChromeOptions()
+        for argument in (
+            "--headless=new",
+            "--no-sandbox",
+            "--disable-gpu",
+            "--disable-dev-shm-usage",
+            "--disable-extensions",
+            "--blink-settings=imagesEnabled=false",
+            "--window-size=1366,900"
+        ):
+            options.add_argument(argument)
+        options.page_load_strategy = "normal"
+
+        driver = webdriver.Chrome(service=Service(self._driver_path), options=options)
+        driver.set_page_load_timeout(self.page_timeout)
+        return driver
+
+
+def analyze_static(engine, url, body, rendered=False, detect_script_rendered=False):
+    """The static pass over one page.
+
+    Returns (issues, render reasons, whether the page looks script-rendered);
+    the heuristic is only evaluated when `detect_script_rendered` is set.
+    """
+    if engine.should_stream(body):
+        # A page large enough to stream is not an empty script shell
+        ctx = engine.analyze_stream(body, url, rendered=rendered)
+        return ctx.issues, ctx.render_reasons, False
+    root = engine.parse(body)
+    ctx = engine.analyze_context(root, url, rendered=rendered)
+    return ctx.issues, ctx.render_reasons, detect_script_rendered and looks_script_rendered(root)
+
+
+class TieredAnalyzer:
+    """Runs the static pass on every page and escalates to the browser pool when needed.
+
+    With an `analysis_pool`, the static passes run in worker processes while
+    the event loop keeps fetching. With `metrics` (an instrumentation.ScanMetrics),
+    browser renders are timed and pages are counted per tier.
+    """
+
+    def __init__(self, engine, browser_pool=None, render_mode="auto", analysis_pool=None, metrics=None):
+        self.engine = engine
+        self.browser_pool = browser_pool
+        self.render_mode = render_mode
+        self.analysis_pool = analysis_pool
+        self.metrics = metrics
+        self.tier_counts = {TIER_STATIC: 0, TIER_BROWSER: 0, TIER_BROWSER_FAILED: 0}
+
+    @property
+    def detects_script_rendered(self):
+        return self.browser_pool is not None and self.render_mode not in ("never", "always")
+
+    def needs_browser(self, render_reasons, script_rendered):
+        if self.browser_pool is None or self.render_mode == "never":
+            return False
+        if self.render_mode == "always":
+            return True
+        return bool(render_reasons) or script_rendered
+
+    async def _analyze_static(self, url, body, rendered=False):
+        detect = self.detects_script_rendered and not rendered
+        if self.analysis_pool is not None:
+            return await self.analysis_pool.analyze(url, body, rendered=rendered, detect_script_rendered=detect)
+        return analyze_static(self.engine, url, body, rendered=rendered, detect_script_rendered=detect)
+
+    async def analyze(self, url, body):
+        """Return the issues for a fetched page, rendering it in the browser only if needed."""
+        issues, render_reasons, script_rendered = await self._analyze_static(url, body)
+
+        if not self.needs_browser(render_reasons, script_rendered):
+            self._count_tier(TIER_STATIC)
+            return issues
+
+        started = time.perf_counter()
+        try:
+            computed_styles = self.render_mode == "always" or bool(render_reasons)
+            rendered = await self.browser_pool.render_async(url, computed_styles=computed_styles)
+        except Exception:
+            # Fall back to the static results rather than losing the page
+            self._count_tier(TIER_BROWSER_FAILED)
+            return issues
+        finally:
+            if self.metrics is not None:
+                self.metrics.observe("render", time.perf_counter() - started)
+
+        self._count_tier(TIER_BROWSER)
+        return (await self._analyze_static(url, rendered, rendered=True))[0]
+
+    def _count_tier(self, tier):
+        self.tier_counts[tier] += 1
+        if self.metrics is not None:
+            self.metrics.count(f"pages_by_tier|{tier}")
+
+    def report(self):
+        report = dict(self.tier_counts)
+        if self.browser_pool is not None:
+            report["browser_startup_s"] = round(self.browser_pool.startup_time, 3)
+            report["browser_render_s"] = round(self.browser_pool.render_time, 3)
+        if self.analysis_pool is not None:
+            report.update(self.analysis_pool.report())
+        return report
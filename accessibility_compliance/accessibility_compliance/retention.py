@@ -0,0 +1,175 @@
+# accessibility_compliance/accessibility_compliance/retention.py
+"""Retention of scan detail rows.
+
+Every site keeps the Accessibility Issue rows of its last `scan_retention_count`
+finished scans. Older scans are first compacted into a Website Scan Summary
+(counts by severity, issue type, WCAG criterion and worst pages) and then
+have their issue rows deleted in small batches by primary key, each batch in
+its own short transaction, until the run's time budget is spent. Website Scan
+rows and their summaries are never deleted.
+"""
+import time
+
+import frappe
+from frappe.utils import cint, flt
+
+from accessibility_compliance.accessibility_compliance.dashboard import record_issues_deleted
+from accessibility_compliance.accessibility_compliance.remediation_report import clear_report_cache
+
+SUMMARY_DOCTYPE = "Website Scan Summary"
+
+DEFAULT_RETENTION_COUNT = 5
+DEFAULT_BATCH_SIZE = 1000
+DEFAULT_TIME_BUDGET = 60
+DEFAULT_BATCH_PAUSE = 0.05
+TOP_PAGES = 20
+
+FINISHED_STATUSES = ("Completed", "Failed")
+
+
+def get_retention_settings():
+    return frappe._dict(
+        keep=cint(frappe.conf.get("scan_retention_count")) or DEFAULT_RETENTION_COUNT,
+        batch_size=cint(frappe.conf.get("cleanup_batch_size")) or DEFAULT_BATCH_SIZE,
+        time_budget=flt(frappe.conf.get("cleanup_time_budget_seconds")) or DEFAULT_TIME_BUDGET,
+        pause=flt(frappe.conf.get("cleanup_batch_pause", DEFAULT_BATCH_PAUSE)),
+        compact=bool(cint(frappe.conf.get("scan_retention_compact", 1)))
+    )
+
+
+def expired_scans(keep, limit=100):
+    """Finished scans outside the newest `keep` of their site that still have issue rows, oldest first."""
+    return frappe.db.sql("""
+        SELECT ranked.name
+        FROM (
+            SELECT name, creation,
+                ROW_NUMBER() OVER (PARTITION BY website_url ORDER BY creation DESC) AS position
+            FROM `tabWebsite Scan`
+            WHERE scan_status IN %(statuses)s
+        ) ranked
+        WHERE ranked.position > %(keep)s
+            AND EXISTS (
+                SELECT 1 FROM `tabAccessibility Issue` issue WHERE issue.website_scan = ranked.name
+            )
+        ORDER BY ranked.creation
+        LIMIT %(limit)s
+    """, {"statuses": FINISHED_STATUSES, "keep": keep, "limit": limit}, pluck=True)
+
+
+def build_scan_summary(scan_id):
+    """Aggregate a scan's issue rows into a Website Scan Summary, unless one already exists."""
+    if frappe.db.exists(SUMMARY_DOCTYPE, scan_id):
+        return
+    scan = frappe.db.get_value("Website Scan", scan_id, [
+        "website_url", "wcag_level", "last_scan_date", "compliance_score", "total_pages_scanned"
+    ], as_dict=True)
+
+    by_type = {}
+    totals = {"Critical": 0, "Major": 0, "Minor": 0}
+    fixed = 0
+    for issue_type, severity, count, fixed_count in frappe.db.sql("""
+        SELECT issue_type, severity, COUNT(*), SUM(fix_applied)
+        FROM `tabAccessibility Issue`
+        WHERE website_scan = %s
+        GROUP BY issue_type, severity
+    """, scan_id):
+        by_type.setdefault(issue_type or "Other", {})[severity] = count
+        if severity in totals:
+            totals[severity] += count
+        fixed += cint(fixed_count)
+
+    by_criterion = dict(frappe.db.sql("""
+        SELECT wcag_criterion, COUNT(*)
+        FROM `tabAccessibility Issue`
+        WHERE website_scan = %s
+        GROUP BY wcag_criterion
+    """, scan_id))
+    top_pages = frappe.db.sql("""
+        SELECT page_url AS url, COUNT(*) AS issues, SUM(severity = 'Critical') AS critical
+        FROM `tabAccessibility Issue`
+        WHERE website_scan = %s
+        GROUP BY page_url
+        ORDER BY issues DESC
+        LIMIT %s
+    """, (scan_id, TOP_PAGES), as_dict=True)
+
+    frappe.get_doc({
+        "doctype": SUMMARY_DOCTYPE,
+        "website_scan": scan_id,
+        "website_url": scan.website_url,
+        "scan_date": scan.last_scan_date,
+        "wcag_level": scan.wcag_level,
+        "compliance_score": scan.compliance_score,
+        "total_pages_scanned": scan.total_pages_scanned,
+        "total_issues": sum(totals.values()),
+        "fixed_issues": fixed,
+        "critical_issues": totals["Critical"],
+        "major_issues": totals["Major"],
+        "minor_issues": totals["Minor"],
+        "breakdown": frappe.as_json({
+            "by_issue_type": by_type,
+            "by_wcag_criterion": {key or "Unknown": value for key, value in by_criterion.items()},
+            "top_pages": [
+                {"url": row.url, "issues": cint(row.issues), "critical": cint(row.critical)} for row in top_pages
+            ]
+        }, indent=None)
+    }).insert(ignore_permissions=True)
+
+
+def purge_scan_issues(scan_id, batch_size, deadline, pause=0.0):
+    """Delete a scan's issue rows batch by batch until none are left or the deadline passes.
+
+    Returns (rows_deleted, finished).
+    """
+    deleted = 0
+    while time.monotonic() < deadline:
+        rows = frappe.db.sql("""
+            SELECT name, issue_type, fix_applied
+            FROM `tabAccessibility Issue`
+            WHERE website_scan = %s
+            LIMIT %s
+        """, (scan_id, batch_size))
+        if not rows:
+            # Incremental re-scans must not carry forward from a purged scan
+            frappe.db.delete("Scanned Page", {"website_scan": scan_id})
+            frappe.db.commit()
+            clear_report_cache(scan_id)
+            return deleted, True
+
+        frappe.db.delete("Accessibility Issue", {"name": ("in", [row[0] for row in rows])})
+        frappe.db.commit()
+
+        type_counts = {}
+        for _name, issue_type, _fixed in rows:
+            type_counts[issue_type] = type_counts.get(issue_type, 0) + 1
+        record_issues_deleted(type_counts, sum(cint(row[2]) for row in rows))
+        deleted += len(rows)
+        if pause:
+            time.sleep(pause)
+    return deleted, False
+
+
+def cleanup_old_scan_data(time_budget=None):
+    """Compact and purge expired scans until the time budget is spent."""
+    settings = get_retention_settings()
+    deadline = time.monotonic() + flt(time_budget or settings.time_budget)
+    result = {"scans_compacted": 0, "scans_purged": 0, "rows_deleted": 0, "finished": True}
+
+    while time.monotonic() < deadline:
+        scans = expired_scans(settings.keep)
+        if not scans:
+            return result
+        for scan_id in scans:
+            if settings.compact and not frappe.db.exists(SUMMARY_DOCTYPE, scan_id):
+                build_scan_summary(scan_id)
+                frappe.db.commit()
+                result["scans_compacted"] += 1
+            deleted, finished = purge_scan_issues(scan_id, settings.batch_size, deadline, settings.pause)
+            result["rows_deleted"] += deleted
+            if not finished:
+                result["finished"] = False
+                return result
+            result["scans_purged"] += 1
+
+    result["finished"] = False
+    return result
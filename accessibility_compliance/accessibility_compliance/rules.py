@@ -0,0 +1,975 @@
+# accessibility_compliance/accessibility_compliance/rules.py
+"""Static-HTML WCAG rule engine.
+
+Each page is parsed once with lxml and every active rule is evaluated during a
+single walk over the tree. Rules declare the tags they care about; the engine
+builds a tag -> handlers dispatch table so an element only reaches the rules
+that asked for it. Rules that need the whole page (title, landmarks, heading
+order) finish their work in `end_page`.
+
+Pages above the engine's `stream_threshold` are parsed incrementally instead
+when every active rule is `streamable`: rules see each element when it
+closes, and closed subtrees are dropped as the parser moves on, so memory
+follows the open part of the document rather than the whole page.
+"""
+import hashlib
+import re
+import time
+from dataclasses import dataclass, field
+
+from lxml import etree
+
+from accessibility_compliance.accessibility_compliance.contrast import (
+    InvalidColorError,
+    evaluate_contrast,
+    is_large_text,
+    parse_color
+)
+from accessibility_compliance.accessibility_compliance.stylesheets import PageStyles
+
+WCAG_LEVELS = {"A": 1, "AA": 2, "AAA": 3}
+SEVERITY_WEIGHTS = {"Critical": 10, "Major": 5, "Minor": 2}
+
+RULE_REGISTRY = {}
+
+# Plain etree elements: lxml.html's custom element classes add a Python lookup per node
+_PARSER = etree.HTMLParser(remove_comments=True, remove_pis=True, collect_ids=False)
+
+DEFAULT_STREAM_THRESHOLD = 1024 * 1024
+STREAM_CHUNK_SIZE = 64 * 1024
+
+
+@dataclass
+class Issue:
+    """An accessibility violation found on a page."""
+    issue_type: str
+    severity: str
+    wcag_criterion: str
+    issue_description: str
+    page_url: str = None
+    element_selector: str = None
+    html_snippet: str = None
+    auto_fixable: bool = False
+    ai_suggested_fix: str = None
+    rule: str = None
+
+    @property
+    def fingerprint(self):
+        return issue_fingerprint(self.rule or self.issue_type, self.element_selector, self.html_snippet)
+
+    def as_api_dict(self):
+        """Shape used by the public API responses."""
+        return {
+            "type": self.issue_type,
+            "severity": self.severity,
+            "description": self.issue_description,
+            "wcag_criterion": self.wcag_criterion,
+            "element_selector": self.element_selector,
+            "auto_fixable": self.auto_fixable,
+            "ai_suggested_fix": self.ai_suggested_fix
+        }
+
+
+@dataclass
+class PageContext:
+    """Per-page state shared by all rules during one traversal."""
+    url: str
+    root: object = None
+    rendered: bool = False
+    wcag_level: str = "AA"
+    options: dict = field(default_factory=dict)
+    issues: list = field(default_factory=list)
+    render_reasons: list = field(default_factory=list)
+    sibling_index: dict = field(default_factory=dict)
+    # Set while streaming, to locate elements before the parser drops them
+    locator: object = None
+    # The engine's StylesheetCache, if linked stylesheets are loaded
+    stylesheets: object = None
+
+    def request_render(self, reason):
+        """Ask for the page to be re-analyzed from a browser-rendered DOM with computed styles."""
+        if not self.rendered:
+            self.render_reasons.append(reason)
+
+    def pin(self, element):
+        """Keep `element` reportable after `visit` returns; required for streamable rules that report in `end_page`."""
+        if self.locator is not None:
+            self.locator.track(element)
+
+    def report(self, rule, element=None, description=None, severity=None):
+        issue = Issue(
+            issue_type=rule.issue_type,
+            severity=severity or rule.severity,
+            wcag_criterion=rule.wcag_criterion,
+            issue_description=description or rule.description,
+            page_url=self.url,
+            element_selector=(
+                css_selector(element, sibling_index=self.sibling_index)
+                if element is not None and self.locator is None else None
+            ),
+            html_snippet=html_snippet(element) if element is not None else None,
+            auto_fixable=rule.auto_fixable,
+            ai_suggested_fix=rule.fix_suggestion,
+            rule=rule.name
+        )
+        if element is not None and self.locator is not None:
+            self.locator.assign(issue, element)
+        self.issues.append(issue)
+
+
+class _StreamLocator:
+    """Builds the same selectors as `css_selector` for elements of a page that is being streamed.
+
+    The open elements are kept on a stack with their position among same-tag
+    siblings and the tag counts of their children. Whether an element has later
+    siblings of its tag is only known once its parent closes, so selectors are
+    kept as steps and rendered in `finish`, when every count is final.
+    """
+
+    def __init__(self, max_depth=4):
+        self.max_depth = max_depth
+        self.stack = []
+        self.steps = {}
+        self.issues = []
+
+    def opened(self, element):
+        counts = self.stack[-1][2] if self.stack else {}
+        position = counts.get(element.tag, 0)
+        counts[element.tag] = position + 1
+        self.stack.append((element, position, {}))
+
+    def closed(self):
+        self.stack.pop()
+
+    def track(self, element):
+        if element in self.steps:
+            return
+        if not self.stack or self.stack[-1][0] is not element:
+            # Outside the element's own end event (the root in end_page): fall back to the tree
+            self.steps[element] = [css_selector(element, self.max_depth)]
+            return
+        steps = []
+        for index in range(len(self.stack) - 1, -1, -1):
+            node, position, _children = self.stack[index]
+            if not isinstance(node.tag, str) or len(steps) >= self.max_depth:
+                break
+            tag = node.tag.lower()
+            node_id = node.get("id")
+            if node_id:
+                steps.append(f"{tag}#{node_id}")
+                break
+            if tag in ("html", "body"):
+                steps.append(tag)
+                break
+            siblings = self.stack[index - 1][2] if index else {}
+            steps.append((tag, node.tag, position, siblings))
+        self.steps[element] = steps
+
+    def pinned(self, element):
+        return element in self.steps
+
+    def assign(self, issue, element):
+        self.track(element)
+        self.issues.append((issue, element))
+
+    def finish(self):
+        for issue, element in self.issues:
+            parts = []
+            for step in reversed(self.steps[element]):
+                if isinstance(step, tuple):
+                    tag, key, position, siblings = step
+                    if position or siblings.get(key, 0) > 1:
+                        tag = f"{tag}:nth-of-type({position + 1})"
+                    step = tag
+                parts.append(step)
+            issue.element_selector = " > ".join(parts)
+
+
+class Rule:
+    """Base class for a static-HTML accessibility rule.
+
+    Subclasses set `tags` to the lower-case element names they want to see
+    (or `("*",)` for every element) and implement `visit`. A fresh instance is
+    created for each page, so rules may keep per-page state on `self`.
+    """
+    name = None
+    issue_type = None
+    wcag_criterion = None
+    wcag_level = "A"
+    severity = "Major"
+    description = None
+    fix_suggestion = None
+    auto_fixable = False
+    tags = ()
+    # Streamed pages visit each element when it closes, with its ancestors in place but
+    # its descendants only kept under `subtree_tags`; elements kept past `visit` must be
+    # pinned. One rule that is not streamable makes the engine build the full tree.
+    streamable = False
+    subtree_tags = ()
+
+    def start_page(self, ctx):
+        pass
+
+    def visit(self, element, ctx):
+        pass
+
+    def end_page(self, ctx):
+        pass
+
+
+def register_rule(cls):
+    """Class decorator adding a rule to the default registry."""
+    RULE_REGISTRY[cls.name] = cls
+    return cls
+
+
+def get_rules(wcag_level="AA", rules=None):
+    """Return the rule classes that apply at `wcag_level`."""
+    max_level = WCAG_LEVELS.get((wcag_level or "AA").upper(), WCAG_LEVELS["AA"])
+    candidates = rules if rules is not None else RULE_REGISTRY.values()
+    return [cls for cls in candidates if WCAG_LEVELS.get(cls.wcag_level, 1) <= max_level]
+
+
+def parse_html(body):
+    """Parse an HTML document (bytes or str) into an lxml root element, or None if empty."""
+    if isinstance(body, str):
+        body = body.encode("utf-8")
+    if not body or not body.strip():
+        return None
+    try:
+        return etree.fromstring(body, _PARSER)
+    except (etree.LxmlError, ValueError):
+        return None
+
+
+def sibling_position(element, sibling_index=None):
+    """Return the position of `element` among its same-tag siblings and whether it has any.
+
+    With a `sibling_index` dict, each parent's children are counted once and
+    the result is reused, which keeps selectors linear on very wide pages.
+    """
+    parent = element.getparent()
+    if sibling_index is None or parent is None:
+        position = sum(1 for _ in element.itersiblings(element.tag, preceding=True))
+        return position, bool(position) or next(element.itersiblings(element.tag), None) is not None
+
+    index = sibling_index.get(parent)
+    if index is None:
+        positions = {}
+        counts = {}
+        for child in parent:
+            positions[child] = counts.get(child.tag, 0)
+            counts[child.tag] = positions[child] + 1
+        sibling_index[parent] = index = (positions, counts)
+    positions, counts = index
+    return positions[element], counts[element.tag] > 1
+
+
+def css_selector(element, max_depth=4, sibling_index=None):
+    """Build a short CSS selector pointing at `element`."""
+    parts = []
+    node = element
+    while node is not None and isinstance(node.tag, str) and len(parts) < max_depth:
+        tag = node.tag.lower()
+        node_id = node.get("id")
+        if node_id:
+            parts.append(f"{tag}#{node_id}")
+            break
+        if tag in ("html", "body"):
+            parts.append(tag)
+            break
+
+        position, has_siblings = sibling_position(node, sibling_index)
+        if has_siblings:
+            tag = f"{tag}:nth-of-type({position + 1})"
+        parts.append(tag)
+        node = node.getparent()
+    return " > ".join(reversed(parts))
+
+
+def html_snippet(element, limit=200):
+    """Return the opening tag of `element`, truncated, for reports and fingerprinting."""
+    attrs = " ".join(f'{key}="{value}"' for key, value in element.attrib.items())
+    snippet = f"<{element.tag} {attrs}>" if attrs else f"<{element.tag}>"
+    return snippet[:limit]
+
+
+_ID_DIGITS_RE = re.compile(r"(#[\w-]*?)\d+")
+
+
+def normalize_selector(selector):
+    """Selector with whitespace collapsed and generated numeric suffixes stripped from ids."""
+    if not selector:
+        return ""
+    return _ID_DIGITS_RE.sub(r"\1N", " ".join(selector.split()))
+
+
+def snippet_hash(snippet):
+    """Hash of an element snippet with whitespace runs collapsed."""
+    return hashlib.sha1(" ".join((snippet or "").split()).encode()).hexdigest()
+
+
+def issue_fingerprint(rule, selector=None, snippet=None):
+    """Identity of an issue across pages: the same rule failing on the same templated element.
+
+    A logo without alt text in a shared header has the same rule, selector and
+    snippet on every page, so all of its occurrences share one fingerprint.
+    """
+    key = f"{rule}\n{normalize_selector(selector)}\n{snippet_hash(snippet)}"
+    return hashlib.sha1(key.encode()).hexdigest()
+
+
+def element_text(element):
+    return "".join(element.itertext()).strip()
+
+
+def has_accessible_name(element):
+    return bool(
+        (element.get("aria-label") or "").strip()
+        or (element.get("aria-labelledby") or "").strip()
+        or (element.get("title") or "").strip()
+    )
+
+
+def parse_style_attribute(style):
+    """Parse an inline `style` attribute into a dict of lower-case declarations."""
+    declarations = {}
+    for declaration in (style or "").split(";"):
+        name, sep, value = declaration.partition(":")
+        if sep:
+            declarations[name.strip().lower()] = value.replace("!important", "").strip()
+    return declarations
+
+
+def parse_font_size(value):
+    """Convert a CSS font-size in px/pt/em/rem to pixels, or None when it cannot be resolved."""
+    value = (value or "").strip().lower()
+    for unit, factor in (("px", 1.0), ("pt", 4.0 / 3.0), ("rem", 16.0), ("em", 16.0)):
+        if value.endswith(unit):
+            try:
+                return float(value[:-len(unit)]) * factor
+            except ValueError:
+                return None
+    return None
+
+
+def calculate_compliance_score(critical=0, major=0, minor=0):
+    """Score a page from 0 to 100 based on its issue counts."""
+    return max(0, 100 - critical * SEVERITY_WEIGHTS["Critical"]
+               - major * SEVERITY_WEIGHTS["Major"]
+               - minor * SEVERITY_WEIGHTS["Minor"])
+
+
+def summarize_issues(issues):
+    """Count issues per severity."""
+    counts = {"critical": 0, "major": 0, "minor": 0}
+    for issue in issues:
+        key = issue.severity.lower()
+        if key in counts:
+            counts[key] += 1
+    return counts
+
+
+class RuleEngine:
+    """Runs a set of rules over pages in a single pass per page."""
+
+    def __init__(self, wcag_level="AA", rules=None, profile=False, options=None,
+                 stream_threshold=DEFAULT_STREAM_THRESHOLD, stylesheets=None, rule_sample_every=0):
+        self.wcag_level = (wcag_level or "AA").upper()
+        self.options = options or {}
+        self.stylesheets = stylesheets
+        self.rule_classes = get_rules(wcag_level, rules)
+        self.profile = profile
+        self.stream_threshold = stream_threshold
+        self.rule_timings = {cls.name: 0.0 for cls in self.rule_classes}
+        self.parse_time = 0.0
+        self.pages_analyzed = 0
+        self.pages_streamed = 0
+        # Every Nth tree-analyzed page is timed per rule, as in profile mode; 0 times none
+        self.rule_sample_every = rule_sample_every
+        self.pages_sampled = 0
+        self._timings_taken = None
+
+    @property
+    def signature(self):
+        """A hash of everything besides the page that affects the results: level, rules and options."""
+        parts = [self.wcag_level, sorted(cls.name for cls in self.rule_classes), sorted(self.options.items())]
+        return hashlib.sha1(repr(parts).encode()).hexdigest()
+
+    @property
+    def can_stream(self):
+        return not self.profile and all(cls.streamable for cls in self.rule_classes)
+
+    def should_stream(self, body):
+        """Whether `body` is large enough to stream; a threshold of 0 disables streaming."""
+        return bool(self.stream_threshold) and len(body or b"") > self.stream_threshold and self.can_stream
+
+    def analyze(self, body, url=None):
+        """Parse `body` and return the list of issues found on the page."""
+        if self.should_stream(body):
+            return self.analyze_stream(body, url).issues
+        return self.analyze_tree(self.parse(body), url)
+
+    def parse(self, body):
+        """Parse `body` with `parse_html`, adding the time taken to `parse_time`."""
+        started = time.perf_counter()
+        root = parse_html(body)
+        self.parse_time += time.perf_counter() - started
+        return root
+
+    def analyze_tree(self, root, url=None):
+        """Run all rules over an already parsed document."""
+        return self.analyze_context(root, url).issues
+
+    def analyze_context(self, root, url=None, rendered=False):
+        """Run all rules over a parsed document and return the page context."""
+        ctx = PageContext(url=url, root=root, rendered=rendered, wcag_level=self.wcag_level, options=self.options,
+                          stylesheets=self.stylesheets)
+        rules = [cls() for cls in self.rule_classes]
+        self.pages_analyzed += 1
+
+        if self.profile or (self.rule_sample_every and self.pages_analyzed % self.rule_sample_every == 0):
+            self.pages_sampled += 1
+            self._analyze_profiled(rules, ctx)
+            return ctx
+
+        dispatch, wildcard = self._dispatch_table(rules)
+        for rule in rules:
+            rule.start_page(ctx)
+
+        if root is not None:
+            for element in root.iter():
+                tag = element.tag
+                if not isinstance(tag, str):
+                    continue
+                handlers = dispatch.get(tag.lower())
+                if handlers:
+                    for handler in handlers:
+                        handler(element, ctx)
+                for handler in wildcard:
+                    handler(element, ctx)
+
+        for rule in rules:
+            rule.end_page(ctx)
+        return ctx
+
+    def analyze_stream(self, body, url=None, rendered=False, chunk_size=STREAM_CHUNK_SIZE):
+        """Run all rules while parsing `body` in chunks and return the page context.
+
+        Rules visit each element on its end event, after which it is cleared and
+        dropped from the tree, unless it is inside one of the rules'
+        `subtree_tags`. Reported and pinned elements are located before that, so
+        the issues match those of `analyze_context`.
+        """
+        if isinstance(body, str):
+            body = body.encode("utf-8")
+        ctx = PageContext(url=url, root=None, rendered=rendered, wcag_level=self.wcag_level, options=self.options,
+                          stylesheets=self.stylesheets)
+        ctx.locator = locator = _StreamLocator()
+        rules = [cls() for cls in self.rule_classes]
+        self.pages_analyzed += 1
+        self.pages_streamed += 1
+
+        dispatch, wildcard = self._dispatch_table(rules)
+        subtree_tags = {tag for rule in rules for tag in rule.subtree_tags}
+        open_subtrees = 0
+        for rule in rules:
+            rule.start_page(ctx)
+
+        if body and body.strip():
+            parser = etree.HTMLPullParser(
+                events=("start", "end"), remove_comments=True, remove_pis=True, collect_ids=False
+            )
+            try:
+                for start in range(0, len(body) + chunk_size, chunk_size):
+                    if start < len(body):
+                        parser.feed(body[start:start + chunk_size])
+                    else:
+                        parser.close()
+                    for event, element in parser.read_events():
+                        tag = element.tag.lower() if isinstance(element.tag, str) else None
+                        if event == "start":
+                            if ctx.root is None:
+                                ctx.root = element
+                            locator.opened(element)
+                            if tag in subtree_tags:
+                                open_subtrees += 1
+                            continue
+                        if tag is not None:
+                            handlers = dispatch.get(tag)
+                            if handlers:
+                                for handler in handlers:
+                                    handler(element, ctx)
+                            for handler in wildcard:
+                                handler(element, ctx)
+                        locator.closed()
+                        if tag in subtree_tags:
+                            open_subtrees -= 1
+                        parent = element.getparent()
+                        if open_subtrees or parent is None:
+                            continue
+                        # Closed and visited: keep only what pinned elements need, then drop earlier siblings
+                        if locator.pinned(element):
+                            del element[:]
+                        else:
+                            element.clear()
+                        while element.getprevious() is not None:
+                            del parent[0]
+            except (etree.LxmlError, ValueError):
+                pass
+
+        for rule in rules:
+            rule.end_page(ctx)
+        locator.finish()
+        return ctx
+
+    def take_timings(self):
+        """Parse time, pages and per-rule time of the sampled pages since the previous call."""
+        current = {
+            "parse_s": self.parse_time,
+            "pages": self.pages_analyzed,
+            "sampled_pages": self.pages_sampled,
+            "rule_s": dict(self.rule_timings)
+        }
+        taken, self._timings_taken = self._timings_taken, current
+        if taken is None:
+            return current
+        return {
+            "parse_s": current["parse_s"] - taken["parse_s"],
+            "pages": current["pages"] - taken["pages"],
+            "sampled_pages": current["sampled_pages"] - taken["sampled_pages"],
+            "rule_s": {rule: seconds - taken["rule_s"].get(rule, 0.0) for rule, seconds in current["rule_s"].items()}
+        }
+
+    def _dispatch_table(self, rules):
+        dispatch = {}
+        wildcard = []
+        for rule in rules:
+            if "*" in rule.tags:
+                wildcard.append(rule.visit)
+                continue
+            for tag in rule.tags:
+                dispatch.setdefault(tag, []).append(rule.visit)
+        return dispatch, wildcard
+
+    def _analyze_profiled(self, rules, ctx):
+        timings = self.rule_timings
+        clock = time.perf_counter
+        dispatch = {}
+        wildcard = []
+        for rule in rules:
+            if "*" in rule.tags:
+                wildcard.append(rule)
+                continue
+            for tag in rule.tags:
+                dispatch.setdefault(tag, []).append(rule)
+
+        for rule in rules:
+            started = clock()
+            rule.start_page(ctx)
+            timings[rule.name] += clock() - started
+
+        if ctx.root is not None:
+            for element in ctx.root.iter():
+                tag = element.tag
+                if not isinstance(tag, str):
+                    continue
+                for rule in dispatch.get(tag.lower(), []) + wildcard:
+                    started = clock()
+                    rule.visit(element, ctx)
+                    timings[rule.name] += clock() - started
+
+        for rule in rules:
+            started = clock()
+            rule.end_page(ctx)
+            timings[rule.name] += clock() - started
+
+
+def merge_timings(total, timings):
+    """Add `RuleEngine.take_timings` results of another engine into `total`."""
+    total["parse_s"] = total.get("parse_s", 0.0) + timings["parse_s"]
+    total["pages"] = total.get("pages", 0) + timings["pages"]
+    total["sampled_pages"] = total.get("sampled_pages", 0) + timings["sampled_pages"]
+    rule_s = total.setdefault("rule_s", {})
+    for rule, seconds in timings["rule_s"].items():
+        rule_s[rule] = rule_s.get(rule, 0.0) + seconds
+    return total
+
+
+def analyze_html(body, url=None, wcag_level="AA"):
+    """Convenience wrapper: analyze a single page with the default rules."""
+    return RuleEngine(wcag_level).analyze(body, url)
+
+
+# Built-in rules
+
+@register_rule
+class ColorContrastRule(Rule):
+    """Collects every text element with known colors and scores the page in one vectorized call.
+
+    Colors come from the `data-a11y-*` attributes added by the browser tier,
+    or in the static pass from the cascade of the page's `<style>` blocks,
+    linked stylesheets (when the engine has a stylesheet cache) and inline
+    styles. Elements no author style applies to are skipped.
+    """
+    name = "color-contrast"
+    issue_type = "Poor Color Contrast"
+    wcag_criterion = "1.4.3"
+    wcag_level = "AA"
+    severity = "Major"
+    description = "Text color contrast ratio is below WCAG standards"
+    fix_suggestion = "Increase color contrast by darkening text or lightening background."
+    auto_fixable = True
+    tags = ("*",)
+    streamable = True
+    # Never painted, so their text has no contrast to check
+    unrendered_tags = {"head", "title", "script", "noscript", "template", "style", "link", "meta"}
+
+    def start_page(self, ctx):
+        self.elements = []
+        self.foregrounds = []
+        self.backgrounds = []
+        self.large = []
+        self.styles = PageStyles(ctx.url, ctx.stylesheets, root=ctx.root)
+
+    def visit(self, element, ctx):
+        self._collect(element, ctx)
+        if ctx.locator is not None:
+            # Streaming visits an element after all of its descendants, so no later element inherits from it
+            self.styles.release(element)
+
+    def _collect(self, element, ctx):
+        tag = element.tag
+        if tag == "style":
+            self.styles.add_style(element.text)
+            return
+        if tag == "link":
+            if "stylesheet" in (element.get("rel") or "").lower().split():
+                self.styles.add_link(element.get("href"))
+            return
+        if tag in self.unrendered_tags or not (element.text or "").strip():
+            return
+        color = element.get("data-a11y-color")
+        if color is not None:
+            background = element.get("data-a11y-bg")
+            font_size = parse_font_size(element.get("data-a11y-font-size"))
+            font_weight = element.get("data-a11y-font-weight")
+        else:
+            style = self.styles.computed(element)
+            if not style.declared:
+                return
+            color = style.color or "#000000"
+            background = style.background or "#ffffff"
+            font_size = parse_font_size(style.font_size)
+            font_weight = style.font_weight
+        if not color or not background:
+            return
+
+        try:
+            parse_color(color)
+            parse_color(background)
+        except InvalidColorError:
+            return
+        ctx.pin(element)
+        self.elements.append(element)
+        self.foregrounds.append(color)
+        self.backgrounds.append(background)
+        self.large.append(is_large_text(font_size, font_weight))
+
+    def end_page(self, ctx):
+        if not self.elements:
+            if ctx.options.get("computed_styles") and ctx.root is not None:
+                ctx.request_render(self.name)
+            return
+
+        result = evaluate_contrast(self.foregrounds, self.backgrounds, self.large)
+        enhanced = ctx.wcag_level == "AAA"
+        passed = result["aaa"] if enhanced else result["aa"]
+        for index in (~passed).nonzero()[0]:
+            ratio = result["ratio"][index]
+            ctx.report(
+                self,
+                self.elements[index],
+                f"Contrast ratio {ratio:.2f}:1 between {self.foregrounds[index]} and {self.backgrounds[index]} "
+                f"is below the WCAG {'AAA' if enhanced else 'AA'} minimum"
+            )
+
+
+@register_rule
+class MissingAltTextRule(Rule):
+    name = "image-alt"
+    issue_type = "Missing Alt Text"
+    wcag_criterion = "1.1.1"
+    severity = "Critical"
+    description = "Image missing alternative text"
+    fix_suggestion = "Add descriptive alt text that explains the image content and purpose, or alt=\"\" for decorative images."
+    auto_fixable = True
+    tags = ("img", "area", "input")
+    streamable = True
+
+    def visit(self, element, ctx):
+        if element.tag == "input" and (element.get("type") or "").lower() != "image":
+            return
+        if element.get("alt") is not None:
+            return
+        if element.get("role") in ("presentation", "none") or element.get("aria-hidden") == "true":
+            return
+        if has_accessible_name(element):
+            return
+        ctx.report(self, element)
+
+
+@register_rule
+class VerboseAltTextRule(Rule):
+    name = "image-alt-verbose"
+    issue_type = "Verbose Alt Text"
+    wcag_criterion = "1.1.1"
+    severity = "Minor"
+    description = "Image alternative text is longer than 150 characters"
+    fix_suggestion = "Keep alt text concise; move long descriptions into surrounding text or a linked description."
+    tags = ("img",)
+    streamable = True
+    max_length = 150
+
+    def visit(self, element, ctx):
+        if len((element.get("alt") or "").strip()) > self.max_length:
+            ctx.report(self, element)
+
+
+@register_rule
+class FormLabelRule(Rule):
+    name = "form-label"
+    issue_type = "Form Labels"
+    wcag_criterion = "1.3.1"
+    severity = "Critical"
+    description = "Form input has no associated label"
+    fix_suggestion = "Associate a <label for=...> with the control, wrap it in a <label>, or add aria-label/aria-labelledby."
+    auto_fixable = True
+    tags = ("input", "select", "textarea", "label")
+    streamable = True
+    unlabeled_input_types = {"hidden", "submit", "button", "image", "reset"}
+
+    def start_page(self, ctx):
+        self.label_targets = set()
+        self.candidates = []
+
+    def visit(self, element, ctx):
+        if element.tag == "label":
+            target = element.get("for")
+            if target:
+                self.label_targets.add(target)
+            return
+
+        if element.tag == "input" and (element.get("type") or "text").lower() in self.unlabeled_input_types:
+            return
+        if has_accessible_name(element):
+            return
+        if any(ancestor.tag == "label" for ancestor in element.iterancestors()):
+            return
+        ctx.pin(element)
+        self.candidates.append(element)
+
+    def end_page(self, ctx):
+        for element in self.candidates:
+            if element.get("id") not in self.label_targets:
+                ctx.report(self, element)
+
+
+@register_rule
+class PageTitleRule(Rule):
+    name = "document-title"
+    issue_type = "Missing Page Title"
+    wcag_criterion = "2.4.2"
+    severity = "Critical"
+    description = "Page has no title"
+    fix_suggestion = "Add a descriptive <title> element inside <head>."
+    auto_fixable = True
+    tags = ("title",)
+    streamable = True
+    subtree_tags = ("title",)
+
+    def start_page(self, ctx):
+        self.found = False
+
+    def visit(self, element, ctx):
+        if element_text(element):
+            self.found = True
+
+    def end_page(self, ctx):
+        if not self.found:
+            ctx.report(self)
+
+
+@register_rule
+class PageLanguageRule(Rule):
+    name = "html-lang"
+    issue_type = "Missing Page Language"
+    wcag_criterion = "3.1.1"
+    severity = "Critical"
+    description = "The <html> element has no lang attribute"
+    fix_suggestion = "Add a lang attribute to the <html> element, e.g. <html lang=\"en\">."
+    auto_fixable = True
+    tags = ("html",)
+    streamable = True
+
+    def start_page(self, ctx):
+        self.found = False
+
+    def visit(self, element, ctx):
+        if (element.get("lang") or element.get("xml:lang") or "").strip():
+            self.found = True
+
+    def end_page(self, ctx):
+        if ctx.root is not None and not self.found:
+            ctx.report(self, ctx.root)
+
+
+@register_rule
+class HeadingStructureRule(Rule):
+    name = "heading-order"
+    issue_type = "Heading Structure"
+    wcag_criterion = "1.3.1"
+    severity = "Major"
+    description = "Heading levels are skipped"
+    fix_suggestion = "Use heading levels in order (h1, then h2, then h3) without skipping levels."
+    tags = ("h1", "h2", "h3", "h4", "h5", "h6")
+    streamable = True
+
+    def start_page(self, ctx):
+        self.previous_level = 0
+        self.seen_h1 = False
+        self.count = 0
+
+    def visit(self, element, ctx):
+        level = int(element.tag[1])
+        self.count += 1
+        if level == 1:
+            self.seen_h1 = True
+        if self.previous_level and level > self.previous_level + 1:
+            ctx.report(self, element, f"Heading level jumps from h{self.previous_level} to h{level}")
+        self.previous_level = level
+
+    def end_page(self, ctx):
+        if ctx.root is None:
+            return
+        if not self.count:
+            ctx.report(self, None, "Page has no headings", severity="Major")
+        elif not self.seen_h1:
+            ctx.report(self, None, "Page has no level-one heading", severity="Minor")
+
+
+@register_rule
+class LandmarkRule(Rule):
+    name = "landmark-main"
+    issue_type = "ARIA Landmarks"
+    wcag_criterion = "1.3.1"
+    severity = "Major"
+    description = "Page has no main landmark"
+    fix_suggestion = "Wrap the primary content in a <main> element (or role=\"main\")."
+    auto_fixable = True
+    tags = ("*",)
+    streamable = True
+
+    def start_page(self, ctx):
+        self.found = False
+
+    def visit(self, element, ctx):
+        if not self.found and (element.tag == "main" or element.get("role") == "main"):
+            self.found = True
+
+    def end_page(self, ctx):
+        if ctx.root is not None and not self.found:
+            ctx.report(self)
+
+
+@register_rule
+class TableCaptionRule(Rule):
+    name = "table-caption"
+    issue_type = "Missing Table Caption"
+    wcag_criterion = "1.3.1"
+    severity = "Minor"
+    description = "Data table has no caption"
+    fix_suggestion = "Add a <caption> describing the table, or aria-label/aria-labelledby."
+    tags = ("table",)
+    streamable = True
+    subtree_tags = ("table",)
+
+    def visit(self, element, ctx):
+        if element.get("role") in ("presentation", "none") or has_accessible_name(element):
+            return
+        if element.find("caption") is not None:
+            return
+        # Layout tables without header cells are not data tables
+        if element.find(".//th") is None:
+            return
+        ctx.report(self, element)
+
+
+@register_rule
+class EmptyLinkRule(Rule):
+    name = "link-name"
+    issue_type = "Empty Link"
+    wcag_criterion = "2.4.4"
+    severity = "Major"
+    description = "Link has no discernible text"
+    fix_suggestion = "Give the link visible text, or an aria-label describing its destination."
+    tags = ("a",)
+    streamable = True
+    subtree_tags = ("a",)
+
+    def visit(self, element, ctx):
+        if element.get("href") is None or has_accessible_name(element):
+            return
+        if element_text(element):
+            return
+        if any((img.get("alt") or "").strip() for img in element.iter("img")):
+            return
+        ctx.report(self, element)
+
+
+@register_rule
+class PositiveTabindexRule(Rule):
+    name = "tabindex"
+    issue_type = "Keyboard Navigation"
+    wcag_criterion = "2.4.3"
+    severity = "Major"
+    description = "Element uses a positive tabindex, which breaks the natural focus order"
+    fix_suggestion = "Use tabindex=\"0\" or -1 and order the DOM to match the visual order."
+    auto_fixable = True
+    tags = ("*",)
+    streamable = True
+
+    def visit(self, element, ctx):
+        tabindex = element.get("tabindex")
+        if tabindex and tabindex.strip().lstrip("+").isdigit() and int(tabindex) > 0:
+            ctx.report(self, element)
+
+
+@register_rule
+class SkipLinkRule(Rule):
+    name = "skip-link"
+    issue_type = "Skip Links"
+    wcag_criterion = "2.4.1"
+    severity = "Minor"
+    description = "Page has no skip link to bypass repeated navigation"
+    fix_suggestion = "Add a \"Skip to main content\" link as the first focusable element."
+    tags = ("a", "nav")
+    streamable = True
+
+    def start_page(self, ctx):
+        self.seen_link = False
+        self.has_skip_link = False
+        self.has_nav = False
+
+    def visit(self, element, ctx):
+        if element.tag == "nav":
+            self.has_nav = True
+            return
+        # Only the first link on the page counts as a skip link
+        if not self.seen_link and element.get("href") is not None:
+            self.seen_link = True
+            self.has_skip_link = (element.get("href") or "").startswith("#")
+
+    def end_page(self, ctx):
+        if self.has_nav and not self.has_skip_link:
+            ctx.report(self)
@@ -0,0 +1,300 @@
+# accessibility_compliance/accessibility_compliance/scan_report.py
+"""Paginated and streaming access to a scan's issues.
+
+Issues are read in keyset order (page_url, name) so every page of results is
+an indexed range scan, however deep the cursor. Issues are deduplicated
+across pages: each row's `page_url` is the first page it was found on, which
+is where it is grouped, and it carries its occurrence and affected-page
+counts. Per-page severity counts and the page filter cover every issue found
+on the page, shared ones included, through the issue fingerprints the scan
+recorded for it. Exports stream batch by batch so memory stays flat
+regardless of scan size.
+"""
+import base64
+import json
+
+import frappe
+from frappe import _
+from frappe.utils import cint, sbool
+from werkzeug.wrappers import Response
+
+from accessibility_compliance.accessibility_compliance.page_state import scan_page_fingerprints
+
+DEFAULT_PAGE_SIZE = 500
+MAX_PAGE_SIZE = 5000
+EXPORT_BATCH_SIZE = 2000
+
+# Output key -> Accessibility Issue column
+REPORT_COLUMNS = {
+    "id": "name",
+    "page_url": "page_url",
+    "type": "issue_type",
+    "severity": "severity",
+    "description": "issue_description",
+    "wcag_criterion": "wcag_criterion",
+    "element_selector": "element_selector",
+    "ai_suggested_fix": "ai_suggested_fix",
+    "auto_fixable": "auto_fixable",
+    "status": "status",
+    "fix_applied": "fix_applied",
+    "fingerprint": "fingerprint",
+    "occurrences": "occurrence_count",
+    "pages_affected": "page_count",
+    "affected_pages": "affected_pages"
+}
+DEFAULT_REPORT_FIELDS = (
+    "id", "type", "severity", "description", "wcag_criterion",
+    "element_selector", "ai_suggested_fix", "auto_fixable", "status",
+    "occurrences", "pages_affected"
+)
+
+
+def encode_cursor(page_url, name):
+    raw = json.dumps([page_url or "", name]).encode()
+    return base64.urlsafe_b64encode(raw).decode()
+
+
+def decode_cursor(cursor):
+    try:
+        page_url, name = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return page_url, name
+    except (ValueError, TypeError):
+        frappe.throw(_("Invalid report cursor"))
+
+
+def _parse_list(value):
+    if not value:
+        return None
+    if isinstance(value, str):
+        value = json.loads(value) if value.strip().startswith("[") else [v.strip() for v in value.split(",")]
+    return list(value)
+
+
+def resolve_fields(fields=None):
+    """Validate the requested output keys against the projectable columns."""
+    fields = _parse_list(fields) or list(DEFAULT_REPORT_FIELDS)
+    unknown = [f for f in fields if f not in REPORT_COLUMNS]
+    if unknown:
+        frappe.throw(_("Unknown report fields: {0}").format(", ".join(unknown)))
+    return fields
+
+
+def _issue_query(scan_id, fields, page_url=None, severity=None, after=None, limit=DEFAULT_PAGE_SIZE):
+    Issue = frappe.qb.DocType("Accessibility Issue")
+    # page_url and name drive pagination and grouping, so they are always read
+    columns = {REPORT_COLUMNS[f] for f in fields} | {"name", "page_url"}
+    query = (
+        frappe.qb.from_(Issue)
+        .select(*[Issue[column] for column in sorted(columns)])
+        .where(Issue.website_scan == scan_id)
+        .orderby(Issue.page_url)
+        .orderby(Issue.name)
+        .limit(limit)
+    )
+    if page_url:
+        found_on_page = Issue.page_url == page_url
+        fingerprints = scan_page_fingerprints(scan_id, [page_url]).get(page_url)
+        if fingerprints:
+            # Issues first found on another page of the scan but also present on this one
+            found_on_page = found_on_page | Issue.fingerprint.isin(list(fingerprints))
+        query = query.where(found_on_page)
+    severities = _parse_list(severity)
+    if severities:
+        query = query.where(Issue.severity.isin(severities))
+    if after:
+        last_url, last_name = after
+        query = query.where(
+            (Issue.page_url > last_url) | ((Issue.page_url == last_url) & (Issue.name > last_name))
+        )
+    return query
+
+
+def iter_issues(scan_id, fields=None, page_url=None, severity=None, batch_size=EXPORT_BATCH_SIZE):
+    """Yield projected issue dicts for a scan, reading the database one keyset batch at a time."""
+    fields = resolve_fields(fields)
+    after = None
+    while True:
+        rows = _issue_query(scan_id, fields, page_url, severity, after, batch_size).run(as_dict=True)
+        for row in rows:
+            yield {key: row[REPORT_COLUMNS[key]] for key in fields}
+        if len(rows) < batch_size:
+            return
+        after = (rows[-1].page_url or "", rows[-1].name)
+
+
+def _report_page_urls(scan_id, after_url=None, limit=None):
+    """URLs of the scan's pages with issues, in URL order: those it recorded states for and first-seen pages."""
+    values = {"scan_id": scan_id, "after_url": after_url, "limit": cint(limit)}
+    after = "AND page_url > %(after_url)s" if after_url else ""
+    return frappe.db.sql_list(f"""
+        SELECT url FROM (
+            SELECT page_url AS url
+            FROM `tabScanned Page`
+            WHERE website_scan = %(scan_id)s AND issue_fingerprints != '' {after}
+            UNION
+            SELECT DISTINCT page_url
+            FROM `tabAccessibility Issue`
+            WHERE website_scan = %(scan_id)s AND page_url IS NOT NULL {after}
+        ) pages
+        ORDER BY url
+        {'LIMIT %(limit)s' if limit else ''}
+    """, values)
+
+
+def _first_seen_counts(scan_id, page_urls):
+    return frappe.db.sql("""
+        SELECT page_url AS url,
+            SUM(severity = 'Critical') AS critical_count,
+            SUM(severity = 'Major') AS major_count,
+            SUM(severity = 'Minor') AS minor_count,
+            COUNT(*) AS total_count
+        FROM `tabAccessibility Issue`
+        WHERE website_scan = %s AND page_url IN %s
+        GROUP BY page_url
+    """, (scan_id, tuple(page_urls)), as_dict=True)
+
+
+def page_severity_counts(scan_id, page_urls=None, after_url=None, limit=None):
+    """Per-page counts by severity of the distinct issues found on each page.
+
+    Pages come from the fingerprints the scan recorded for them, so an issue
+    shared by several pages counts on each. A page analyzed again by a later
+    scan of the site no longer has its state here and counts the issues first
+    found on it.
+    """
+    if page_urls is None:
+        page_urls = _report_page_urls(scan_id, after_url, limit)
+    page_urls = [url for url in page_urls if url]
+    if not page_urls:
+        return []
+
+    counts = {row.url: row for row in _first_seen_counts(scan_id, page_urls)}
+    recorded = scan_page_fingerprints(scan_id, page_urls)
+    fingerprints = {fingerprint for page in recorded.values() for fingerprint in page}
+    severities = dict(frappe.get_all(
+        "Accessibility Issue",
+        filters={"website_scan": scan_id, "fingerprint": ["in", list(fingerprints)]},
+        fields=["fingerprint", "severity"],
+        as_list=True
+    )) if fingerprints else {}
+    for url, page in recorded.items():
+        row = counts[url] = frappe._dict(url=url, critical_count=0, major_count=0, minor_count=0, total_count=0)
+        for fingerprint in page:
+            severity = severities.get(fingerprint)
+            if severity in ("Critical", "Major", "Minor"):
+                row[f"{severity.lower()}_count"] += 1
+            if severity:
+                row.total_count += 1
+
+    return [counts[url] for url in page_urls if url in counts and counts[url].total_count]
+
+
+def get_page_counts(scan_id, after_url=None, limit=100):
+    """One page of `page_severity_counts`, with the cursor to the next.
+
+    The cursor is the last URL of the window, taken before pages without
+    issues are dropped, so a window that loses pages does not end the listing.
+    """
+    page_urls = _report_page_urls(scan_id, after_url, limit)
+    return {
+        "pages": page_severity_counts(scan_id, page_urls=page_urls),
+        "next_after_url": page_urls[-1] if len(page_urls) == limit else None
+    }
+
+
+def _insights(scan):
+    suggestions = scan.remediation_suggestions
+    if not suggestions:
+        return {}
+    try:
+        return json.loads(suggestions)
+    except ValueError:
+        # Reports generated over MCP are stored as markdown
+        return suggestions
+
+
+def get_report_page(scan_id, include_suggestions=True, page_url=None, severity=None,
+                    cursor=None, limit=DEFAULT_PAGE_SIZE, fields=None):
+    """One page of a scan report: issues grouped by page URL, plus a cursor for the next page."""
+    scan = frappe.db.get_value("Website Scan", scan_id, [
+        "name", "website_url", "compliance_score", "total_issues", "total_pages_scanned",
+        "wcag_level", "last_scan_date", "remediation_suggestions"
+    ], as_dict=True)
+    if not scan:
+        frappe.throw(_("Website Scan {0} not found").format(scan_id), frappe.DoesNotExistError)
+
+    fields = resolve_fields(fields)
+    limit = min(cint(limit) or DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE)
+    after = decode_cursor(cursor) if cursor else None
+    rows = _issue_query(scan_id, fields, page_url, severity, after, limit).run(as_dict=True)
+
+    # Filtered to one page, its shared issues are listed under it rather than their first page
+    counts = {
+        row.url: row for row in page_severity_counts(scan_id, page_urls={page_url or row.page_url for row in rows})
+    }
+    pages = []
+    for row in rows:
+        url = page_url or row.page_url
+        if not pages or pages[-1]["url"] != (url or scan.website_url):
+            page_counts = counts.get(url) or {}
+            pages.append({
+                "url": url or scan.website_url,
+                "issues": [],
+                "critical_count": cint(page_counts.get("critical_count")),
+                "major_count": cint(page_counts.get("major_count")),
+                "minor_count": cint(page_counts.get("minor_count"))
+            })
+        pages[-1]["issues"].append({key: row[REPORT_COLUMNS[key]] for key in fields})
+
+    next_cursor = encode_cursor(rows[-1].page_url, rows[-1].name) if len(rows) == limit else None
+
+    return {
+        "scan_summary": {
+            "scan_id": scan_id,
+            "website_url": scan.website_url,
+            "compliance_score": scan.compliance_score or 0,
+            "total_issues": scan.total_issues or 0,
+            "total_pages": scan.total_pages_scanned or 1,
+            "wcag_level": scan.wcag_level,
+            "scan_date": scan.last_scan_date
+        },
+        "pages": pages,
+        "next_cursor": next_cursor,
+        "ai_insights": _insights(scan) if sbool(include_suggestions) else None
+    }
+
+
+def stream_issues_response(scan_id, fields=None, page_url=None, severity=None, fmt="ndjson"):
+    """A streaming HTTP response with every issue of a scan as NDJSON or a chunked JSON array."""
+    fields = resolve_fields(fields)
+    site = frappe.local.site
+
+    def generate():
+        # The body is iterated after Frappe has finished the request, so the
+        # generator brings up (and tears down) its own site connection.
+        own_connection = not getattr(frappe.local, "db", None)
+        if own_connection:
+            frappe.init(site=site)
+            frappe.connect()
+        try:
+            rows = iter_issues(scan_id, fields, page_url, severity)
+            if fmt == "json":
+                yield "["
+                for index, row in enumerate(rows):
+                    yield ("," if index else "") + frappe.as_json(row, indent=None)
+                yield "]"
+            else:
+                for row in rows:
+                    yield frappe.as_json(row, indent=None) + "\n"
+        finally:
+            if own_connection:
+                frappe.destroy()
+
+    mimetype = "application/json" if fmt == "json" else "application/x-ndjson"
+    extension = "json" if fmt == "json" else "ndjson"
+    return Response(
+        generate(),
+        mimetype=mimetype,
+        headers={"Content-Disposition": f'attachment; filename="{scan_id}-issues.{extension}"'},
+        direct_passthrough=True
+    )
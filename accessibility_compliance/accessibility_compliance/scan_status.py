@@ -0,0 +1,191 @@
+# accessibility_compliance/accessibility_compliance/scan_status.py
+import time
+
+import frappe
+from frappe.utils import cint
+
+from accessibility_compliance.accessibility_compliance.checkpoint import checkpoint_summary
+from accessibility_compliance.accessibility_compliance.progress import get_scan_progress
+
+DEFAULT_STATUS_CACHE_TTL = 5
+# Progress not refreshed for this long belongs to a scan whose worker died
+STALE_PROGRESS_SECONDS = 300
+
+STATUS_FIELDS = [
+    "name",
+    "scan_status",
+    "compliance_score",
+    "total_pages_scanned",
+    "total_issues",
+    "critical_issues",
+    "major_issues",
+    "minor_issues",
+    "issue_occurrences",
+    "last_scan_date"
+]
+
+SEVERITY_COUNTER_FIELDS = {
+    "Critical": "critical_issues",
+    "Major": "major_issues",
+    "Minor": "minor_issues"
+}
+
+
+def _cache_key(scan_id):
+    return f"accessibility_scan_status|{scan_id}"
+
+
+def clear_scan_status_cache(scan_id):
+    """Drop the cached status of a scan; call whenever the scan or its issue counters change."""
+    frappe.cache.delete_value(_cache_key(scan_id))
+
+
+def increment_severity_counters(scan_id, counts, occurrences=0):
+    """Add per-severity counts of new issues (e.g. {"Critical": 3}) and their occurrences to the Website Scan.
+
+    Runs as a single UPDATE inside the caller's transaction, so counters move
+    together with the issue rows they describe. Callers clear the status cache
+    once that transaction is committed.
+    """
+    assignments = []
+    values = {"scan_id": scan_id, "total": 0}
+    for severity, fieldname in SEVERITY_COUNTER_FIELDS.items():
+        count = cint(counts.get(severity))
+        if not count:
+            continue
+        assignments.append(f"`{fieldname}` = IFNULL(`{fieldname}`, 0) + %({fieldname})s")
+        values[fieldname] = count
+        values["total"] += count
+    if values["total"]:
+        assignments.append("`total_issues` = IFNULL(`total_issues`, 0) + %(total)s")
+    if occurrences:
+        assignments.append("`issue_occurrences` = IFNULL(`issue_occurrences`, 0) + %(occurrences)s")
+        values["occurrences"] = cint(occurrences)
+    if not assignments:
+        return
+
+    frappe.db.sql(
+        f"UPDATE `tabWebsite Scan` SET {', '.join(assignments)} WHERE `name` = %(scan_id)s",
+        values
+    )
+
+
+def reset_severity_counters(scan_id):
+    """Zero the counters before a scan (re)starts writing issues."""
+    frappe.db.set_value("Website Scan", scan_id, {
+        "critical_issues": 0,
+        "major_issues": 0,
+        "minor_issues": 0,
+        "total_issues": 0,
+        "issue_occurrences": 0
+    }, update_modified=False)
+    clear_scan_status_cache(scan_id)
+
+
+def _count_by_severity(scan_id):
+    rows = frappe.db.sql("""
+        SELECT severity, COUNT(*)
+        FROM `tabAccessibility Issue`
+        WHERE website_scan = %s
+        GROUP BY severity
+    """, scan_id)
+    return dict(rows)
+
+
+def _count_occurrences(scan_id):
+    return cint(frappe.db.sql("""
+        SELECT SUM(IFNULL(occurrence_count, 1))
+        FROM `tabAccessibility Issue`
+        WHERE website_scan = %s
+    """, scan_id)[0][0])
+
+
+def build_scan_status(scan_id):
+    """Read a scan's status with one row lookup (plus one GROUP BY for scans without counters)."""
+    scan = frappe.db.get_value("Website Scan", scan_id, STATUS_FIELDS, as_dict=True)
+    if not scan:
+        frappe.throw(frappe._("Website Scan {0} not found").format(scan_id), frappe.DoesNotExistError)
+
+    if scan.critical_issues is None and scan.major_issues is None and scan.minor_issues is None:
+        # Scans created before counters were maintained
+        counts = _count_by_severity(scan_id)
+        scan.critical_issues = counts.get("Critical", 0)
+        scan.major_issues = counts.get("Major", 0)
+        scan.minor_issues = counts.get("Minor", 0)
+    if scan.issue_occurrences is None:
+        # Scans created before occurrences were counted
+        scan.issue_occurrences = _count_occurrences(scan_id)
+
+    # Calculate progress
+    progress = 10 if scan.scan_status == "Pending" else \
+              50 if scan.scan_status == "In Progress" else \
+              100 if scan.scan_status == "Completed" else 0
+
+    # Scans between batch jobs report how far their checkpoint got
+    checkpoint = checkpoint_summary(scan_id) if scan.scan_status == "In Progress" else None
+    if checkpoint:
+        done, pending = cint(checkpoint.pages_done), cint(checkpoint.pages_pending)
+        progress = min(99, int(done * 100 / max(done + pending, 1)))
+
+    status = {
+        "scan_id": scan_id,
+        "status": scan.scan_status,
+        "compliance_score": scan.compliance_score or 0,
+        "total_pages_scanned": scan.total_pages_scanned or 0,
+        "total_issues": scan.total_issues or 0,
+        "occurrences": cint(scan.issue_occurrences),
+        "last_scan_date": scan.last_scan_date,
+        "issues_summary": {
+            "critical": cint(scan.critical_issues),
+            "major": cint(scan.major_issues),
+            "minor": cint(scan.minor_issues)
+        },
+        "progress": progress
+    }
+    if checkpoint:
+        status["checkpoint"] = {
+            "batch": cint(checkpoint.batch),
+            "pages_done": cint(checkpoint.pages_done),
+            "pages_pending": cint(checkpoint.pages_pending),
+            "saved_at": checkpoint.modified
+        }
+    return status
+
+
+def status_from_progress(progress):
+    """Build the status response of a running scan purely from its live progress counters."""
+    return {
+        "scan_id": progress["scan_id"],
+        "status": progress["status"],
+        "compliance_score": 0,
+        "total_pages_scanned": progress["pages_analyzed"],
+        "total_issues": progress["issues_found"],
+        "occurrences": progress.get("occurrences", progress["issues_found"]),
+        "last_scan_date": None,
+        "issues_summary": progress["issues_summary"],
+        "progress": progress["progress"],
+        "live": progress
+    }
+
+
+def get_scan_status(scan_id):
+    """Scan status without database reads while the scan runs.
+
+    Running scans are answered from the live progress counters kept in the
+    cache by the scanner. Other scans are read from the database and cached
+    briefly; that cache is invalidated on every scan update.
+    """
+    progress = get_scan_progress(scan_id)
+    if progress and progress["status"] == "In Progress" \
+            and time.time() - progress["updated_at"] < STALE_PROGRESS_SECONDS:
+        return status_from_progress(progress)
+
+    key = _cache_key(scan_id)
+    status = frappe.cache.get_value(key)
+    if status is None:
+        status = build_scan_status(scan_id)
+        ttl = cint(frappe.conf.get("scan_status_cache_ttl")) or DEFAULT_STATUS_CACHE_TTL
+        frappe.cache.set_value(key, status, expires_in_sec=ttl)
+    if progress:
+        status = dict(status, live=progress)
+    return status
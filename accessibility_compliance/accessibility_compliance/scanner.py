@@ -0,0 +1,457 @@
+# accessibility_compliance/accessibility_compliance/scanner.py
+import asyncio
+import os
+import time
+from contextlib import nullcontext
+from dataclasses import asdict
+
+import frappe
+from frappe.utils import cint, flt, now
+from frappe.utils.background_jobs import is_job_enqueued
+
+from accessibility_compliance.accessibility_compliance.ai_analyzer import enqueue_ai_suggestions, suggestions_enabled
+from accessibility_compliance.accessibility_compliance.analysis_pool import (
+    DEFAULT_MIN_PAGES,
+    AnalysisPool,
+    default_workers
+)
+from accessibility_compliance.accessibility_compliance.checkpoint import (
+    CHECKPOINT_DOCTYPE,
+    checkpoint_summary,
+    create_checkpoint,
+    delete_checkpoint,
+    load_checkpoint,
+    record_attempt,
+    save_checkpoint
+)
+from accessibility_compliance.accessibility_compliance.crawler import (
+    MAX_BODY_BYTES,
+    CrawlConfig,
+    Crawler,
+    CrawlStats
+)
+from accessibility_compliance.accessibility_compliance.dashboard import record_scan_completed, record_scan_reopened
+from accessibility_compliance.accessibility_compliance.http_client import get_stylesheet_cache
+from accessibility_compliance.accessibility_compliance.instrumentation import (
+    ScanMetrics,
+    get_rule_sample_pages,
+    profile_scan,
+    profiling_enabled
+)
+from accessibility_compliance.accessibility_compliance.issue_writer import IssueWriter, fingerprint_of
+from accessibility_compliance.accessibility_compliance.page_state import (
+    PageStateWriter,
+    carry_forward_issues,
+    content_hash,
+    known_pages,
+    load_page_states,
+    stylesheet_keys,
+    without_restyled_pages
+)
+from accessibility_compliance.accessibility_compliance.progress import ScanProgress, get_scan_progress
+from accessibility_compliance.accessibility_compliance.remediation_report import clear_report_cache
+from accessibility_compliance.accessibility_compliance.renderer import BrowserPool, TieredAnalyzer
+from accessibility_compliance.accessibility_compliance.retention import purge_scan_issues
+from accessibility_compliance.accessibility_compliance.rules import (
+    DEFAULT_STREAM_THRESHOLD,
+    RULE_REGISTRY,
+    RuleEngine,
+    calculate_compliance_score,
+    summarize_issues
+)
+from accessibility_compliance.accessibility_compliance.scan_status import (
+    STALE_PROGRESS_SECONDS,
+    clear_scan_status_cache,
+    reset_severity_counters
+)
+
+DEFAULT_MAX_PAGES = 50
+DEFAULT_BATCH_PAGES = 500
+DEFAULT_BATCH_SECONDS = 600
+DEFAULT_CHECKPOINT_PAGES = 100
+MAX_BATCH_ATTEMPTS = 3
+DEFAULT_PURGE_BATCH_SIZE = 5000
+
+
+def get_max_pages(max_pages=None):
+    """Resolve the page budget for a scan from the argument or `max_pages_per_scan` in site config."""
+    return cint(max_pages) or cint(frappe.conf.get("max_pages_per_scan")) or DEFAULT_MAX_PAGES
+
+
+def get_crawl_config(scan, max_pages=None):
+    """Build the crawler settings for a Website Scan document."""
+    return CrawlConfig(
+        start_url=scan.website_url,
+        max_depth=cint(scan.scan_depth) or 3,
+        max_pages=get_max_pages(max_pages),
+        include_subdomains=bool(cint(scan.include_subdomains)),
+        concurrency=cint(frappe.conf.get("scan_concurrency")) or 10,
+        per_host_concurrency=cint(frappe.conf.get("scan_per_host_concurrency")) or 4,
+        per_host_interval=float(frappe.conf.get("scan_per_host_interval", 0.1)),
+        max_body_bytes=cint(frappe.conf.get("scan_max_page_bytes")) or MAX_BODY_BYTES,
+        respect_robots=bool(cint(frappe.conf.get("scan_respect_robots", 1))),
+        use_sitemaps=bool(cint(frappe.conf.get("scan_use_sitemaps", 1))),
+        max_frontier=cint(frappe.conf.get("scan_max_frontier")) or 5000,
+        max_query_variants=cint(frappe.conf.get("scan_max_query_variants", 3)),
+        bloom_capacity=cint(frappe.conf.get("scan_bloom_capacity"))
+    )
+
+
+def get_rule_engine(wcag_level="AA", linked_stylesheets=None):
+    """Build a rule engine from the built-in rules plus any registered via the `accessibility_rules` hook.
+
+    `linked_stylesheets=False` keeps the engine from fetching the stylesheets
+    a page links, whatever `scan_linked_stylesheets` says.
+    """
+    rules = list(RULE_REGISTRY.values())
+    for path in frappe.get_hooks("accessibility_rules"):
+        rule = frappe.get_attr(path)
+        if rule not in rules:
+            rules.append(rule)
+    options = {
+        "computed_styles": cint(frappe.conf.get("scan_computed_styles")),
+        "linked_stylesheets": cint(frappe.conf.get("scan_linked_stylesheets", 1)) if linked_stylesheets is None
+        else cint(linked_stylesheets)
+    }
+    stream_threshold = cint(frappe.conf.get("scan_stream_threshold_bytes", DEFAULT_STREAM_THRESHOLD))
+    return RuleEngine(wcag_level, rules=rules, options=options, stream_threshold=stream_threshold,
+                      stylesheets=get_stylesheet_cache() if options["linked_stylesheets"] else None,
+                      rule_sample_every=get_rule_sample_pages())
+
+
+def get_analysis_pool(engine, max_pages):
+    """Return a process pool for the static pass sized by `scan_analysis_workers`, or None to analyze in-process.
+
+    Scans with a page budget below `scan_analysis_min_pages` analyze in-process,
+    and no pool has more workers than the host has CPUs.
+    """
+    if max_pages < cint(frappe.conf.get("scan_analysis_min_pages", DEFAULT_MIN_PAGES)):
+        return None
+    workers = min(cint(frappe.conf.get("scan_analysis_workers", default_workers())), os.cpu_count() or 1)
+    if workers <= 1:
+        return None
+    return AnalysisPool(engine, workers=workers)
+
+
+def get_browser_pool():
+    """Return a headless browser pool sized by `scan_browser_pool_size`, or None when rendering is disabled."""
+    size = cint(frappe.conf.get("scan_browser_pool_size", 2))
+    if size <= 0 or frappe.conf.get("scan_render_mode") == "never":
+        return None
+    return BrowserPool(size=size)
+
+
+def is_incremental(incremental=None):
+    """Incremental re-scans are on unless disabled with `scan_incremental: 0` in site config."""
+    if incremental is not None:
+        return bool(cint(incremental))
+    return bool(cint(frappe.conf.get("scan_incremental", 1)))
+
+
+def scan_job_id(scan_id, batch=0):
+    return f"accessibility_scan::{scan_id}::{batch}" if batch else f"accessibility_scan::{scan_id}"
+
+
+def enqueue_scan(scan_id, max_pages=None, batch=0, profile=None):
+    """Queue a scan batch on the long queue; a batch that is already queued or running is not queued twice."""
+    frappe.enqueue(
+        "accessibility_compliance.accessibility_compliance.scanner.run_accessibility_scan",
+        scan_id=scan_id,
+        max_pages=max_pages,
+        profile=profile,
+        queue="long",
+        timeout=1800,  # 30 minutes
+        job_id=scan_job_id(scan_id, batch),
+        deduplicate=True
+    )
+
+
+def get_batch_limits():
+    """Pages and seconds per scan job, and pages between checkpoints, from site config."""
+    return (
+        cint(frappe.conf.get("scan_batch_pages")) or DEFAULT_BATCH_PAGES,
+        flt(frappe.conf.get("scan_batch_seconds")) or DEFAULT_BATCH_SECONDS,
+        cint(frappe.conf.get("scan_checkpoint_pages")) or DEFAULT_CHECKPOINT_PAGES
+    )
+
+
+def is_scan_alive(scan_id):
+    """Whether the current batch job of a scan is queued or running, or the scan reported progress recently."""
+    summary = checkpoint_summary(scan_id)
+    if is_job_enqueued(scan_job_id(scan_id, cint(summary.batch) if summary else 0)):
+        return True
+    progress = get_scan_progress(scan_id)
+    return bool(progress and progress["status"] == "In Progress"
+                and time.time() - progress["updated_at"] < STALE_PROGRESS_SECONDS)
+
+
+def fail_scan(scan_id, progress=None):
+    frappe.db.set_value("Website Scan", scan_id, "scan_status", "Failed")
+    delete_checkpoint(scan_id)
+    frappe.db.commit()
+    clear_scan_status_cache(scan_id)
+    (progress or ScanProgress(scan_id)).finish("Failed")
+
+
+def resume_interrupted_scans():
+    """Every few minutes: re-queue scan batches whose job died, failing scans that keep dying."""
+    for row in frappe.get_all(CHECKPOINT_DOCTYPE, fields=["name", "batch", "attempts"]):
+        if is_scan_alive(row.name):
+            continue
+        if cint(row.attempts) >= MAX_BATCH_ATTEMPTS:
+            frappe.log_error(f"Accessibility scan {row.name} abandoned after {row.attempts} attempts of batch {row.batch}")
+            fail_scan(row.name)
+            continue
+        record_attempt(row.name, cint(row.attempts) + 1)
+        frappe.db.commit()
+        enqueue_scan(row.name, batch=cint(row.batch))
+
+
+def _start_scan(scan):
+    """Reset a scan for a fresh run and create its checkpoint."""
+    was_completed = scan.scan_status == "Completed" and scan.compliance_score is not None
+    scan.db_set("scan_status", "In Progress")
+    # A re-run replaces the results of the previous run
+    purge_scan_issues(scan.name, batch_size=DEFAULT_PURGE_BATCH_SIZE, deadline=float("inf"))
+    reset_severity_counters(scan.name)
+    create_checkpoint(scan.name, now())
+    frappe.db.commit()
+    if was_completed:
+        record_scan_reopened(scan.compliance_score)
+    return load_checkpoint(scan.name)
+
+
+def run_accessibility_scan(scan_id, max_pages=None, incremental=None, profile=None):
+    """Background job: crawl the website of a Website Scan and record the results.
+
+    A scan runs as a chain of batch jobs. Each job crawls until it has handled
+    `scan_batch_pages` pages or spent `scan_batch_seconds`, checkpointing every
+    `scan_checkpoint_pages` pages, and then queues the next batch from its
+    final checkpoint. A job that dies is resumed from its last checkpoint by
+    `resume_interrupted_scans`.
+
+    With incremental scanning, pages are requested conditionally and pages
+    whose markup hash is unchanged since the last scan of the site keep their
+    earlier issues instead of being analyzed again.
+
+    Stage timings and counters are kept in `instrumentation.ScanMetrics` and
+    stored on the Website Scan at the end. With `profile` (or `scan_profile`
+    in site config) every batch runs under cProfile and every page gets
+    per-rule timings.
+    """
+    scan = frappe.get_doc("Website Scan", scan_id)
+    checkpoint = load_checkpoint(scan_id)
+    if checkpoint is None:
+        checkpoint = _start_scan(scan)
+    state = checkpoint.state
+    max_pages = max_pages or state.get("max_pages")
+    # Later batches follow the choice made when the scan started
+    profile = profiling_enabled(state.get("profile") if "profile" in state else profile)
+    metrics = ScanMetrics().restore(state.get("metrics"))
+
+    crawl_config = get_crawl_config(scan, max_pages)
+    progress = ScanProgress(scan_id, max_pages=crawl_config.max_pages)
+    progress.restore(state.get("progress"))
+    progress.publish(force=True)
+
+    batch_pages, batch_seconds, checkpoint_pages = get_batch_limits()
+    batch_started = time.monotonic()
+
+    browser_pool = get_browser_pool()
+    analysis_pool = None
+    try:
+        if browser_pool:
+            # Launch the sessions while the first pages are being fetched
+            browser_pool.start_in_background()
+
+        engine = get_rule_engine(scan.wcag_level)
+        if profile:
+            engine.rule_sample_every = 1
+        analysis_pool = get_analysis_pool(engine, crawl_config.max_pages)
+        if analysis_pool:
+            analysis_pool.start()
+            # Every crawler worker awaits its page's analysis, so they bound the pages in flight
+            crawl_config.concurrency = max(crawl_config.concurrency, analysis_pool.workers)
+        analyzer = TieredAnalyzer(
+            engine,
+            browser_pool=browser_pool,
+            render_mode=frappe.conf.get("scan_render_mode") or "auto",
+            analysis_pool=analysis_pool,
+            metrics=metrics
+        )
+        # Rows are committed together with the checkpoint that marks their pages as done
+        writer = IssueWriter(scan_id, commit=False, metrics=metrics)
+        page_states = load_page_states(scan.website_url) if is_incremental(incremental) else {}
+        page_states = without_restyled_pages(page_states, engine.stylesheets)
+        state_writer = PageStateWriter(scan.website_url, scan_id, engine.signature)
+
+        crawler = Crawler(crawl_config, known_pages=known_pages(page_states, engine.signature))
+        completed = set()
+        if state:
+            crawler.resume(state["visited"], state["frontier"])
+            crawler.stats = CrawlStats(**state["stats"])
+            completed = set(state["visited"]) - {url for url, depth in state["frontier"]}
+        scores = {"sum": flt(state.get("score_sum")), "pages": cint(state.get("pages_scored"))}
+        batch = {"pages": 0, "since_checkpoint": 0}
+
+        def unchanged_state(page, digest):
+            stored = page_states.get(page.url)
+            if not stored or stored.rules_signature != engine.signature:
+                return None
+            if page.not_modified or stored.content_hash == digest:
+                return stored
+            return None
+
+        async def handle_page(page):
+            handle_started = time.perf_counter()
+            progress.update_crawl(crawler.stats)
+            if page.error is None:
+                metrics.observe("fetch", page.elapsed)
+                metrics.count("pages_fetched")
+                metrics.count("bytes_fetched", len(page.body))
+            else:
+                metrics.count("errors|fetch")
+            if not page.is_html and not page.not_modified:
+                if page.error is None:
+                    progress.page_skipped()
+                else:
+                    progress.publish()
+                return
+
+            digest = content_hash(page.body) if page.is_html else None
+            stored = unchanged_state(page, digest)
+            issues = None
+            stylesheets = None
+            if stored:
+                with metrics.timer("carry_forward"):
+                    issues = carry_forward_issues(stored.website_scan, page.url, stored.issue_fingerprints, writer)
+                stylesheets = stored.stylesheet_keys
+            if issues is None:
+                if not page.is_html:
+                    # Validators were sent without usable stored results; nothing to analyze
+                    progress.page_skipped()
+                    return
+                stored = None
+                try:
+                    with metrics.timer("analyze"):
+                        issues = await analyzer.analyze(page.url, page.body)
+                except Exception as e:
+                    # One page the rules cannot handle is skipped; storage errors below still fail the batch
+                    frappe.log_error(f"Accessibility analysis of {page.url} failed in scan {scan_id}: {str(e)}")
+                    metrics.count("errors|analyze")
+                    progress.page_skipped()
+                    return
+                # Awaited before the issues are buffered, as nothing may await between that and completing the page
+                stylesheets = await asyncio.get_running_loop().run_in_executor(
+                    None, stylesheet_keys, engine.stylesheets, page.body, page.url
+                )
+                writer.add_many(issues)
+            counts = summarize_issues(issues)
+            scores["sum"] += calculate_compliance_score(**counts)
+            scores["pages"] += 1
+            state_writer.record(page, digest, changed=not stored,
+                                fingerprints=[fingerprint_of(issue) for issue in issues], stylesheets=stylesheets)
+            progress.page_analyzed(counts, unchanged=bool(stored), new_issues=writer.take_new_issues())
+            metrics.count("pages_unchanged" if stored else "pages_analyzed")
+            metrics.count("issues_found", len(issues))
+            # From the start of the request until the page's issues are buffered
+            metrics.observe("page", page.elapsed + time.perf_counter() - handle_started)
+
+        def save(next_batch=None):
+            writer.flush()
+            started = time.perf_counter()
+            state_writer.flush()
+            metrics.add_engine_timings(engine.take_timings())
+            if analysis_pool:
+                metrics.add_engine_timings(analysis_pool.take_timings())
+            frontier = crawler.pending(completed)
+            save_checkpoint(scan_id, {
+                "max_pages": max_pages,
+                "visited": crawler.visited,
+                "frontier": frontier,
+                "stats": asdict(crawler.stats),
+                "progress": progress.as_dict(),
+                "score_sum": scores["sum"],
+                "pages_scored": scores["pages"],
+                "metrics": metrics.state(),
+                "profile": profile
+            }, len(completed), len(frontier), batch=next_batch)
+            frappe.db.commit()
+            metrics.observe("checkpoint", time.perf_counter() - started)
+            metrics.publish()
+            clear_scan_status_cache(scan_id)
+            batch["since_checkpoint"] = 0
+            return frontier
+
+        async def on_page(page):
+            await handle_page(page)
+            # Nothing awaits between writing a page's issues and marking it done,
+            # so a checkpoint never covers a page whose rows are not buffered yet
+            completed.add(page.requested_url)
+            batch["pages"] += 1
+            batch["since_checkpoint"] += 1
+            if batch["since_checkpoint"] >= checkpoint_pages:
+                save()
+            if batch["pages"] >= batch_pages or time.monotonic() - batch_started >= batch_seconds:
+                crawler.stop()
+
+        crawler.on_page = on_page
+        with profile_scan(metrics, scan_id, checkpoint.batch) if profile else nullcontext():
+            stats = crawler.run()
+
+        frontier = save(next_batch=checkpoint.batch + 1)
+        if frontier:
+            progress.update_crawl(stats)
+            progress.publish(force=True)
+            enqueue_scan(scan_id, max_pages=max_pages, batch=checkpoint.batch + 1)
+            return {
+                "scan_id": scan_id,
+                "batch": checkpoint.batch,
+                "pages_done": len(completed),
+                "pages_pending": len(frontier)
+            }
+
+        # Severity counters were maintained by the issue writer as chunks were flushed
+        scan.reload()
+        scan.total_pages_scanned = scores["pages"]
+        scan.compliance_score = flt(scores["sum"] / scores["pages"], 1) if scores["pages"] else 0
+        scan.scan_status = "Completed"
+        scan.last_scan_date = now()
+        scan.scan_metrics = metrics.to_json()
+        scan.save(ignore_permissions=True)
+        delete_checkpoint(scan_id)
+        frappe.db.commit()
+        record_scan_completed(scan.compliance_score)
+        clear_report_cache(scan_id)
+        if suggestions_enabled():
+            enqueue_ai_suggestions(scan_id)
+
+        progress.update_crawl(stats)
+        progress.finish("Completed")
+
+        return {
+            "scan_id": scan_id,
+            "batch": checkpoint.batch,
+            "pages_fetched": stats.pages_fetched,
+            "pages_failed": stats.pages_failed,
+            "total_issues": scan.total_issues,
+            "occurrences": scan.issue_occurrences,
+            "duration": stats.duration,
+            "pages_unchanged": progress.pages_unchanged,
+            "render_tiers": analyzer.report(),
+            "stages": metrics.summary()["stages"]
+        }
+
+    except Exception as e:
+        frappe.db.rollback()
+        frappe.log_error(f"Accessibility scan {scan_id} failed in batch {checkpoint.batch}: {str(e)}")
+        if checkpoint.attempts >= MAX_BATCH_ATTEMPTS:
+            fail_scan(scan_id, progress)
+        # Otherwise resume_interrupted_scans retries the batch from its last checkpoint
+        raise
+
+    finally:
+        if browser_pool:
+            browser_pool.close()
+        if analysis_pool:
+            analysis_pool.close()
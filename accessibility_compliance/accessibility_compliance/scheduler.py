@@ -0,0 +1,254 @@
+# accessibility_compliance/accessibility_compliance/scheduler.py
+"""Nightly re-scans of Monitored Sites.
+
+`run_scheduled_scans` (02:00) plans the night: every due site gets a start
+time inside the scan window, most urgent sites first, spread evenly with
+random jitter and interleaved by host so one target is not hit back to back.
+`dispatch_scheduled_scans` (every few minutes) starts the scans whose time has
+come while respecting a global and a per-host cap on running scans, and
+re-queues scans that never started. Both steps keep their state on the
+Monitored Site rows, so nothing is lost when workers restart.
+
+`cleanup_old_scan_data` (every six hours) applies the retention policy of
+`retention.py` within a time budget.
+"""
+import random
+
+import frappe
+from frappe.utils import add_to_date, cint, flt, get_datetime, now_datetime, time_diff_in_seconds
+from frappe.utils.background_jobs import get_queue
+
+from accessibility_compliance.accessibility_compliance.checkpoint import checkpoint_summary
+from accessibility_compliance.accessibility_compliance.crawler import site_host
+from accessibility_compliance.accessibility_compliance.retention import cleanup_old_scan_data as purge_expired_scans
+from accessibility_compliance.accessibility_compliance.scanner import enqueue_scan, is_scan_alive
+
+DEFAULT_WINDOW_HOURS = 6
+DEFAULT_MIN_INTERVAL_HOURS = 20
+DEFAULT_GLOBAL_LIMIT = 4
+DEFAULT_PER_HOST_LIMIT = 1
+MAX_DISPATCH_ATTEMPTS = 3
+# Staleness counts for at most two weeks, so a long-neglected site does not starve everything else
+MAX_STALENESS_DAYS = 14
+
+METRICS_KEY = "accessibility_scheduled_scan_metrics"
+DISPATCH_LOCK = "accessibility_scheduled_scan_dispatch"
+
+ACTIVE_STATUSES = ("Pending", "In Progress")
+
+
+def _conf(key, default):
+    return frappe.conf.get(key) or default
+
+
+def scan_priority(site, now=None):
+    """Higher for sites that were scanned longer ago and for sites with lower scores."""
+    now = now or now_datetime()
+    if site.last_scan_date:
+        staleness_days = time_diff_in_seconds(now, site.last_scan_date) / 86400
+    else:
+        staleness_days = MAX_STALENESS_DAYS
+    score_gap = 100 - flt(site.last_compliance_score) if site.last_compliance_score is not None else 100
+    return min(staleness_days, MAX_STALENESS_DAYS) / MAX_STALENESS_DAYS * 100 + score_gap
+
+
+def interleave_by_host(sites):
+    """Round-robin over hosts, keeping each host's sites in their existing order."""
+    by_host = {}
+    for site in sites:
+        by_host.setdefault(site_host(site.website_url), []).append(site)
+    queues = list(by_host.values())
+    ordered = []
+    while queues:
+        ordered.extend(queue.pop(0) for queue in queues)
+        queues = [queue for queue in queues if queue]
+    return ordered
+
+
+def plan_start_times(sites, start, window_seconds, rng=random):
+    """Assign each site (already in dispatch order) a start time in its own slice of the window."""
+    if not sites:
+        return []
+    slot = window_seconds / len(sites)
+    return [
+        (site, add_to_date(start, seconds=int(index * slot + rng.uniform(0, slot))))
+        for index, site in enumerate(sites)
+    ]
+
+
+def run_scheduled_scans():
+    """Daily: plan tonight's scans of every due Monitored Site across the scan window."""
+    now = now_datetime()
+    min_interval = flt(_conf("scheduled_scan_min_interval_hours", DEFAULT_MIN_INTERVAL_HOURS))
+    window_seconds = flt(_conf("scheduled_scan_window_hours", DEFAULT_WINDOW_HOURS)) * 3600
+
+    cutoff = add_to_date(now, hours=-min_interval)
+    sites = frappe.get_all(
+        "Monitored Site",
+        filters={"enabled": 1, "current_scan": ["is", "not set"]},
+        or_filters=[["last_scan_date", "is", "not set"], ["last_scan_date", "<", cutoff]],
+        fields=["name", "website_url", "last_scan_date", "last_compliance_score", "next_scan_at"]
+    )
+    # Sites still waiting from an earlier plan keep their slot
+    sites = [site for site in sites if not site.next_scan_at]
+    sites.sort(key=lambda site: scan_priority(site, now), reverse=True)
+
+    for site, start_at in plan_start_times(interleave_by_host(sites), now, window_seconds):
+        frappe.db.set_value("Monitored Site", site.name, {
+            "next_scan_at": start_at,
+            "dispatch_attempts": 0
+        }, update_modified=False)
+    frappe.db.commit()
+
+    dispatch_scheduled_scans()
+    return len(sites)
+
+
+def dispatch_scheduled_scans():
+    """Every few minutes: settle finished scans, resume orphaned ones and start due ones under the caps."""
+    lock = frappe.cache.lock(frappe.cache.make_key(DISPATCH_LOCK), timeout=300)
+    if not lock.acquire(blocking=False):
+        return
+    try:
+        resumed = _settle_active_scans()
+        dispatched = _dispatch_due_sites()
+        frappe.db.commit()
+        _record_metrics(dispatched, resumed)
+    finally:
+        lock.release()
+
+
+def _settle_active_scans():
+    sites = frappe.get_all(
+        "Monitored Site",
+        filters={"current_scan": ["is", "set"]},
+        fields=["name", "current_scan", "dispatch_attempts"]
+    )
+    if not sites:
+        return 0
+    scans = {
+        scan.name: scan for scan in frappe.get_all(
+            "Website Scan",
+            filters={"name": ["in", [site.current_scan for site in sites]]},
+            fields=["name", "scan_status", "compliance_score", "last_scan_date"]
+        )
+    }
+
+    resumed = 0
+    for site in sites:
+        scan = scans.get(site.current_scan)
+        if scan and scan.scan_status in ACTIVE_STATUSES:
+            if is_scan_alive(scan.name) or checkpoint_summary(scan.name):
+                # Running, or started and left to resume_interrupted_scans
+                continue
+            if cint(site.dispatch_attempts) < MAX_DISPATCH_ATTEMPTS:
+                # The job was lost before the scan started
+                enqueue_scan(scan.name)
+                frappe.db.set_value("Monitored Site", site.name, "dispatch_attempts",
+                                    cint(site.dispatch_attempts) + 1, update_modified=False)
+                resumed += 1
+                continue
+            frappe.db.set_value("Website Scan", scan.name, "scan_status", "Failed")
+            scan.scan_status = "Failed"
+
+        values = {"current_scan": None, "next_scan_at": None, "dispatch_attempts": 0}
+        if scan and scan.scan_status == "Completed":
+            values.update({
+                "last_website_scan": scan.name,
+                "last_scan_date": scan.last_scan_date,
+                "last_compliance_score": scan.compliance_score
+            })
+        frappe.db.set_value("Monitored Site", site.name, values, update_modified=False)
+    return resumed
+
+
+def _running_by_host():
+    running = frappe.get_all(
+        "Monitored Site",
+        filters={"current_scan": ["is", "set"]},
+        pluck="website_url"
+    )
+    by_host = {}
+    for url in running:
+        host = site_host(url)
+        by_host[host] = by_host.get(host, 0) + 1
+    return len(running), by_host
+
+
+def _dispatch_due_sites():
+    global_limit = cint(_conf("scheduled_scan_concurrency", DEFAULT_GLOBAL_LIMIT))
+    per_host_limit = cint(_conf("scheduled_scan_per_host_concurrency", DEFAULT_PER_HOST_LIMIT))
+    running, by_host = _running_by_host()
+    if running >= global_limit:
+        return 0
+
+    due = frappe.get_all(
+        "Monitored Site",
+        filters={"enabled": 1, "current_scan": ["is", "not set"], "next_scan_at": ["<=", now_datetime()]},
+        fields=["name", "website_url", "wcag_level", "scan_depth", "include_subdomains", "max_pages"],
+        order_by="next_scan_at asc"
+    )
+    dispatched = 0
+    for site in due:
+        if running >= global_limit:
+            break
+        host = site_host(site.website_url)
+        if by_host.get(host, 0) >= per_host_limit:
+            continue
+
+        scan = frappe.new_doc("Website Scan")
+        scan.website_url = site.website_url
+        scan.wcag_level = site.wcag_level
+        scan.scan_depth = site.scan_depth
+        scan.include_subdomains = site.include_subdomains
+        scan.scan_status = "Pending"
+        scan.insert(ignore_permissions=True)
+        frappe.db.set_value("Monitored Site", site.name, {
+            "current_scan": scan.name,
+            "dispatch_attempts": 1
+        }, update_modified=False)
+        # Commit before queuing so the worker always finds the scan
+        frappe.db.commit()
+        enqueue_scan(scan.name, max_pages=cint(site.max_pages) or None)
+
+        running += 1
+        by_host[host] = by_host.get(host, 0) + 1
+        dispatched += 1
+    return dispatched
+
+
+def _record_metrics(dispatched, resumed):
+    now = now_datetime()
+    waiting = frappe.get_all(
+        "Monitored Site",
+        filters={"enabled": 1, "current_scan": ["is", "not set"], "next_scan_at": ["is", "set"]},
+        pluck="next_scan_at"
+    )
+    due = [get_datetime(start_at) for start_at in waiting if get_datetime(start_at) <= now]
+    running, _ = _running_by_host()
+    metrics = {
+        "queue_depth": len(due),
+        "planned": len(waiting) - len(due),
+        "running": running,
+        "long_queue_length": get_queue("long").count,
+        "lag_seconds": round(time_diff_in_seconds(now, min(due)), 1) if due else 0,
+        "dispatched": dispatched,
+        "resumed": resumed,
+        "updated_at": now
+    }
+    frappe.cache.set_value(METRICS_KEY, metrics)
+    return metrics
+
+
+def get_scheduler_metrics():
+    """Queue depth, lag and running scans as of the last dispatcher run."""
+    return frappe.cache.get_value(METRICS_KEY) or _record_metrics(0, 0)
+
+
+def cleanup_old_scan_data():
+    """Every six hours: compact and purge the issue rows of scans outside the retention window."""
+    result = purge_expired_scans()
+    if not result["finished"]:
+        # The rest is picked up by the next run
+        frappe.logger("accessibility_compliance").info(f"Scan data cleanup stopped at its time budget: {result}")
+    return result
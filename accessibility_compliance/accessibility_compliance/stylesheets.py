@@ -0,0 +1,572 @@
+# accessibility_compliance/accessibility_compliance/stylesheets.py
+"""Parsed stylesheets and the cascade for static color checks.
+
+Every page of a site links the same few CSS bundles. A `StylesheetCache`
+keeps their parsed form keyed by URL plus content hash, so a bundle is
+downloaded (through the HTTP response cache) and parsed once per process
+however many pages and concurrent scans use it, and evicts the least
+recently used sheets beyond `max_bytes`.
+
+Only the declarations the color checks need are kept (color, background,
+font size and weight), and style rules are bucketed by the id, class or tag
+of their rightmost compound selector in a `SelectorIndex`. Resolving an
+element's style then tests only the rules that can match it instead of every
+rule of every sheet. `PageStyles` applies the cascade (importance, inline
+styles, specificity, source order) and inheritance to the elements of one
+page.
+
+Selectors are matched statically: descendant and child combinators, type,
+class, id and attribute selectors are supported; rules whose selectors use
+pseudo-classes, pseudo-elements or sibling combinators are skipped, and media
+queries are evaluated for the browser tier's desktop viewport.
+"""
+import hashlib
+import re
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from urllib.parse import urljoin
+
+from accessibility_compliance.accessibility_compliance.contrast import InvalidColorError, parse_color
+
+DEFAULT_CACHE_MB = 64
+MAX_STYLESHEET_BYTES = 2 * 1024 * 1024
+# Seconds a stylesheet URL is served from memory before it is looked up in the response cache again
+URL_TTL = 300
+# Width of the browser tier's window, which media queries are evaluated against
+VIEWPORT_WIDTH = 1366
+TRACKED_PROPERTIES = ("color", "background-color", "background", "font-size", "font-weight")
+# Background of an element over an image or gradient: its contrast cannot be computed statically
+UNKNOWN_BACKGROUND = "unknown"
+# Approximate memory of an indexed rule, to weigh combined indexes against parsed sheets
+INDEX_ENTRY_BYTES = 200
+
+_COMMENT_RE = re.compile(r"/\*.*?\*/", re.DOTALL)
+_BRACE_RE = re.compile(r"[{}]")
+_SELECTOR_TOKEN_RE = re.compile(r"\s*([>+~])\s*|\s+|((?:\[[^\]]*\]|[^\s>+~\[\]])+)")
+_COMPOUND_RE = re.compile(r"^(\*|[a-zA-Z][\w-]*)?((?:#[\w-]+|\.[\w-]+|\[[^\]]*\])*)$")
+_SIMPLE_RE = re.compile(
+    r"#([\w-]+)|\.([\w-]+)|\[\s*([\w:-]+)\s*(?:([~|^$*]?=)\s*(\"[^\"]*\"|'[^']*'|[^\]\s]*)\s*(i)?)?\s*\]"
+)
+_MEDIA_WIDTH_RE = re.compile(r"(min|max)-width\s*:\s*([\d.]+)px")
+_BACKGROUND_TOKEN_RE = re.compile(r"[a-z-]+\([^)]*\)|#[0-9a-f]+|[a-z-]+")
+
+
+@dataclass(slots=True)
+class StyleRule:
+    """One selector of a style rule with the tracked declarations it sets."""
+    selector: tuple
+    specificity: tuple
+    order: int
+    declarations: dict
+
+    def matches(self, element):
+        compound, _combinator = self.selector[0]
+        return _matches_compound(compound, element) and _matches_ancestors(self.selector, 1, element)
+
+
+@dataclass(slots=True)
+class Stylesheet:
+    key: tuple
+    rules: list
+    size: int
+
+
+@dataclass(slots=True)
+class ComputedStyle:
+    color: str = None
+    background: str = None
+    font_size: str = None
+    font_weight: str = None
+    # Whether an author style set any tracked property on the element or an ancestor
+    declared: bool = False
+
+
+ROOT_STYLE = ComputedStyle()
+
+
+def _parse_compound(text):
+    if text == ":root":
+        text = "html"
+    if ":" in text:
+        return None
+    match = _COMPOUND_RE.match(text)
+    if not match:
+        return None
+    tag = match.group(1)
+    element_id = None
+    classes = []
+    attributes = []
+    for simple in _SIMPLE_RE.finditer(match.group(2)):
+        if simple.group(1):
+            element_id = simple.group(1)
+        elif simple.group(2):
+            classes.append(simple.group(2))
+        else:
+            value = simple.group(5)
+            if value and value[0] in "\"'":
+                value = value[1:-1]
+            attributes.append((simple.group(3).lower(), simple.group(4), value, bool(simple.group(6))))
+    return (None if tag in (None, "*") else tag.lower(), element_id, tuple(classes), tuple(attributes))
+
+
+def parse_selector(text):
+    """Compile one selector into (compound, combinator) pairs from right to left, or None if unsupported.
+
+    The combinator of a pair relates its compound to the pair before it.
+    """
+    tokens = []
+    position = 0
+    text = text.strip()
+    while position < len(text):
+        match = _SELECTOR_TOKEN_RE.match(text, position)
+        if not match or match.end() == position:
+            return None
+        if match.group(2):
+            if tokens and tokens[-1][0] == "compound":
+                return None
+            tokens.append(("compound", match.group(2)))
+        else:
+            combinator = match.group(1) or " "
+            if combinator in "+~" or not tokens or tokens[-1][0] != "compound":
+                return None
+            tokens.append(("combinator", combinator))
+        position = match.end()
+    if not tokens or tokens[-1][0] != "compound":
+        return None
+
+    parts = []
+    combinator = None
+    for kind, value in reversed(tokens):
+        if kind == "combinator":
+            combinator = value
+            continue
+        compound = _parse_compound(value)
+        if compound is None:
+            return None
+        parts.append((compound, combinator))
+        combinator = None
+    return tuple(parts)
+
+
+def selector_specificity(selector):
+    ids = classes = tags = 0
+    for (tag, element_id, class_names, attributes), _combinator in selector:
+        ids += element_id is not None
+        classes += len(class_names) + len(attributes)
+        tags += tag is not None
+    return (ids, classes, tags)
+
+
+def _matches_attribute(actual, operator, expected, ignore_case):
+    if operator is None:
+        return True
+    if ignore_case:
+        actual, expected = actual.lower(), expected.lower()
+    if operator == "=":
+        return actual == expected
+    if operator == "~=":
+        return expected in actual.split()
+    if operator == "|=":
+        return actual == expected or actual.startswith(expected + "-")
+    if not expected:
+        return False
+    if operator == "^=":
+        return actual.startswith(expected)
+    if operator == "$=":
+        return actual.endswith(expected)
+    return expected in actual
+
+
+def _matches_compound(compound, element):
+    tag, element_id, classes, attributes = compound
+    if tag is not None and element.tag != tag:
+        return False
+    if element_id is not None and element.get("id") != element_id:
+        return False
+    if classes:
+        names = (element.get("class") or "").split()
+        if not all(name in names for name in classes):
+            return False
+    for name, operator, expected, ignore_case in attributes:
+        actual = element.get(name)
+        if actual is None or not _matches_attribute(actual, operator, expected, ignore_case):
+            return False
+    return True
+
+
+def _matches_ancestors(selector, index, element):
+    if index == len(selector):
+        return True
+    compound, combinator = selector[index]
+    ancestor = element.getparent()
+    if combinator == ">":
+        return (ancestor is not None and _matches_compound(compound, ancestor)
+                and _matches_ancestors(selector, index + 1, ancestor))
+    while ancestor is not None:
+        if _matches_compound(compound, ancestor) and _matches_ancestors(selector, index + 1, ancestor):
+            return True
+        ancestor = ancestor.getparent()
+    return False
+
+
+def parse_declarations(block):
+    """The tracked declarations of a block as {property: (value, important)}."""
+    declarations = {}
+    for declaration in block.split(";"):
+        name, sep, value = declaration.partition(":")
+        name = name.strip().lower()
+        if not sep or name not in TRACKED_PROPERTIES:
+            continue
+        value = value.strip()
+        important = value.lower().replace(" ", "").endswith("!important")
+        if important:
+            value = value[:value.rindex("!")].strip()
+        if not value:
+            continue
+        if name in declarations and declarations[name][1] and not important:
+            continue
+        declarations[name] = (value, important)
+    return declarations
+
+
+def _media_applies(query):
+    """Whether an @media query list matches a desktop screen of VIEWPORT_WIDTH pixels."""
+    for part in query.lower().split(","):
+        part = part.strip()
+        if part.startswith("not ") or any(media in part for media in ("print", "speech")):
+            continue
+        if "prefers-color-scheme" in part and "dark" in part or "orientation" in part and "portrait" in part:
+            continue
+        if all(
+            (VIEWPORT_WIDTH >= float(width)) if bound == "min" else (VIEWPORT_WIDTH <= float(width))
+            for bound, width in _MEDIA_WIDTH_RE.findall(part)
+        ):
+            return True
+    return False
+
+
+def _matching_brace(text, brace, end):
+    depth = 0
+    for match in _BRACE_RE.finditer(text, brace, end):
+        depth += 1 if match.group() == "{" else -1
+        if depth == 0:
+            return match.start()
+    return end
+
+
+def _style_blocks(text, start, end):
+    """(selector list, declaration block) of each style rule, descending into applicable @media and @supports."""
+    position = start
+    while position < end:
+        brace = text.find("{", position, end)
+        if brace < 0:
+            return
+        close = _matching_brace(text, brace, end)
+        # Statement at-rules (@charset, @import) end with a semicolon before the next block
+        prelude = text[position:brace].rsplit(";", 1)[-1].strip()
+        if prelude.startswith("@"):
+            name = re.split(r"[\s(]", prelude[1:], 1)[0].lower()
+            if name in ("supports", "layer") or (name == "media" and _media_applies(prelude[len("@media"):])):
+                yield from _style_blocks(text, brace + 1, close)
+        elif prelude:
+            yield prelude, text[brace + 1:close]
+        position = close + 1
+
+
+def parse_stylesheet(text, key=None):
+    """Parse CSS text into a Stylesheet of the style rules that set a tracked property."""
+    text = _COMMENT_RE.sub("", text or "")
+    rules = []
+    for selectors, block in _style_blocks(text, 0, len(text)):
+        declarations = parse_declarations(block)
+        if not declarations:
+            continue
+        for selector_text in selectors.split(","):
+            selector = parse_selector(selector_text)
+            if selector is not None:
+                rules.append(StyleRule(selector, selector_specificity(selector), len(rules), declarations))
+    return Stylesheet(key, rules, len(text))
+
+
+def content_key(text, url=None):
+    return (url, hashlib.sha1(text.encode("utf-8", "replace")).hexdigest())
+
+
+class SelectorIndex:
+    """The style rules of a page's stylesheets bucketed by the id, class or tag their selector requires."""
+
+    def __init__(self, sheets):
+        self.by_id = {}
+        self.by_class = {}
+        self.by_tag = {}
+        self.universal = []
+        self.rule_count = 0
+        for position, sheet in enumerate(sheets):
+            for rule in sheet.rules:
+                tag, element_id, classes, _attributes = rule.selector[0][0]
+                entry = (rule, position)
+                if element_id is not None:
+                    self.by_id.setdefault(element_id, []).append(entry)
+                elif classes:
+                    self.by_class.setdefault(classes[0], []).append(entry)
+                elif tag is not None:
+                    self.by_tag.setdefault(tag, []).append(entry)
+                else:
+                    self.universal.append(entry)
+                self.rule_count += 1
+
+    def candidates(self, element):
+        """Rules that may match `element`; each is in exactly one bucket, so none repeats."""
+        candidates = list(self.universal)
+        element_id = element.get("id")
+        if element_id and element_id in self.by_id:
+            candidates += self.by_id[element_id]
+        class_names = element.get("class")
+        if class_names and self.by_class:
+            for name in set(class_names.split()):
+                candidates += self.by_class.get(name, ())
+        candidates += self.by_tag.get(element.tag, ())
+        return candidates
+
+    def cascade(self, element, inline_style=None):
+        """{property: value} of the declarations that win for `element`."""
+        winners = {}
+        for rule, position in self.candidates(element) if self.rule_count else ():
+            if not rule.matches(element):
+                continue
+            for name, (value, important) in rule.declarations.items():
+                priority = (important, False, rule.specificity, position, rule.order)
+                if name not in winners or priority > winners[name][0]:
+                    winners[name] = (priority, value)
+        if inline_style:
+            for name, (value, important) in parse_declarations(inline_style).items():
+                priority = (important, True)
+                if name not in winners or priority > winners[name][0]:
+                    winners[name] = (priority, value)
+        return winners
+
+
+EMPTY_INDEX = SelectorIndex(())
+
+
+class StylesheetCache:
+    """Process-wide LRU of parsed stylesheets and page indexes, bounded by `max_bytes`.
+
+    Linked stylesheets are loaded with `fetcher(url)`, which returns the body
+    or None; without a fetcher only `<style>` blocks are used. Pickling keeps
+    only the settings, so analysis workers start with an empty cache of their
+    own.
+    """
+
+    def __init__(self, max_bytes=DEFAULT_CACHE_MB * 1024 * 1024, fetcher=None, url_ttl=URL_TTL):
+        self.max_bytes = max_bytes
+        self.fetcher = fetcher
+        self.url_ttl = url_ttl
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.fetches = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __getstate__(self):
+        return {"max_bytes": self.max_bytes, "fetcher": self.fetcher, "url_ttl": self.url_ttl}
+
+    def __setstate__(self, state):
+        self.__init__(**state)
+
+    def _get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def _put(self, key, value, weight):
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self.size -= previous[1]
+            self._entries[key] = (value, weight)
+            self.size += weight
+            while self.size > self.max_bytes and len(self._entries) > 1:
+                _key, (_value, evicted) = self._entries.popitem(last=False)
+                self.size -= evicted
+                self.evictions += 1
+        return value
+
+    def parse(self, text, url=None):
+        """The parsed form of `text`, parsed only the first time its content is seen at `url`."""
+        key = content_key(text, url)
+        sheet = self._get(("sheet", key))
+        if sheet is None:
+            sheet = parse_stylesheet(text, key)
+            self._put(("sheet", key), sheet, sheet.size)
+        return sheet
+
+    def load(self, url):
+        """The parsed stylesheet at `url`, or None if it cannot be fetched."""
+        if self.fetcher is None:
+            return None
+        known = self._get(("url", url))
+        if known is not None and known[1] > time.monotonic():
+            if known[0] is None:
+                return None
+            sheet = self._get(("sheet", known[0]))
+            if sheet is not None:
+                return sheet
+
+        self.fetches += 1
+        body = self.fetcher(url)
+        expires = time.monotonic() + self.url_ttl
+        if body is None:
+            self._put(("url", url), (None, expires), INDEX_ENTRY_BYTES)
+            return None
+        sheet = self.parse(body[:MAX_STYLESHEET_BYTES].decode("utf-8", "replace"), url)
+        self._put(("url", url), (sheet.key, expires), INDEX_ENTRY_BYTES)
+        return sheet
+
+    def index(self, sheets):
+        """The selector index over `sheets` in order, shared by every page that uses the same sheets."""
+        key = ("index",) + tuple(sheet.key for sheet in sheets)
+        index = self._get(key)
+        if index is None:
+            index = SelectorIndex(sheets)
+            self._put(key, index, INDEX_ENTRY_BYTES * index.rule_count)
+        return index
+
+    def stats(self):
+        return {
+            "entries": len(self._entries),
+            "bytes": self.size,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "fetches": self.fetches,
+            "evictions": self.evictions
+        }
+
+
+def background_color(value):
+    """The color painted by a `background` or `background-color` value.
+
+    Returns None for transparent backgrounds and UNKNOWN_BACKGROUND for images
+    and gradients.
+    """
+    value = value.strip().lower()
+    if "url(" in value or "gradient(" in value or "image-set(" in value:
+        return UNKNOWN_BACKGROUND
+    for token in _BACKGROUND_TOKEN_RE.findall(value):
+        try:
+            color = parse_color(token)
+        except InvalidColorError:
+            continue
+        return None if color[3] == 0 else token
+    return None
+
+
+class PageStyles:
+    """The stylesheets of one page and the styles they compute for its elements.
+
+    Stylesheets are added in document order as the page's `<link>` and
+    `<style>` elements are visited. Computed styles are memoized per element;
+    `release` forgets an element once it can no longer be an ancestor of an
+    unvisited one, which keeps the memo small while streaming.
+    """
+
+    def __init__(self, url=None, cache=None, root=None):
+        self.url = url
+        self.cache = cache
+        # Without stylesheets only inline styles apply; a parsed page tells up front whether it has any
+        self.inline_styles = root is None or bool(root.xpath("boolean(//*[@style])"))
+        self.sheets = []
+        self._index = None
+        self._computed = {}
+
+    def add_style(self, text):
+        if text and text.strip():
+            self._add(self.cache.parse(text) if self.cache else parse_stylesheet(text))
+
+    def add_link(self, href):
+        if not href or self.cache is None or self.cache.fetcher is None:
+            return
+        url = urljoin(self.url or "", href.strip())
+        if url.startswith(("http://", "https://")):
+            self._add(self.cache.load(url))
+
+    def _add(self, sheet):
+        if sheet is not None and sheet.rules:
+            self.sheets.append(sheet)
+            self._index = None
+            self._computed.clear()
+
+    @property
+    def index(self):
+        if self._index is None:
+            if not self.sheets:
+                self._index = EMPTY_INDEX
+            else:
+                self._index = self.cache.index(self.sheets) if self.cache else SelectorIndex(self.sheets)
+        return self._index
+
+    def release(self, element):
+        self._computed.pop(element, None)
+
+    def computed(self, element):
+        """The ComputedStyle of `element`, resolving uncached ancestors first."""
+        if not self.sheets and not self.inline_styles:
+            return ROOT_STYLE
+        chain = []
+        node = element
+        while node is not None and node not in self._computed:
+            chain.append(node)
+            node = node.getparent()
+        style = self._computed[node] if node is not None else ROOT_STYLE
+        index = self.index
+        for node in reversed(chain):
+            style = self._compute(index, node, style)
+            self._computed[node] = style
+        return style
+
+    @staticmethod
+    def _compute(index, element, inherited):
+        inline_style = element.get("style")
+        if not index.rule_count and not inline_style:
+            return inherited
+        winners = index.cascade(element, inline_style)
+        if not winners:
+            # Only inherited properties are tracked, and a transparent background shows the parent's
+            return inherited
+
+        def value(name):
+            return winners[name][1] if name in winners else None
+
+        color = value("color")
+        if color is None or color.lower() in ("inherit", "unset", "currentcolor"):
+            color = inherited.color
+
+        background = inherited.background
+        shorthand = winners.get("background")
+        longhand = winners.get("background-color")
+        chosen = max((entry for entry in (shorthand, longhand) if entry), key=lambda entry: entry[0], default=None)
+        if chosen is not None:
+            painted = chosen[1]
+            if painted.lower() == "currentcolor":
+                painted = color
+            own = background_color(painted) if painted else None
+            if own is not None:
+                background = own
+
+        return ComputedStyle(
+            color=color,
+            background=background,
+            font_size=value("font-size") or inherited.font_size,
+            font_weight=value("font-weight") or inherited.font_weight,
+            declared=True
+        )
@@ -2,6 +2,14 @@
 import frappe
 from frappe import _
 
+from accessibility_compliance.accessibility_compliance.dashboard import (
+    record_scan_completed,
+    record_scan_created,
+    record_scan_deleted
+)
+from accessibility_compliance.accessibility_compliance.remediation_report import clear_report_cache
+from accessibility_compliance.accessibility_compliance.scan_status import clear_scan_status_cache
+
 def before_scan_insert(doc, method):
     """Validate scan before insertion."""
     # Ensure URL format
@@ -15,11 +23,26 @@ def before_scan_insert(doc, method):
     if not doc.scan_depth:
         doc.scan_depth = 3
 
+def after_scan_insert(doc, method):
+    """Count the new scan in the dashboard rollup."""
+    record_scan_created()
+    if doc.scan_status == "Completed" and doc.compliance_score is not None:
+        record_scan_completed(doc.compliance_score)
+
+def on_scan_trash(doc, method):
+    """Remove a deleted scan from the dashboard rollup."""
+    completed = doc.scan_status == "Completed" and doc.compliance_score is not None
+    record_scan_deleted(doc.compliance_score if completed else None)
+    clear_scan_status_cache(doc.name)
+    clear_report_cache(doc.name)
+
 def on_scan_update(doc, method):
     """Handle scan status updates."""
     if doc.scan_status == "Completed" and not doc.last_scan_date:
         doc.last_scan_date = frappe.utils.now()
 
+    clear_scan_status_cache(doc.name)
+
 def get_compliance_score_color(score):
     """Get color for compliance score display."""
     if score >= 90:
@@ -23,10 +23,18 @@ fixtures = [
 
 # Background Jobs
 scheduler_events = {
+    "daily": [
+        # Reconcile the materialized dashboard totals with the tables
+        "accessibility_compliance.accessibility_compliance.dashboard.rebuild_dashboard_rollup"
+    ],
     "cron": {
         "0 2 * * *": [  # Daily at 2 AM
             "accessibility_compliance.accessibility_compliance.scheduler.run_scheduled_scans"
         ],
+        "*/5 * * * *": [  # Start planned scans, resume interrupted ones
+            "accessibility_compliance.accessibility_compliance.scheduler.dispatch_scheduled_scans",
+            "accessibility_compliance.accessibility_compliance.scanner.resume_interrupted_scans"
+        ],
         "0 */6 * * *": [  # Every 6 hours
             "accessibility_compliance.accessibility_compliance.scheduler.cleanup_old_scan_data"
         ]
@@ -37,7 +45,9 @@ scheduler_events = {
 doc_events = {
     "Website Scan": {
         "before_insert": "accessibility_compliance.accessibility_compliance.utils.before_scan_insert",
-        "on_update": "accessibility_compliance.accessibility_compliance.utils.on_scan_update"
+        "after_insert": "accessibility_compliance.accessibility_compliance.utils.after_scan_insert",
+        "on_update": "accessibility_compliance.accessibility_compliance.utils.on_scan_update",
+        "on_trash": "accessibility_compliance.accessibility_compliance.utils.on_scan_trash"
     }
 }
 
@@ -51,5 +61,11 @@ website_route_rules = [
 boot_session = "accessibility_compliance.boot.boot_session"
 
 # Installation
-after_install = "accessibility_compliance.install.after_install"
-before_uninstall = "accessibility_compliance.uninstall.before_uninstall"
\ No newline at end of file
+after_install = "accessibility_compliance.accessibility_compliance.install.after_install"
+after_migrate = "accessibility_compliance.accessibility_compliance.install.after_migrate"
+before_uninstall = "accessibility_compliance.uninstall.before_uninstall"
+
+# Accessibility rules
+# Extra rule classes (subclasses of accessibility_compliance.accessibility_compliance.rules.Rule)
+# contributed by this or other apps are picked up by the scanner
+# accessibility_rules = ["my_app.accessibility.rules.MyRule"]